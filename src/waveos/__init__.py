@@ -2,4 +2,9 @@ from waveos.versioning import current_version
 
 __all__ = ["current_version"]
 
-__version__ = current_version()
+
+def __getattr__(name: str) -> str:
+    # Resolved on first access: importlib.metadata is too slow to pay on every CLI start.
+    if name == "__version__":
+        return current_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
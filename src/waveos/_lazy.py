@@ -0,0 +1,33 @@
+"""PEP 562 lazy exports shared by the package ``__init__`` modules."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str], eager: Iterable[str] = ()
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """Returns ``__getattr__``, ``__dir__`` and ``__all__`` for a package.
+
+    ``exports`` maps each public name to the submodule defining it; the submodule is
+    imported on first access and the value cached in the package namespace, so later
+    lookups never reach ``__getattr__``. ``eager`` lists names the package binds itself.
+    """
+    namespace = sys.modules[package].__dict__
+    public = sorted({*eager, *(name for name in exports if not name.startswith("_"))})
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(public))
+
+    return __getattr__, __dir__, public
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from waveos.models import HealthScore, HealthStatus
+from waveos.policy import compile_policy_rules, recommend_actions
+from waveos.utils import get_logger, parse_timestamp
+
+logger = get_logger("waveos.backtest")
+
+# Runs from before rollups.json carry rollups in health_summary.json; they never drive link-level policy.
+_POLICY_ENTITY_TYPES = {"link"}
+
+# Written into each run's --out directory, one line per run finished there (nested idempotent runs included).
+RUN_INDEX_NAME = "run_index.jsonl"
+
+
+def _epoch(value: Any) -> float | None:
+    try:
+        started_at = parse_timestamp(str(value))
+    except ValueError:
+        return None
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    return started_at.timestamp()
+
+
+def append_run_index(index_dir: Path, run_dir: Path, run_meta: Dict[str, Any]) -> None:
+    """Records a run written to run_dir (index_dir or a directory below it) in index_dir's run index."""
+    entry = {
+        "run_id": run_meta.get("run_id"),
+        "started_at": run_meta.get("started_at"),
+        "path": os.path.relpath(run_dir, index_dir),
+        "score_count": run_meta.get("score_count"),
+    }
+    try:
+        # One short line per append, so concurrent runs sharing a parent do not interleave.
+        with (index_dir / RUN_INDEX_NAME).open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, sort_keys=True) + "\n")
+    except OSError as exc:
+        logger.warning("Failed to update run index in %s: %s", index_dir, exc)
+
+
+def _run_started_at(health_path: Path) -> float:
+    # One epoch-seconds key for every run, so runs with and without run_meta.json sort together.
+    meta_path = health_path.parent / "run_meta.json"
+    if meta_path.exists():
+        try:
+            started_at = _epoch(json.loads(meta_path.read_text(encoding="utf-8")).get("started_at"))
+        except (OSError, ValueError):
+            started_at = None
+        if started_at is not None:
+            return started_at
+    return health_path.stat().st_mtime
+
+
+def _indexed_runs(index_paths: Iterable[Path]) -> List[Tuple[float, Path]]:
+    runs: Dict[Path, float] = {}
+    for index_path in index_paths:
+        try:
+            lines = index_path.read_text(encoding="utf-8").splitlines()
+        except OSError as exc:
+            logger.warning("Failed to read run index %s: %s", index_path, exc)
+            continue
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            started_at = _epoch(entry.get("started_at"))
+            if started_at is None or not entry.get("path"):
+                continue
+            # A rerun into the same directory overwrote the earlier outputs; the latest entry wins.
+            runs[index_path.parent / entry["path"] / "health_summary.json"] = started_at
+    # Entries outlive runs removed by cleanup.
+    return [(started_at, path) for path, started_at in runs.items() if path.exists()]
+
+
+def discover_runs(root: Path, since: float | None = None) -> List[Tuple[float, Path]]:
+    # The root's own index plus those of its immediate subdirectories (e.g. one --out per schedule).
+    index_paths = [path for path in (root / RUN_INDEX_NAME, *root.glob(f"*/{RUN_INDEX_NAME}")) if path.exists()]
+    if index_paths:
+        runs = _indexed_runs(index_paths)
+    else:
+        # Outputs written before the run index existed: find them by walking the tree.
+        runs = [(_run_started_at(path), path) for path in root.rglob("health_summary.json")]
+    if since is not None:
+        runs = [run for run in runs if run[0] >= since]
+    runs.sort()
+    return runs
+
+
+def duplicate_rule_ids(rules: Iterable[Dict[str, Any]]) -> List[str]:
+    plan = compile_policy_rules(rules)
+    counts = Counter(rule.rule_id for rule in plan.rules)
+    return sorted(rule_id for rule_id, count in counts.items() if count > 1)
+
+
+def conflicting_rule_ids(live: Iterable[Dict[str, Any]], candidate: Iterable[Dict[str, Any]]) -> List[str]:
+    """Rule ids the live and candidate policies both use for different rules."""
+    live_rules = {rule.rule_id: rule for rule in compile_policy_rules(live).rules}
+    conflicts = set()
+    for rule in compile_policy_rules(candidate).rules:
+        other = live_rules.get(rule.rule_id)
+        if other is None:
+            continue
+        if (other.metric, other.operator, other.threshold, other.action, other.parameters, other.selector) != (
+            rule.metric,
+            rule.operator,
+            rule.threshold,
+            rule.action,
+            rule.parameters,
+            rule.selector,
+        ):
+            conflicts.add(rule.rule_id)
+    return sorted(conflicts)
+
+
+def replay_run(task: Tuple[str, List[Dict[str, Any]], Dict[str, bool]]) -> Dict[str, Any]:
+    health_path, rules, feature_flags = task
+    plan = compile_policy_rules(rules)
+    records = json.loads(Path(health_path).read_text(encoding="utf-8"))
+    scores = [HealthScore(**record) for record in records if record.get("entity_type", "link") in _POLICY_ENTITY_TYPES]
+    actions = recommend_actions(scores, feature_flags=feature_flags, policy_rules=plan)
+    rule_entities: Dict[str, List[str]] = defaultdict(list)
+    for score in scores:
+        if score.status == HealthStatus.PASS:
+            continue
+        for rule in plan.candidates(score):
+            if rule.matches(score):
+                rule_entities[rule.rule_id].append(score.entity_id)
+    return {
+        "path": health_path,
+        "entity_count": len(scores),
+        "action_counts": dict(Counter(action.action.value for action in actions)),
+        "active": sorted({f"{action.entity_type}:{action.entity_id}|{action.action.value}" for action in actions}),
+        "rule_entities": dict(rule_entities),
+    }
+
+
+def run_backtest(
+    root: Path,
+    rules: Sequence[Dict[str, Any]],
+    feature_flags: Dict[str, bool] | None = None,
+    workers: int = 1,
+    since: float | None = None,
+) -> Dict[str, Any]:
+    plan = compile_policy_rules(rules)
+    duplicates = duplicate_rule_ids(rules)
+    if duplicates:
+        # Coverage is reported per rule id; two rules sharing one would be merged silently.
+        raise ValueError(f"Duplicate policy rule ids: {', '.join(duplicates)}")
+    runs = discover_runs(root, since=since)
+    tasks = [(str(path), list(rules), dict(feature_flags or {})) for _, path in runs]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(replay_run, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        results = [replay_run(task) for task in tasks]
+
+    action_counts: Counter = Counter()
+    transitions: Counter = Counter()
+    seen_keys: set = set()
+    rule_hits: Counter = Counter()
+    rule_runs: Counter = Counter()
+    rule_entities: Dict[str, set] = defaultdict(set)
+    previous: set = set()
+    for idx, result in enumerate(results):
+        action_counts.update(result["action_counts"])
+        active = set(result["active"])
+        seen_keys |= active
+        if idx:
+            # A flap is any (entity, action) that turns on or off between consecutive runs.
+            transitions.update(previous ^ active)
+        previous = active
+        for rule_id, entities in result["rule_entities"].items():
+            rule_hits[rule_id] += len(entities)
+            rule_runs[rule_id] += 1
+            rule_entities[rule_id].update(entities)
+
+    run_count = len(results)
+    opportunities = max(1, (run_count - 1) * len(seen_keys))
+    logger.info("Backtested %s runs under %s", run_count, root)
+    return {
+        "run_count": run_count,
+        "since": since,
+        "entity_samples": sum(result["entity_count"] for result in results),
+        "action_counts": dict(sorted(action_counts.items())),
+        "distinct_actions": len(seen_keys),
+        "transitions": sum(transitions.values()),
+        "flap_rate": sum(transitions.values()) / opportunities,
+        "top_flapping": [
+            {"key": key, "transitions": count} for key, count in transitions.most_common(20) if count >= 2
+        ],
+        "rule_coverage": {
+            rule.rule_id: {
+                "hits": rule_hits[rule.rule_id],
+                "runs": rule_runs[rule.rule_id],
+                "run_coverage": rule_runs[rule.rule_id] / run_count if run_count else 0.0,
+                "entities": len(rule_entities[rule.rule_id]),
+            }
+            for rule in plan.rules
+        },
+        "runs": [result["path"] for result in results],
+    }
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from waveos.models import HealthScore, HealthStatus, RunStats
+from waveos.reporting import clear_template_cache, get_template, render_report
+from waveos.reporting.metrics_export import LONG_FIELDS, iter_long_rows, write_metrics_parquet, write_metrics_wide_csv
+from waveos.utils import collect_system_metrics, utc_now, write_csv
+
+DEFAULT_SIZES: Tuple[int, ...] = (10, 1_000, 100_000)
+
+
+def synthetic_report_payload(entities: int) -> Tuple[List[dict], List[dict], List[dict]]:
+    health: List[dict] = []
+    events: List[dict] = []
+    actions: List[dict] = []
+    timestamp = utc_now().isoformat()
+    for idx in range(entities):
+        # Deterministic mix of roughly 90% PASS, 7% WARN and 3% FAIL.
+        bucket = idx % 100
+        status, score = ("FAIL", 40.0) if bucket < 3 else ("WARN", 70.0) if bucket < 10 else ("PASS", 100.0)
+        entity_id = f"link-{idx}"
+        drivers = ["errors_increase"] if status != "PASS" else []
+        health.append(
+            {
+                "entity_type": "link",
+                "entity_id": entity_id,
+                "score": score,
+                "status": status,
+                "drivers": drivers,
+                "details": {},
+                "window_start": timestamp,
+                "window_end": timestamp,
+            }
+        )
+        if status == "PASS":
+            continue
+        events.append(
+            {
+                "timestamp": timestamp,
+                "level": "ERROR" if status == "FAIL" else "WARN",
+                "message": f"link {entity_id} {status} drivers={','.join(drivers)}",
+                "entity_type": "link",
+                "entity_id": entity_id,
+                "details": {"run_id": "bench"},
+            }
+        )
+        actions.append(
+            {
+                "action": "REROUTE" if status == "FAIL" else "QOS_PRIORITIZATION",
+                "entity_type": "link",
+                "entity_id": entity_id,
+                "rationale": "bench",
+                "parameters": {},
+            }
+        )
+    return health, events, actions
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_report(sizes: Iterable[int] = DEFAULT_SIZES, repeat: int = 3) -> List[Dict[str, float]]:
+    results: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory(prefix="waveos-bench-") as tmp:
+        out_dir = Path(tmp)
+        for size in sizes:
+            health, events, actions = synthetic_report_payload(size)
+            clear_template_cache()
+            cold_load = _timed(lambda: get_template("report.html.j2"))
+            warm_load = min(_timed(lambda: get_template("report.html.j2")) for _ in range(max(1, repeat)))
+            render = min(
+                _timed(lambda: render_report(out_dir, health, events, actions, run_id="bench"))
+                for _ in range(max(1, repeat))
+            )
+            report_bytes = (out_dir / "report.html").stat().st_size
+            paged_render = min(
+                _timed(lambda: render_report(out_dir, health, events, actions, run_id="bench", mode="paged"))
+                for _ in range(max(1, repeat))
+            )
+            results.append(
+                {
+                    "entities": size,
+                    "template_cold_load_seconds": cold_load,
+                    "template_warm_load_seconds": warm_load,
+                    "render_seconds": render,
+                    "report_bytes": report_bytes,
+                    "paged_render_seconds": paged_render,
+                    "paged_report_bytes": (out_dir / "report.html").stat().st_size,
+                }
+            )
+    return results
+
+
+def synthetic_run_stats(entities: int, metrics: int = 16) -> List[RunStats]:
+    window = utc_now()
+    names = [f"metric_{idx:02d}" for idx in range(metrics)]
+    return [
+        RunStats(
+            entity_type="link",
+            entity_id=f"link-{idx}",
+            metrics={name: float((idx * 31 + col) % 997) / 7.0 for col, name in enumerate(names)},
+            window_start=window,
+            window_end=window,
+        )
+        for idx in range(entities)
+    ]
+
+
+def bench_metrics(sizes: Iterable[int] = DEFAULT_SIZES, repeat: int = 3) -> List[Dict[str, float]]:
+    results: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory(prefix="waveos-bench-") as tmp:
+        out_dir = Path(tmp)
+        for size in sizes:
+            stats = synthetic_run_stats(size)
+            writers = {
+                "long_csv": (out_dir / "long.csv", lambda path: write_csv(path, iter_long_rows(stats, "bench"), LONG_FIELDS)),
+                "wide_csv": (out_dir / "wide.csv", lambda path: write_metrics_wide_csv(path, stats)),
+                "parquet": (out_dir / "wide.parquet", lambda path: write_metrics_parquet(path, stats, run_id="bench")),
+            }
+            result: Dict[str, float] = {"entities": size}
+            for name, (path, writer) in writers.items():
+                seconds = min(_timed(lambda: writer(path)) for _ in range(max(1, repeat)))
+                if not path.exists():
+                    continue
+                result[f"{name}_seconds"] = seconds
+                result[f"{name}_bytes"] = path.stat().st_size
+            results.append(result)
+    return results
+
+
+# A representative rule set: one bucket of each kind the policy plan indexes.
+BENCH_POLICY_RULES: List[dict] = [
+    {"metric": "score", "operator": "<=", "threshold": 45, "action": "REROUTE"},
+    {"metric": "status", "operator": "==", "threshold": "WARN", "action": "RATE_LIMIT"},
+    {"metric": "status", "operator": "!=", "threshold": "PASS", "action": "QOS_PRIORITIZATION"},
+    {"metric": "meta.site", "operator": "==", "threshold": "east", "action": "QOS_PRIORITIZATION"},
+    {"metric": "meta.site", "operator": "!=", "threshold": "east", "action": "RATE_LIMIT"},
+]
+
+
+def synthetic_health_scores(entities: int) -> List[HealthScore]:
+    window = utc_now()
+    scores: List[HealthScore] = []
+    for idx in range(entities):
+        # Same 90/7/3 PASS/WARN/FAIL mix as the report payload; every tenth active link runs hot.
+        bucket = idx % 100
+        status, score = (HealthStatus.FAIL, 40.0) if bucket < 3 else (HealthStatus.WARN, 70.0) if bucket < 10 else (HealthStatus.PASS, 100.0)
+        drivers = [] if status == HealthStatus.PASS else ["temperature_c_drift"] if idx % 10 == 1 else ["errors_drift"]
+        scores.append(
+            HealthScore(
+                entity_type="link",
+                entity_id=f"link-{idx}",
+                score=score,
+                status=status,
+                drivers=drivers,
+                details={"site": "east"} if idx % 2 else {},
+                window_start=window,
+                window_end=window,
+            )
+        )
+    return scores
+
+
+def bench_policy(sizes: Iterable[int] = DEFAULT_SIZES, repeat: int = 3) -> List[Dict[str, float]]:
+    from waveos.policy import ScoreColumns, compile_policy_rules, recommend_actions, recommend_actions_batch
+
+    plan = compile_policy_rules(BENCH_POLICY_RULES)
+    results: List[Dict[str, float]] = []
+    for size in sizes:
+        scores = synthetic_health_scores(size)
+        scalar = min(_timed(lambda: recommend_actions(scores, policy_rules=plan)) for _ in range(max(1, repeat)))
+        columns_build = min(_timed(lambda: ScoreColumns.from_scores(scores)) for _ in range(max(1, repeat)))
+        columns = ScoreColumns.from_scores(scores)
+        batch = min(_timed(lambda: recommend_actions_batch(columns, policy_rules=plan)) for _ in range(max(1, repeat)))
+        results.append(
+            {
+                "entities": size,
+                "actions": len(recommend_actions_batch(columns, policy_rules=plan)),
+                "scalar_seconds": scalar,
+                "columns_seconds": columns_build,
+                "batch_seconds": batch,
+                # What `policy_batch_mode` costs a run: it builds the columns from the scored links first.
+                "batch_total_seconds": columns_build + batch,
+                "batch_speedup": scalar / (columns_build + batch) if columns_build + batch else 0.0,
+            }
+        )
+    return results
+
+
+SUITES: Dict[str, Callable[..., List[Dict[str, float]]]] = {"report": bench_report, "metrics": bench_metrics, "policy": bench_policy}
+
+
+def run_bench(suite: str, sizes: Iterable[int] = DEFAULT_SIZES, repeat: int = 3) -> dict:
+    if suite not in SUITES:
+        raise ValueError(f"Unknown bench suite: {suite}")
+    return {
+        "suite": suite,
+        "repeat": repeat,
+        "started_at": utc_now().isoformat(),
+        "system_metrics": collect_system_metrics(),
+        "results": SUITES[suite](sizes=list(sizes), repeat=repeat),
+    }
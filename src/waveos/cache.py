@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from waveos.utils import DIGEST_CACHE_NAME, DigestCache, counters, get_logger
+
+logger = get_logger("waveos.cache")
+
+# Bump when the shape of a cached stage payload changes, or when entries written by older
+# code must not be served; old entries then simply miss. 2: unstamped records are never cached.
+STAGE_CACHE_SCHEMA = 2
+STAGE_CACHE_SUFFIX = ".pkl"
+
+
+def stage_key(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class StageCache:
+    """Persists pipeline stage outputs keyed by a fingerprint of everything they depend on.
+
+    Each entry is one pickle file named ``<stage>-<key>.pkl``. A hit touches the
+    file, so mtime doubles as the LRU clock and concurrent runs (fan-out workers)
+    can share a directory without a shared index. ``evict`` drops the least
+    recently used entries until the directory fits ``max_bytes``. Entries are
+    unpickled, so the directory must be as trusted as the other state paths.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Input fingerprints hash file contents, but only when size or mtime changed since last time.
+        self.digests = DigestCache(directory / DIGEST_CACHE_NAME)
+        self.results: Dict[str, str] = {}
+
+    def _entry_path(self, stage: str, key: str) -> Path:
+        return self.directory / f"{stage}-{key}{STAGE_CACHE_SUFFIX}"
+
+    def fingerprint(self, paths: Iterable[Path]) -> List[Tuple[str, Optional[str]]]:
+        return [(path.name, self.digests.digest(path)) for path in paths]
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        path = self._entry_path(stage, key)
+        try:
+            with path.open("rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+        except FileNotFoundError:
+            value = None
+        except Exception as exc:  # noqa: BLE001 - a corrupt or stale entry is just a miss
+            logger.warning("Dropping unreadable stage cache entry %s: %s", path.name, exc)
+            path.unlink(missing_ok=True)
+            value = None
+        result = "miss" if value is None else "hit"
+        self.results[stage] = result
+        counters()["stage_cache"].labels(stage=stage, result=result).inc()
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        path = self._entry_path(stage, key)
+        temp_path: Optional[Path] = None
+        try:
+            with tempfile.NamedTemporaryFile("wb", delete=False, dir=self.directory, suffix=".tmp") as handle:
+                temp_path = Path(handle.name)
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+        except (OSError, pickle.PicklingError, TypeError) as exc:
+            # The cache is an optimization; failing to fill it must not fail the run.
+            logger.warning("Could not store stage cache entry %s: %s", path.name, exc)
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+    def mark(self, stage: str, result: str) -> None:
+        self.results[stage] = result
+
+    def entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob(f"*{STAGE_CACHE_SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self) -> int:
+        entries = sorted(self.entries(), key=lambda item: item[1].st_mtime_ns)
+        total = sum(stat.st_size for _, stat in entries)
+        evicted = 0
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            evicted += 1
+        return evicted
+
+    def close(self) -> None:
+        evicted = self.evict()
+        if evicted:
+            logger.info("Evicted %s stage cache entries from %s", evicted, self.directory)
+        try:
+            self.digests.save()
+        except OSError as exc:
+            logger.warning("Could not save stage cache digests: %s", exc)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"dir": str(self.directory), "stages": dict(self.results)}
@@ -0,0 +1,35 @@
+"""Wave OS subcommand implementations, imported by ``waveos.cli`` on dispatch.
+
+Commands are split by weight: ``pipeline`` loads models, policy, scoring and
+reporting, while ``ops`` and ``common`` import their dependencies inside each
+command. Names resolve lazily so dispatching ``waveos cleanup`` never imports
+the pipeline.
+"""
+
+from __future__ import annotations
+
+from waveos._lazy import lazy_exports
+
+_EXPORTS = {
+    "cmd_sim": "waveos.commands.pipeline",
+    "cmd_baseline": "waveos.commands.pipeline",
+    "cmd_run": "waveos.commands.pipeline",
+    "cmd_schedule": "waveos.commands.pipeline",
+    "cmd_serve": "waveos.commands.pipeline",
+    "cmd_load_test": "waveos.commands.pipeline",
+    "cmd_profile": "waveos.commands.pipeline",
+    "_execute_run": "waveos.commands.pipeline",
+    "cmd_report": "waveos.commands.ops",
+    "cmd_supervise": "waveos.commands.ops",
+    "cmd_backtest": "waveos.commands.ops",
+    "cmd_bench": "waveos.commands.ops",
+    "cmd_cleanup": "waveos.commands.ops",
+    "cmd_proxy_serve": "waveos.commands.ops",
+    "cmd_metrics_serve": "waveos.commands.ops",
+    "cmd_validate_telemetry": "waveos.commands.ops",
+    "cmd_bundle_build": "waveos.commands.ops",
+    "cmd_bundle_install": "waveos.commands.ops",
+    "cmd_bundle_rollback": "waveos.commands.ops",
+}
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,89 @@
+"""Helpers shared by the subcommand modules; kept free of heavy imports."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List
+
+from waveos.utils import get_logger, utc_now
+from waveos.utils.audit import append_audit
+from waveos.utils.auth import TokenAuth, load_token_roles_from_config, load_token_roles_from_env
+from waveos.utils.rbac import Permission, Principal, Role, authorize
+
+if TYPE_CHECKING:
+    from waveos.normalize import SampleCache
+    from waveos.utils import WaveOSConfig
+
+logger = get_logger("waveos.cli")
+
+
+class _Console:
+    """Defers importing rich until a command actually prints."""
+
+    _console: Any = None
+
+    def print(self, *args: Any, **kwargs: Any) -> None:
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        self._console.print(*args, **kwargs)
+
+
+console = _Console()
+
+
+def _find_telemetry_files(in_dir: Path) -> List[Path]:
+    candidates = list(in_dir.glob("telemetry.*"))
+    if not candidates:
+        candidates = list(in_dir.glob("*.jsonl")) + list(in_dir.glob("*.json"))
+    return candidates
+
+
+def _sample_cache(config: WaveOSConfig | None) -> SampleCache | None:
+    if not (config and config.sample_cache_dir):
+        return None
+    from waveos.normalize import SampleCache
+
+    return SampleCache(Path(config.sample_cache_dir))
+
+
+def _authorize(args: argparse.Namespace, permission: Permission, action: str | None = None) -> bool:
+    token = args.token or None
+    config = getattr(args, "config_obj", None)
+    token_roles = {}
+    if config:
+        token_roles.update(load_token_roles_from_config(config.auth_tokens))
+    token_roles.update(load_token_roles_from_env())
+    principal: Principal | None = None
+    if token_roles:
+        principal = TokenAuth(token_roles).authenticate(token)
+    if not principal:
+        principal_name = "local-user"
+        role = Role(args.role)
+        principal = Principal(name=principal_name, role=role)
+    allowed = authorize(principal, permission)
+    logger.info(
+        "authz principal=%s role=%s permission=%s allowed=%s",
+        principal.name,
+        principal.role.value,
+        permission.value,
+        allowed,
+    )
+    config = getattr(args, "config_obj", None)
+    if config and config.audit_enabled and config.audit_log_path:
+        append_audit(
+            Path(config.audit_log_path),
+            {
+                "timestamp": utc_now().isoformat(),
+                "action": action or "access_attempt",
+                "principal": principal.name,
+                "role": principal.role.value,
+                "permission": permission.value,
+                "allowed": allowed,
+            },
+            max_bytes=config.audit_max_bytes,
+            max_files=config.audit_max_files,
+        )
+    return allowed
@@ -0,0 +1,249 @@
+"""Operational subcommands: reports, maintenance, bundles and tooling.
+
+Each command imports what it needs when it runs, so ``waveos cleanup`` and
+friends do not load the pipeline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timezone
+from pathlib import Path
+from uuid import uuid4
+
+from waveos.commands.common import _authorize, _sample_cache, console, logger
+from waveos.utils import read_json, read_jsonl, utc_now, write_json
+from waveos.utils.rbac import Permission
+
+
+def cmd_report(args: argparse.Namespace) -> int:
+    if not _authorize(args, Permission.VIEW_REPORTS, action="report"):
+        console.print("Access denied: view_reports required")
+        return 3
+    from waveos.reporting import render_report
+
+    out_dir = Path(args.input)
+    health_path = out_dir / "health_summary.json"
+    events_path = out_dir / "events.jsonl"
+    actions_path = out_dir / "actions.json"
+    health_payload = read_json(health_path)
+    events_payload = read_jsonl(events_path)
+    actions_payload = read_json(actions_path)
+    config = getattr(args, "config_obj", None)
+    report_path = render_report(
+        out_dir,
+        health_payload,
+        events_payload,
+        actions_payload,
+        mode=config.report_mode if config else "full",
+        top_n=config.report_top_n if config else 100,
+        page_size=config.report_page_size if config else 5000,
+    )
+    console.print(f"Report written to {report_path}")
+    if args.open:
+        import webbrowser
+
+        webbrowser.open(report_path.resolve().as_uri())
+    return 0
+
+
+def cmd_supervise(args: argparse.Namespace) -> int:
+    if not args.command:
+        console.print("Missing command to supervise.")
+        return 2
+    from waveos.utils.supervisor import supervise
+
+    return supervise(args.command, max_restarts=args.max_restarts, backoff_seconds=args.backoff)
+
+
+def cmd_backtest(args: argparse.Namespace) -> int:
+    if not _authorize(args, Permission.VIEW_REPORTS, action="backtest"):
+        console.print("Access denied: view_reports required")
+        return 3
+    from pydantic import ValidationError
+
+    from waveos.backtest import conflicting_rule_ids, run_backtest
+    from waveos.utils import load_config, parse_timestamp
+
+    live = getattr(args, "config_obj", None)
+    config = live
+    if args.policy:
+        try:
+            config = load_config(Path(args.policy), include_env=False)
+        except (ValidationError, ValueError, OSError) as exc:
+            console.print(f"Invalid policy configuration: {exc}")
+            return 2
+        if live and live.policy_rules:
+            conflicts = conflicting_rule_ids(live.policy_rules, config.policy_rules)
+            if conflicts:
+                # Coverage is keyed by rule id, so it would read as the live rule's coverage.
+                console.print(f"Warning: candidate redefines live rule ids {', '.join(conflicts)}; coverage is the candidate's")
+                logger.warning("Backtest candidate redefines live rule ids: %s", conflicts)
+    since = None
+    if getattr(args, "since", None):
+        try:
+            started = parse_timestamp(args.since)
+        except ValueError:
+            console.print(f"Invalid --since timestamp: {args.since}")
+            return 2
+        since = (started if started.tzinfo else started.replace(tzinfo=timezone.utc)).timestamp()
+    elif getattr(args, "days", None) is not None:
+        since = time.time() - args.days * 86400
+    try:
+        summary = run_backtest(
+            Path(args.runs),
+            config.policy_rules if config else [],
+            feature_flags=config.feature_flags if config else {},
+            workers=args.workers,
+            since=since,
+        )
+    except ValueError as exc:
+        console.print(f"Invalid policy configuration: {exc}")
+        return 2
+    write_json(Path(args.out), summary)
+    console.print(
+        f"Backtested {summary['run_count']} runs: actions={summary['action_counts']} flap_rate={summary['flap_rate']:.3f}"
+    )
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    from waveos.bench import run_bench
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+        payload = run_bench(args.suite, sizes=sizes, repeat=args.repeat)
+    except ValueError as exc:
+        console.print(str(exc))
+        return 2
+    out_path = Path(args.out)
+    write_json(out_path, payload)
+    for result in payload["results"]:
+        console.print(result)
+    console.print(f"Bench report written to {out_path}")
+    return 0
+
+
+def cmd_cleanup(args: argparse.Namespace) -> int:
+    base = Path(args.path)
+    if not base.exists():
+        console.print("Cleanup path does not exist.")
+        return 2
+    cutoff = utc_now().timestamp() - (args.days * 86400)
+    deleted = 0
+    for path in base.rglob("*"):
+        if path.is_file():
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                deleted += 1
+    console.print(f"Deleted {deleted} files older than {args.days} days from {base}")
+    return 0
+
+
+def cmd_proxy_serve(args: argparse.Namespace) -> int:
+    logger.info("Proxy serve running; press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Proxy serve stopped.")
+    return 0
+
+
+def cmd_metrics_serve(args: argparse.Namespace) -> int:
+    logger.info("Metrics serve running; press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Metrics serve stopped.")
+    return 0
+
+
+def cmd_validate_telemetry(args: argparse.Namespace) -> int:
+    from waveos.validation import validate_file
+
+    config = getattr(args, "config_obj", None)
+    result = validate_file(
+        Path(args.input), args.profile, Path(args.output) if args.output else None, sample_cache=_sample_cache(config)
+    )
+    console.print(result)
+    return 0
+
+
+def cmd_bundle_build(args: argparse.Namespace) -> int:
+    from waveos.bundle import build_manifest, sign_manifest, write_manifest
+    from waveos.utils.secrets import get_secret
+    from waveos.versioning import current_version
+
+    bundle_dir = Path(args.dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    config = getattr(args, "config_obj", None)
+    waveos_version = config.waveos_version if config and config.waveos_version else current_version()
+    policy_version = args.policy_version or (config.policy_version if config else "policy-1")
+    bundle_id = args.bundle_id or (config.bundle_id if config else None)
+    if not bundle_id:
+        bundle_id = f"bundle-{uuid4().hex[:8]}"
+    identity = None
+    if args.device_id or args.app_id:
+        identity = {"device_id": args.device_id, "app_id": args.app_id}
+    feature_flags = config.feature_flags if config else {}
+    manifest = build_manifest(
+        bundle_dir,
+        waveos_version,
+        policy_version,
+        bundle_id,
+        identity=identity,
+        environment=args.environment,
+        feature_flags=feature_flags,
+    )
+    manifest_path = write_manifest(bundle_dir, manifest)
+    if args.sign:
+        hmac_key = None
+        if config and config.bundle_hmac_key_secret:
+            hmac_key = get_secret(config.bundle_hmac_key_secret, provider=config.secrets_provider)
+        if not hmac_key:
+            console.print("Missing bundle HMAC key; set WAVEOS_BUNDLE_HMAC_KEY_SECRET")
+            return 2
+        sign_manifest(manifest_path, hmac_key)
+    console.print(f"Wrote bundle manifest to {manifest_path}")
+    return 0
+
+
+def cmd_bundle_install(args: argparse.Namespace) -> int:
+    from waveos.update_agent import install_bundle
+    from waveos.utils.secrets import get_secret
+
+    config = getattr(args, "config_obj", None)
+    if not config:
+        console.print("Missing configuration")
+        return 2
+    hmac_key = None
+    if config.bundle_hmac_key_secret:
+        hmac_key = get_secret(config.bundle_hmac_key_secret, provider=config.secrets_provider)
+    install_bundle(
+        Path(args.dir),
+        Path(config.bundle_active_dir),
+        Path(config.bundle_history_dir),
+        Path(config.bundle_state_dir),
+        hmac_key=hmac_key,
+    )
+    console.print("Bundle installed")
+    return 0
+
+
+def cmd_bundle_rollback(args: argparse.Namespace) -> int:
+    from waveos.update_agent import rollback_bundle
+
+    config = getattr(args, "config_obj", None)
+    if not config:
+        console.print("Missing configuration")
+        return 2
+    rollback_bundle(
+        Path(config.bundle_active_dir),
+        Path(config.bundle_history_dir),
+        Path(config.bundle_state_dir),
+    )
+    console.print("Bundle rolled back")
+    return 0
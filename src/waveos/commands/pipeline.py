@@ -0,0 +1,1109 @@
+"""Pipeline subcommands: sim, baseline, run (single site or manifest), schedule and serve."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from waveos.actuators import MockActuator
+from waveos.collectors import load_records
+from waveos.models import ActionRecommendation, Event, EventLevel, HealthScore, HealthStatus, RunStats, TelemetrySample
+from waveos.normalize import (
+    CounterState,
+    NormalizedFile,
+    ResampledTelemetry,
+    counters_to_deltas,
+    normalize_file,
+    normalize_records,
+    resample,
+)
+from waveos.normalize.sample_cache import MAX_STORED_ERRORS, SampleCache, cacheable_records
+from waveos.policy import (
+    ActionDiff,
+    ActionStateStore,
+    ScoreColumns,
+    ShadowPolicy,
+    evaluate_shadow_policies,
+    load_shadow_policies,
+    recommend_actions,
+    recommend_actions_batch,
+)
+from waveos.commands.common import _authorize, _find_telemetry_files, _sample_cache, console, logger
+from waveos.backtest import append_run_index
+from waveos.cache import STAGE_CACHE_SCHEMA, StageCache, stage_key
+from waveos.daemon import PipelineDaemon, WarmState, load_baseline_map
+from waveos.executor import Stage, StagedExecutor
+from waveos.reporting import write_outputs
+from waveos.scoring import ChangePointAlarm, ChangePointDetector, apply_changepoint_alarms, build_stats, score_links
+from waveos.sim import build_demo_dataset
+from waveos.topology import PathEngine, PathOverlay, TopologyIndex, load_topology, rollup_scores
+from waveos.versioning import current_version
+from waveos.recovery import RecoveryOrchestrator, watchdog_ping
+from waveos.runstate import EXIT_INTERRUPTED, RunInterrupted, RunState, file_identity
+from waveos.utils import (
+    DIGEST_CACHE_NAME,
+    DigestCache,
+    WriteSession,
+    read_json,
+    should_shutdown,
+    write_json,
+    write_jsonl,
+    AlertRoute,
+    route_alerts,
+    Permission,
+    utc_now,
+    parse_timestamp,
+    get_secret,
+    config_fingerprint,
+    collect_system_metrics,
+    WaveOSConfig,
+)
+from pydantic import ValidationError
+
+
+def _load_samples(in_dir: Path, run_id: str | None = None, config: WaveOSConfig | None = None):
+    samples = []
+    files = _find_telemetry_files(in_dir)
+    if not files:
+        return samples
+    cache = _sample_cache(config)
+    options = {
+        "cache": cache,
+        "run_id": run_id,
+        "max_failures": config.breaker_max_failures if config else None,
+        "reset_after": config.breaker_reset_after if config else None,
+    }
+    threads = config.collector_threads if config else 1
+    if threads <= 1:
+        for path in files:
+            if should_shutdown():
+                return samples
+            samples.extend(normalize_file(path, **options).samples)
+        return samples
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {executor.submit(normalize_file, path, **options): path for path in files}
+        for future in as_completed(futures):
+            if should_shutdown():
+                return samples
+            samples.extend(future.result().samples)
+    return samples
+
+
+# A collected batch: (file index, record offset), raw records or a cached file, and the
+# (path, stat, cacheable, batch count) identity used to checkpoint and cache the file once
+# every one of its batches is normalized.
+_Batch = Tuple[Tuple[int, int], Any, Optional[Tuple[Path, os.stat_result, bool, int]]]
+
+
+def _merge_file_parts(parts: List[_Batch]) -> NormalizedFile:
+    parts = sorted(parts, key=lambda item: item[0])
+    return NormalizedFile(
+        samples=[sample for _, part, _ in parts for sample in part.samples],
+        record_count=sum(part.record_count for _, part, _ in parts),
+        rejected=sum(part.rejected for _, part, _ in parts),
+        errors=[error for _, part, _ in parts for error in part.errors][:MAX_STORED_ERRORS],
+    )
+
+
+def _run_map(records: Iterable[dict]) -> Dict[str, RunStats]:
+    stats = [RunStats(**record) for record in records]
+    return {entry.entity_id: entry for entry in stats}
+
+
+def _build_events(scores: Iterable[HealthScore], run_id: str | None = None) -> List[Event]:
+    events: List[Event] = []
+    for score in scores:
+        if score.status == HealthStatus.PASS:
+            continue
+        level = EventLevel.WARN if score.status == HealthStatus.WARN else EventLevel.ERROR
+        events.append(
+            Event(
+                timestamp=score.window_end,
+                level=level,
+                message=f"{score.entity_type} {score.entity_id} {score.status} drivers={','.join(score.drivers)}",
+                entity_type=score.entity_type,
+                entity_id=score.entity_id,
+                details={"drivers": score.drivers, "score": score.score, "run_id": run_id},
+            )
+        )
+    return events
+
+
+def _build_changepoint_events(alarms: Iterable[ChangePointAlarm], run_id: str | None = None) -> List[Event]:
+    events: List[Event] = []
+    for alarm in alarms:
+        events.append(
+            Event(
+                timestamp=alarm.timestamp,
+                level=EventLevel.WARN,
+                message=f"link {alarm.entity_id} changepoint metric={alarm.metric} direction={alarm.direction}",
+                entity_type="link",
+                entity_id=alarm.entity_id,
+                details={"run_id": run_id, **alarm.to_dict()},
+            )
+        )
+    return events
+
+
+def _attach_entity_labels(scores: Iterable[HealthScore], in_dir: Path) -> None:
+    labels_path = in_dir / "labels.json"
+    if not labels_path.exists():
+        return
+    labels = read_json(labels_path)
+    for score in scores:
+        entity_labels = labels.get(score.entity_id)
+        if entity_labels:
+            score.details["labels"] = entity_labels
+
+
+def _resample_if_configured(samples: List[TelemetrySample], config: WaveOSConfig | None) -> ResampledTelemetry | None:
+    if not config or not config.resample_interval_seconds:
+        return None
+    return resample(samples, config.resample_interval_seconds, max_fill_bins=config.resample_max_fill_bins)
+
+
+def _detect_changepoints(
+    samples: List[TelemetrySample],
+    config: WaveOSConfig,
+    resampled: ResampledTelemetry | None = None,
+) -> List[ChangePointAlarm]:
+    state_path = Path(config.changepoint_state_path) if config.changepoint_state_path else None
+    detector = ChangePointDetector.load(
+        state_path,
+        alpha=config.changepoint_alpha,
+        drift=config.changepoint_drift,
+        threshold=config.changepoint_threshold,
+        warmup=config.changepoint_warmup,
+    )
+    alarms = detector.observe_resampled(resampled) if resampled is not None else detector.observe_all(samples)
+    if state_path:
+        detector.save(state_path)
+    return alarms
+
+
+def _build_action_events(actions: Iterable[ActionRecommendation], run_id: str | None = None) -> List[Event]:
+    events: List[Event] = []
+    for action in actions:
+        events.append(
+            Event(
+                timestamp=utc_now(),
+                level=EventLevel.INFO,
+                message=f"action={action.action} entity={action.entity_type}:{action.entity_id}",
+                entity_type=action.entity_type,
+                entity_id=action.entity_id,
+                details={"action": action.action, "run_id": run_id, "rationale": action.rationale},
+            )
+        )
+    return events
+
+
+def _aggregate_run_metrics(stats: Iterable[RunStats]) -> dict:
+    totals: dict[str, float] = {}
+    counts: dict[str, int] = {}
+    for stat in stats:
+        for metric, value in stat.metrics.items():
+            totals[metric] = totals.get(metric, 0.0) + float(value)
+            counts[metric] = counts.get(metric, 0) + 1
+    averages = {metric: totals[metric] / max(counts[metric], 1) for metric in totals}
+    return averages
+
+
+# Config fields read by the policy stage; anything else can change without invalidating cached actions.
+_POLICY_CONFIG_FIELDS = {
+    "feature_flags",
+    "policy_rules",
+    "policy_batch_mode",
+    "policy_version",
+    "topology_rollups",
+    "reroute_paths_enabled",
+    "reroute_path_k",
+}
+
+
+def _stage_cache_keys(
+    cache: StageCache,
+    config: WaveOSConfig,
+    in_dir: Path,
+    baseline_path: Path,
+    shadow_policies: List[ShadowPolicy],
+) -> Dict[str, str | None]:
+    # Each key chains its upstream key, so a change invalidates that stage and everything after it.
+    telemetry = _find_telemetry_files(in_dir)
+    side_inputs = sorted(path for path in in_dir.iterdir() if path.is_file() and path not in telemetry)
+    samples = stage_key("samples", STAGE_CACHE_SCHEMA, current_version(), cache.fingerprint(telemetry))
+    aggregate = None
+    if not config.cumulative_counters:
+        aggregate = stage_key("aggregate", samples, config.resample_interval_seconds, config.resample_max_fill_bins)
+    scores = None
+    if aggregate and not config.changepoint_enabled:
+        # Side inputs cover labels.json here and the topology files read by the policy stage.
+        scores = stage_key("scores", aggregate, cache.fingerprint([baseline_path]), cache.fingerprint(side_inputs))
+    actions = None
+    if scores:
+        shadows = [
+            (shadow.source, cache.fingerprint([Path(shadow.source)]), shadow.policy_version, shadow.feature_flags)
+            for shadow in shadow_policies
+        ]
+        actions = stage_key("actions", scores, config.model_dump(include=_POLICY_CONFIG_FIELDS), shadows)
+    keys = {"samples": samples, "aggregate": aggregate, "scores": scores, "actions": actions}
+    for stage, key in keys.items():
+        if key is None:
+            cache.mark(stage, "bypass")
+    return keys
+
+
+def _render_console_summary(scores: Iterable[HealthScore]) -> None:
+    from rich.table import Table
+
+    table = Table(title="Wave OS Health Summary")
+    table.add_column("Entity")
+    table.add_column("Status")
+    table.add_column("Score")
+    table.add_column("Drivers")
+    for score in scores:
+        table.add_row(
+            f"{score.entity_type}:{score.entity_id}",
+            score.status,
+            f"{score.score:.1f}",
+            ", ".join(score.drivers),
+        )
+    console.print(table)
+
+
+def cmd_sim(args: argparse.Namespace) -> int:
+    out_dir = Path(args.out)
+    baseline_dir, run_dir = build_demo_dataset(out_dir)
+    console.print(f"Generated baseline data in {baseline_dir}")
+    console.print(f"Generated run data in {run_dir}")
+    return 0
+
+
+def cmd_baseline(args: argparse.Namespace) -> int:
+    if not _authorize(args, Permission.RUN_PIPELINE, action="baseline"):
+        console.print("Access denied: run_pipeline required")
+        return 3
+    in_dir = Path(args.input)
+    config = getattr(args, "config_obj", None)
+    samples = _load_samples(in_dir, config=config)
+    if should_shutdown():
+        console.print("Baseline interrupted before all telemetry was read; nothing written")
+        return EXIT_INTERRUPTED
+    if config and config.cumulative_counters:
+        samples = counters_to_deltas(samples, widths=config.counter_width_bits)
+    resampled = _resample_if_configured(samples, config)
+    baseline_stats, _ = build_stats(samples, resampled)
+    payload = [stat.model_dump() for stat in baseline_stats]
+    digests = DigestCache(in_dir / DIGEST_CACHE_NAME) if config and config.output_skip_unchanged else None
+    with WriteSession(config.output_durability if config else "none", digests=digests) as session:
+        write_json(in_dir / "baseline.json", payload, session)
+        if not (config and config.sample_cache_dir):
+            # Kept for inspection when there is no sample cache; rebuilds read the cache instead.
+            write_jsonl(in_dir / "normalized.jsonl", [s.model_dump() for s in samples], session)
+        if config:
+            write_json(in_dir / "config_fingerprint.json", {"fingerprint": config_fingerprint(config)}, session)
+    if session.skipped_files:
+        logger.info("Baseline outputs unchanged: skipped %s files (%s bytes)", session.skipped_files, session.skipped_bytes)
+    if config and config.changepoint_enabled:
+        # Prime detector state with baseline behaviour so the first drifted run sample can alarm.
+        _detect_changepoints(samples, config, resampled)
+    console.print(f"Wrote baseline stats to {in_dir / 'baseline.json'}")
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    if not _authorize(args, Permission.RUN_PIPELINE, action="run"):
+        console.print("Access denied: run_pipeline required")
+        return 3
+    resume = getattr(args, "resume", None)
+    if resume:
+        config = getattr(args, "config_obj", None)
+        if getattr(args, "manifest", None) or not (config and config.run_state_dir):
+            console.print("--resume requires run_state_dir and cannot be combined with --manifest")
+            return 2
+        try:
+            state = RunState.load(Path(config.run_state_dir), resume).state
+        except (ValueError, OSError) as exc:
+            console.print(f"Cannot resume run: {exc}")
+            return 2
+        # Inputs default to the interrupted run's; explicit ones must match them.
+        args.input = args.input or state["input_dir"]
+        args.baseline = args.baseline or state["baseline_dir"]
+        args.output = args.output or state["output_dir"]
+    if getattr(args, "manifest", None):
+        return _run_manifest(args)
+    if not (args.input and args.baseline and args.output):
+        console.print("run requires --in, --baseline and --out (or --manifest)")
+        return 2
+    return _execute_run(args)
+
+
+def _run_manifest(args: argparse.Namespace) -> int:
+    from waveos.fanout import load_manifest, run_fanout
+
+    manifest_path = Path(args.manifest)
+    try:
+        jobs = load_manifest(manifest_path)
+        # Fail fast on a bad shared shadow config instead of once per site.
+        load_shadow_policies(args.shadow_config or [])
+    except (ValidationError, ValueError, OSError) as exc:
+        console.print(f"Invalid manifest: {exc}")
+        return 2
+    config = getattr(args, "config_obj", None)
+    workers = args.workers or (config.fanout_workers if config and config.fanout_workers else os.cpu_count() or 1)
+    summary = run_fanout(
+        jobs,
+        {"role": args.role, "token": args.token, "shadow_config": []},
+        workers=workers,
+        config=config,
+        shared_shadows=args.shadow_config or [],
+    )
+    summary_path = (Path(args.output) if args.output else manifest_path.parent) / "fanout_summary.json"
+    write_json(summary_path, summary)
+    console.print(
+        f"Fan-out finished: {summary['ok_count']}/{summary['site_count']} sites ok in {summary['seconds']:.2f}s; summary at {summary_path}"
+    )
+    for name in summary["failed"]:
+        console.print(f"Site failed: {name}")
+    return 1 if summary["failed"] else 0
+
+
+@dataclass
+class RunContext:
+    """Inputs and shared state of one run, threaded explicitly through every pipeline stage."""
+
+    args: argparse.Namespace
+    config: WaveOSConfig | None
+    run_id: str
+    started_at: datetime
+    in_dir: Path
+    # Moves into a run-id subdirectory when idempotent outputs find an earlier run there.
+    out_dir: Path
+    baseline_dir: Path
+    # With warm state (serve), baseline, fingerprints and shadow policies come from memory instead of disk.
+    warm: WarmState | None = None
+    run_fp: str | None = None
+    shadow_policies: List[ShadowPolicy] = field(default_factory=list)
+    run_state: RunState | None = None
+    # Stages completed by an earlier attempt of this run, in pipeline order.
+    restored: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    sample_cache: SampleCache | None = None
+    stage_cache: StageCache | None = None
+    keys: Dict[str, str | None] = field(default_factory=dict)
+    cached_aggregate: Dict[str, Any] | None = None
+    cached_samples: List[TelemetrySample] | None = None
+    # Change-point detection is the only consumer of raw samples downstream of aggregate.
+    need_samples: bool = True
+    # Set when an ingested file has records without a timestamp, which are stamped at ingest
+    # time, or comes from a run checkpoint of unknown provenance. Stage keys cover only file
+    # digests, so such a run must not read or write the samples or anything chained to them.
+    uncacheable_input: threading.Event = field(default_factory=threading.Event)
+    ingest_interrupted: threading.Event = field(default_factory=threading.Event)
+    ingest_lock: threading.Lock = field(default_factory=threading.Lock)
+    # Where each telemetry file came from: "sample_cache", "checkpoint" or "read".
+    file_sources: Counter = field(default_factory=Counter)
+    pending_files: Dict[int, List[_Batch]] = field(default_factory=dict)
+    # Set by _build_executor; the output stage reports its stage stats and queue depths.
+    executor: StagedExecutor | None = None
+
+    @property
+    def baseline_path(self) -> Path:
+        return self.baseline_dir / "baseline.json"
+
+    @property
+    def changepoint_enabled(self) -> bool:
+        return bool(self.config and self.config.changepoint_enabled)
+
+    @property
+    def batch_size(self) -> int:
+        return self.config.pipeline_batch_size if self.config else 10000
+
+    def cached(self, stage: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        key = self.keys.get(stage)
+        if self.stage_cache is None or key is None:
+            return compute()
+        value = self.stage_cache.get(stage, key)
+        if value is None:
+            value = compute()
+            self.stage_cache.put(stage, key, value)
+        return value
+
+    def bypass_stage_cache(self) -> None:
+        for stage, key in self.keys.items():
+            if key is not None:
+                self.keys[stage] = None
+                self.stage_cache.mark(stage, "bypass")
+
+    def checkpoint(self, stage: str, value: Dict[str, Any], stop: bool = True) -> None:
+        if self.run_state:
+            self.run_state.checkpoint(stage, value)
+        # Stopping here leaves nothing half-scored: a resumed attempt picks up at the next stage.
+        if stop and should_shutdown():
+            raise RunInterrupted(stage)
+
+
+def _prepare_run(args: argparse.Namespace, warm: WarmState | None = None) -> RunContext | int:
+    """Opens run state and caches for a run; returns an exit code instead when it cannot start."""
+    in_dir = Path(args.input)
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    resume_id = getattr(args, "resume", None)
+    ctx = RunContext(
+        args=args,
+        config=getattr(args, "config_obj", None),
+        run_id=resume_id or f"run-{uuid4().hex[:8]}",
+        started_at=utc_now(),
+        in_dir=in_dir,
+        out_dir=out_dir,
+        baseline_dir=Path(args.baseline),
+        warm=warm,
+    )
+    config = ctx.config
+    if config:
+        ctx.run_fp = warm.config_fingerprint if warm else config_fingerprint(config)
+        fp_path = ctx.baseline_dir / "config_fingerprint.json"
+        if warm or fp_path.exists():
+            baseline_fp = warm.baseline_fingerprint if warm else read_json(fp_path).get("fingerprint")
+            if baseline_fp and baseline_fp != ctx.run_fp:
+                logger.warning("Config drift detected between baseline and run.")
+                write_json(out_dir / "config_drift.json", {"baseline": baseline_fp, "run": ctx.run_fp})
+    if warm is None and not ctx.baseline_path.exists():
+        console.print(f"Missing baseline.json in {ctx.baseline_dir}")
+        return 1
+    if warm is not None:
+        ctx.shadow_policies = warm.shadow_policies
+    else:
+        try:
+            ctx.shadow_policies = load_shadow_policies(getattr(args, "shadow_config", None) or [])
+        except (ValidationError, ValueError, OSError) as exc:
+            console.print(f"Invalid shadow configuration: {exc}")
+            return 2
+    if config and config.run_state_dir:
+        state_meta = {
+            "input_dir": str(in_dir),
+            "baseline_dir": str(ctx.baseline_dir),
+            "output_dir": str(out_dir),
+            "config_fingerprint": ctx.run_fp,
+            "baseline": file_identity(ctx.baseline_path),
+        }
+        try:
+            if resume_id:
+                ctx.run_state = RunState.load(Path(config.run_state_dir), resume_id)
+                if ctx.run_state.state["status"] == "complete":
+                    console.print(f"Run {ctx.run_id} already completed; nothing to resume")
+                    return 0
+                ctx.run_state.resume(state_meta)
+            else:
+                ctx.run_state = RunState.create(Path(config.run_state_dir), ctx.run_id, state_meta)
+        except (ValueError, OSError) as exc:
+            console.print(f"Cannot open run state: {exc}")
+            return 2
+        ctx.started_at = parse_timestamp(ctx.run_state.state["started_at"])
+        for stage in ("aggregate", "score", "policy"):
+            value = ctx.run_state.restore(stage)
+            if value is None:
+                break
+            ctx.restored[stage] = value
+    ctx.sample_cache = _sample_cache(config)
+    if config and config.stage_cache_dir and in_dir.is_dir() and "aggregate" not in ctx.restored:
+        ctx.stage_cache = StageCache(Path(config.stage_cache_dir), max_bytes=config.stage_cache_max_bytes)
+        ctx.keys = _stage_cache_keys(ctx.stage_cache, config, in_dir, ctx.baseline_path, ctx.shadow_policies)
+    if ctx.stage_cache and ctx.keys["aggregate"]:
+        ctx.cached_aggregate = ctx.stage_cache.get("aggregate", ctx.keys["aggregate"])
+    ctx.need_samples = "aggregate" not in ctx.restored and (ctx.cached_aggregate is None or ctx.changepoint_enabled)
+    if ctx.stage_cache:
+        if ctx.need_samples:
+            ctx.cached_samples = ctx.stage_cache.get("samples", ctx.keys["samples"])
+        else:
+            ctx.stage_cache.mark("samples", "unused")
+    return ctx
+
+
+def _telemetry_tasks(ctx: RunContext) -> Iterator[Tuple[int, Path]]:
+    if ctx.cached_samples is not None or not ctx.need_samples:
+        return
+    for idx, path in enumerate(_find_telemetry_files(ctx.in_dir)):
+        if should_shutdown():
+            ctx.ingest_interrupted.set()
+            return
+        yield idx, path
+
+
+def _collect_stage(ctx: RunContext, task: Tuple[int, Path]) -> Iterator[_Batch]:
+    idx, path = task
+    # Queued files are skipped on shutdown; files already being read finish and are checkpointed.
+    if should_shutdown():
+        ctx.ingest_interrupted.set()
+        return
+    config = ctx.config
+    for origin, store in (("checkpoint", ctx.run_state.files if ctx.run_state else None), ("sample_cache", ctx.sample_cache)):
+        hit = store.load(path) if store is not None else None
+        if hit is not None:
+            if origin == "checkpoint":
+                ctx.uncacheable_input.set()
+            with ctx.ingest_lock:
+                ctx.file_sources[origin] += 1
+            yield (idx, 0), hit, None
+            return
+    stat = path.stat()
+    records = load_records(
+        path,
+        max_failures=config.breaker_max_failures if config else None,
+        reset_after=config.breaker_reset_after if config else None,
+    )
+    with ctx.ingest_lock:
+        ctx.file_sources["read"] += 1
+    cacheable = (ctx.sample_cache is not None or ctx.stage_cache is not None) and cacheable_records(records)
+    if ctx.stage_cache is not None and not cacheable:
+        ctx.uncacheable_input.set()
+    source = None
+    if ctx.sample_cache is not None or ctx.run_state is not None:
+        source = (path, stat, ctx.sample_cache is not None and cacheable, -(-len(records) // ctx.batch_size))
+    # Batches let normalization start on a large file while the collector moves on to the next one.
+    for offset in range(0, len(records), ctx.batch_size):
+        yield (idx, offset), records[offset : offset + ctx.batch_size], source
+
+
+def _file_normalized(ctx: RunContext, batch: _Batch) -> None:
+    (idx, _), _, source = batch
+    if source is None:
+        return
+    path, stat, cacheable, batch_count = source
+    # Batches of one file may be normalized by different workers; the last one in stores the file.
+    with ctx.ingest_lock:
+        parts = ctx.pending_files.setdefault(idx, [])
+        parts.append(batch)
+        if len(parts) < batch_count:
+            return
+        del ctx.pending_files[idx]
+    merged = _merge_file_parts(parts)
+    if cacheable:
+        ctx.sample_cache.store(path, merged, stat)
+    if ctx.run_state:
+        ctx.run_state.files.store(path, merged, stat)
+
+
+def _normalize_stage(ctx: RunContext, batch: _Batch) -> Iterator[_Batch]:
+    key, records, source = batch
+    if isinstance(records, NormalizedFile):
+        yield batch
+        return
+    errors: List[str] = []
+    samples = normalize_records(records, run_id=ctx.run_id, errors=errors)
+    normalized = (key, NormalizedFile(samples, len(records), len(errors), errors[:MAX_STORED_ERRORS]), source)
+    _file_normalized(ctx, normalized)
+    yield normalized
+
+
+def _aggregate_stage(ctx: RunContext, batches: List[_Batch]) -> Iterator[Dict[str, Any]]:
+    if "aggregate" in ctx.restored:
+        yield dict(ctx.restored["aggregate"])
+        return
+    if ctx.ingest_interrupted.is_set():
+        # Never score a partial sample set; completed files are already checkpointed.
+        raise RunInterrupted("ingest")
+    config = ctx.config
+    stage_cache = ctx.stage_cache
+    # Reassemble in file/offset order so results do not depend on worker scheduling.
+    batches = sorted(batches, key=lambda item: item[0])
+    if stage_cache and ctx.uncacheable_input.is_set():
+        ctx.bypass_stage_cache()
+    if ctx.cached_samples is not None:
+        samples = ctx.cached_samples
+    elif ctx.need_samples:
+        samples = [sample for _, part, _ in batches for sample in part.samples]
+        if stage_cache and ctx.keys["samples"]:
+            stage_cache.put("samples", ctx.keys["samples"], samples)
+    else:
+        samples = []
+    if ctx.cached_aggregate is not None:
+        run = {**ctx.cached_aggregate, "samples": samples, "counter_state": None}
+    else:
+        counter_state: CounterState | None = None
+        if config and config.cumulative_counters:
+            counter_state_path = Path(config.counter_state_path) if config.counter_state_path else None
+            counter_state = CounterState.load(counter_state_path, widths=config.counter_width_bits)
+            samples = counters_to_deltas(samples, counter_state)
+            if counter_state_path:
+                counter_state.save(counter_state_path)
+        resampled = _resample_if_configured(samples, config)
+        _, run_stats = build_stats(samples, resampled)
+        aggregated = {"resampled": resampled, "run_stats": run_stats, "sample_count": len(samples)}
+        if stage_cache and ctx.keys["aggregate"]:
+            stage_cache.put("aggregate", ctx.keys["aggregate"], aggregated)
+        run = {**aggregated, "samples": samples, "counter_state": counter_state}
+    ctx.checkpoint("aggregate", {**run, "samples": samples if ctx.changepoint_enabled else []})
+    yield run
+
+
+def _compute_scores(ctx: RunContext, run: Dict[str, Any]) -> Dict[str, Any]:
+    baseline_map = ctx.warm.baseline_map if ctx.warm else load_baseline_map(ctx.baseline_path)
+    run_map = {stat.entity_id: stat for stat in run["run_stats"]}
+    scores = score_links(baseline_map, run_map, run_id=ctx.run_id)
+    changepoint_alarms: List[ChangePointAlarm] = []
+    if ctx.changepoint_enabled:
+        changepoint_alarms = _detect_changepoints(run["samples"], ctx.config, run["resampled"])
+        apply_changepoint_alarms(scores, changepoint_alarms)
+    _attach_entity_labels(scores, ctx.in_dir)
+    return {"scores": scores, "changepoint_alarms": changepoint_alarms}
+
+
+def _score_stage(ctx: RunContext, run: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if "score" in ctx.restored:
+        run.update(ctx.restored["score"])
+    else:
+        scored = ctx.cached("scores", lambda: _compute_scores(ctx, run))
+        run.update(scored)
+        ctx.checkpoint("score", scored)
+    yield run
+
+
+def _recommend(ctx: RunContext, scores: List[HealthScore]) -> Dict[str, Any]:
+    config = ctx.config
+    topology: TopologyIndex | None = None
+    path_engine: PathEngine | PathOverlay | None = None
+    path_k = config.reroute_path_k if config and config.reroute_paths_enabled else None
+    if config and (config.topology_rollups or path_k is not None):
+        if ctx.warm is not None:
+            # Loaded once per topology change; alternates found in earlier cycles are reused.
+            topology, path_engine = ctx.warm.topology(ctx.in_dir, path_k)
+        else:
+            topology = load_topology(ctx.in_dir)
+            if topology and path_k is not None:
+                path_engine = PathEngine(topology, k=path_k)
+    if path_engine is not None:
+        for score in scores:
+            if score.status == HealthStatus.FAIL:
+                path_engine.set_link_state(score.entity_id, up=False)
+    feature_flags = config.feature_flags if config else {}
+    policy_rules = config.policy_plan if config else []
+    if config and config.policy_batch_mode:
+        actions = recommend_actions_batch(
+            ScoreColumns.from_scores(scores),
+            run_id=ctx.run_id,
+            feature_flags=feature_flags,
+            policy_rules=policy_rules,
+            path_engine=path_engine,
+        )
+    else:
+        actions = recommend_actions(
+            scores,
+            run_id=ctx.run_id,
+            feature_flags=feature_flags,
+            policy_rules=policy_rules,
+            path_engine=path_engine,
+        )
+    shadow_diff = None
+    if ctx.shadow_policies:
+        # Shadow versions see exactly the scores the live policy saw and never reach the actuator.
+        shadow_diff = evaluate_shadow_policies(
+            scores,
+            actions,
+            ctx.shadow_policies,
+            run_id=ctx.run_id,
+            policy_version=config.policy_version if config and config.policy_version else "policy-1",
+            path_engine=path_engine,
+        )
+    rollups: List[HealthScore] = []
+    if topology and config.topology_rollups:
+        # Rollups are written to rollups.json on their own and never fed to the link-level policy.
+        rollups = rollup_scores(topology, scores)
+    return {"actions": actions, "shadow_diff": shadow_diff, "rollups": rollups}
+
+
+def _policy_stage(ctx: RunContext, run: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if "policy" in ctx.restored:
+        run.update(ctx.restored["policy"])
+        yield run
+        return
+    config = ctx.config
+    run_id = ctx.run_id
+    scores = run["scores"]
+    decided = ctx.cached("actions", lambda: _recommend(ctx, scores))
+    actions = decided["actions"]
+    shadow_diff = decided["shadow_diff"]
+    if shadow_diff is not None:
+        shadow_diff["run_id"] = run_id
+    events = _build_events(scores, run_id=run_id)
+    events.extend(_build_changepoint_events(run["changepoint_alarms"], run_id=run_id))
+    action_diff: ActionDiff | None = None
+    actuated = actions
+    if config and config.action_state_enabled:
+        # Only changes against the applied state reach the actuator; actions.json stays complete.
+        action_state_path = Path(config.action_state_path) if config.action_state_path else None
+        action_store = ActionStateStore.load(
+            action_state_path,
+            cooldown_seconds=config.action_cooldown_seconds,
+            min_dwell_seconds=config.action_min_dwell_seconds,
+            hysteresis_band=config.action_hysteresis_band,
+        )
+        action_diff = action_store.reconcile(actions, scores, now=ctx.started_at.timestamp())
+        if action_state_path:
+            action_store.save(action_state_path)
+        actuated = action_diff.applied
+    MockActuator().apply(actuated)
+    events.extend(_build_action_events(actions, run_id=run_id))
+    if config and config.enforce_actions:
+        enforced_path = ctx.out_dir / "enforced_actions.jsonl"
+        write_jsonl(enforced_path, [action.model_dump() for action in actuated])
+        events.append(
+            Event(
+                timestamp=utc_now(),
+                level=EventLevel.INFO,
+                message="policy_enforced",
+                details={"run_id": run_id, "action_count": len(actuated)},
+            )
+        )
+    _send_alerts_if_configured(ctx.args, run_id, events)
+    decisions = {
+        "actions": actions,
+        "actuated": actuated,
+        "action_diff": action_diff,
+        "shadow_diff": shadow_diff,
+        "events": events,
+        "rollups": decided["rollups"],
+    }
+    run.update(decisions)
+    # Actions were actuated, so the outputs recording them are written even if shutdown is pending.
+    ctx.checkpoint("policy", decisions, stop=False)
+    yield run
+
+
+def _output_stage(ctx: RunContext, run: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    config = ctx.config
+    run_id = ctx.run_id
+    run_stats = run["run_stats"]
+    scores = run["scores"]
+    rollups = run["rollups"]
+    events = run["events"]
+    actions = run["actions"]
+    counter_state = run["counter_state"]
+    resampled = run["resampled"]
+    write_json(ctx.out_dir / "run_stats.json", [stat.model_dump() for stat in run_stats])
+    explainability_enabled = True
+    if config:
+        explainability_enabled = config.feature_flags.get("explainability", True)
+    waveos_version = config.waveos_version if config and config.waveos_version else current_version()
+    policy_version = config.policy_version if config and config.policy_version else "policy-1"
+    bundle_id = config.bundle_id if config else None
+    telemetry_metrics = _aggregate_run_metrics(run_stats)
+    pipeline = ctx.executor.summary()
+    run_meta = {
+        "run_id": run_id,
+        "waveos_version": waveos_version,
+        "policy_version": policy_version,
+        "bundle_id": bundle_id,
+        "input_dir": str(ctx.in_dir),
+        "baseline_dir": str(ctx.baseline_dir),
+        "output_dir": str(ctx.out_dir),
+        "config_fingerprint": ctx.run_fp if config else None,
+        "sample_count": run["sample_count"],
+        "score_count": len(scores),
+        "rollup_count": len(rollups),
+        "event_count": len(events),
+        "action_count": len(actions),
+        "actuated_action_count": len(run["actuated"]),
+        "action_state": run["action_diff"].counts() if run["action_diff"] else None,
+        "shadow_policy_count": len(ctx.shadow_policies),
+        "changepoint_alarm_count": len(run["changepoint_alarms"]),
+        "counter_discontinuities": counter_state.discontinuities if counter_state else 0,
+        "resample_gap_count": sum(len(series.gaps) for series in resampled.links.values()) if resampled else 0,
+        "started_at": ctx.started_at.isoformat(),
+        "completed_at": utc_now().isoformat(),
+        "enforce_actions": config.enforce_actions if config else False,
+        "recovery_enabled": config.recovery_enabled if config else False,
+        "evidence_pack_enabled": config.evidence_pack_enabled if config else True,
+        "system_metrics": collect_system_metrics(),
+        "telemetry_metrics": telemetry_metrics,
+        # The output stage is still running while it writes this; reaching here means it is healthy.
+        "task_health": {
+            name: "ok" if stats["status"] in {"ok", "running"} else stats["status"]
+            for name, stats in pipeline["stages"].items()
+        },
+        "queue_depths": ctx.executor.queue_depths(),
+        "pipeline": pipeline,
+        "stage_cache": ctx.stage_cache.summary() if ctx.stage_cache else None,
+        "sample_cache": (
+            {"dir": str(ctx.sample_cache.directory), "hits": ctx.file_sources["sample_cache"], "misses": ctx.file_sources["read"]}
+            if ctx.sample_cache
+            else None
+        ),
+        "run_state": ctx.run_state.summary(ctx.file_sources["checkpoint"]) if ctx.run_state else None,
+        "transformations": [
+            {"name": "normalize_records", "schema_version": 1},
+            *([{"name": "counters_to_deltas", "schema_version": 2}] if counter_state else []),
+            *([{"name": "resample", "schema_version": 1}] if resampled else []),
+            {"name": "score_links", "schema_version": 1},
+            {"name": "policy_recommendations", "schema_version": 1},
+        ],
+        "model_versions": {
+            "waveos_version": waveos_version,
+            "policy_version": policy_version,
+        },
+    }
+    if config and config.recovery_enabled:
+        RecoveryOrchestrator(
+            restart_command=config.recovery_restart_command,
+            degrade_command=config.recovery_degrade_command,
+            reboot_command=config.recovery_reboot_command,
+        ).handle_events(events, ctx.out_dir)
+    if config and config.watchdog_enabled and config.watchdog_path:
+        watchdog_ping(Path(config.watchdog_path))
+    if config and config.idempotent_outputs:
+        if (ctx.out_dir / "run_meta.json").exists() or (ctx.out_dir / "report.html").exists():
+            ctx.out_dir = ctx.out_dir / run_id
+            ctx.out_dir.mkdir(parents=True, exist_ok=True)
+    if run["shadow_diff"] is not None:
+        write_json(ctx.out_dir / "shadow_policy_diff.json", run["shadow_diff"])
+    run["report_path"] = write_outputs(
+        ctx.out_dir,
+        scores,
+        events,
+        actions,
+        run_id=run_id,
+        explainability=explainability_enabled,
+        run_meta=run_meta,
+        run_stats=run_stats,
+        evidence_pack_enabled=config.evidence_pack_enabled if config else True,
+        report_mode=config.report_mode if config else "full",
+        report_top_n=config.report_top_n if config else 100,
+        report_page_size=config.report_page_size if config else 5000,
+        evidence_workers=config.evidence_pack_workers if config else 4,
+        evidence_store_dir=Path(config.evidence_store_dir) if config and config.evidence_store_dir else None,
+        output_workers=config.output_workers if config else 4,
+        metrics_format=config.metrics_format if config else "wide",
+        metrics_parquet=config.metrics_parquet if config else False,
+        durability=config.output_durability if config else "none",
+        skip_unchanged=config.output_skip_unchanged if config else False,
+        rollups=rollups if config and config.topology_rollups else None,
+    )
+    append_run_index(Path(ctx.args.output), ctx.out_dir, run_meta)
+    if ctx.run_state:
+        ctx.run_state.complete()
+    yield run
+
+
+def _build_executor(ctx: RunContext) -> StagedExecutor:
+    config = ctx.config
+    stage_workers = config.pipeline_stage_workers if config else {}
+    # collect -> normalize stream per file batch; aggregate is the barrier that needs every sample.
+    ctx.executor = StagedExecutor(
+        [
+            Stage(
+                "collect",
+                partial(_collect_stage, ctx),
+                workers=stage_workers.get("collect", config.collector_threads if config else 1),
+            ),
+            Stage("normalize", partial(_normalize_stage, ctx), workers=stage_workers.get("normalize", 1)),
+            Stage("aggregate", partial(_aggregate_stage, ctx), barrier=True),
+            Stage("score", partial(_score_stage, ctx)),
+            Stage("policy", partial(_policy_stage, ctx)),
+            Stage("output", partial(_output_stage, ctx)),
+        ],
+        queue_size=config.pipeline_queue_size if config else 8,
+    )
+    return ctx.executor
+
+
+def _execute_run(args: argparse.Namespace, warm: WarmState | None = None) -> int:
+    ctx = _prepare_run(args, warm)
+    if isinstance(ctx, int):
+        return ctx
+    run_id = ctx.run_id
+    try:
+        (run,) = _build_executor(ctx).run(_telemetry_tasks(ctx))
+    except RunInterrupted as exc:
+        logger.warning("Run %s interrupted during %s", run_id, exc.stage)
+        if ctx.run_state:
+            ctx.run_state.interrupted(exc.stage)
+            console.print(f"Run {run_id} interrupted during {exc.stage}; resume with: waveos run --resume {run_id}")
+        else:
+            console.print(f"Run {run_id} interrupted during {exc.stage}; partial data was not scored")
+        return EXIT_INTERRUPTED
+    finally:
+        if ctx.stage_cache:
+            ctx.stage_cache.close()
+    _render_console_summary(run["scores"])
+    console.print(f"Report written to {run['report_path']}")
+    console.print(f"Run ID: {run_id}")
+    return 0
+
+
+def _pipeline_daemon(
+    args: argparse.Namespace,
+    output_for_cycle: Callable[[int], Path],
+    interval_seconds: float,
+    watch_inputs: bool = False,
+    poll_seconds: float = 1.0,
+    max_cycles: int | None = None,
+) -> PipelineDaemon:
+    authorized: Dict[int, bool] = {}
+
+    def _run_cycle(state: WarmState) -> int:
+        run_args = argparse.Namespace(**vars(args))
+        run_args.config_obj = state.config
+        # Authorization (and its audit record) is re-evaluated only when config is reloaded.
+        if state.generation not in authorized:
+            authorized.clear()
+            authorized[state.generation] = _authorize(run_args, Permission.RUN_PIPELINE, action="run")
+        if not authorized[state.generation]:
+            console.print("Access denied: run_pipeline required")
+            return 3
+        run_args.output = str(output_for_cycle(daemon.stats["cycles"] + 1))
+        return _execute_run(run_args, warm=state)
+
+    daemon = PipelineDaemon(
+        baseline_dir=Path(args.baseline),
+        input_dir=Path(args.input),
+        run_cycle=_run_cycle,
+        config=getattr(args, "config_obj", None),
+        config_path=Path(args.config) if getattr(args, "config", None) else None,
+        shadow_paths=getattr(args, "shadow_config", None) or [],
+        interval_seconds=interval_seconds,
+        watch_inputs=watch_inputs,
+        poll_seconds=poll_seconds,
+        max_cycles=max_cycles,
+    )
+    return daemon
+
+
+def cmd_schedule(args: argparse.Namespace) -> int:
+    base_out = Path(args.output)
+    # --count 0 keeps running until shutdown.
+    daemon = _pipeline_daemon(
+        args, lambda cycle: base_out / f"run_{cycle}", interval_seconds=args.every, max_cycles=args.count or None
+    )
+    try:
+        daemon.run_forever()
+    except (ValueError, OSError) as exc:
+        console.print(f"Schedule failed to start: {exc}")
+        return 2
+    return 1 if should_shutdown() and daemon.stats["cycles"] < (args.count or float("inf")) else 0
+
+
+def cmd_load_test(args: argparse.Namespace) -> int:
+    from waveos.sim.generator import _make_links, generate_telemetry
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    links = _make_links(args.links)
+    start = utc_now()
+    generate_telemetry(out_dir, links, samples_per_link=args.samples, baseline=True)
+    records = load_records(out_dir / "telemetry.jsonl")
+    normalize_records(records)
+    duration = (utc_now() - start).total_seconds()
+    payload = {
+        "links": args.links,
+        "samples_per_link": args.samples,
+        "total_samples": args.links * args.samples,
+        "duration_seconds": duration,
+        "samples_per_second": (args.links * args.samples) / max(duration, 1e-6),
+    }
+    write_json(out_dir / "load_test.json", payload)
+    console.print(f"Load test complete: {payload}")
+    return 0
+
+
+def cmd_profile(args: argparse.Namespace) -> int:
+    import cProfile
+    import pstats
+
+    profile_path = Path(args.profile)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    exit_code = cmd_run(args)
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    stats.strip_dirs().sort_stats("cumtime").dump_stats(str(profile_path))
+    console.print(f"Wrote profile stats to {profile_path}")
+    return exit_code
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    if not args.input:
+        logger.info("Serve running (metrics + proxy); press Ctrl+C to stop.")
+        try:
+            while not should_shutdown():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        logger.info("Serve stopped.")
+        return 0
+    if not args.baseline or not args.output:
+        console.print("serve --in requires --baseline and --out")
+        return 2
+    out_dir = Path(args.output)
+    config = getattr(args, "config_obj", None)
+    every = args.every if args.every is not None else (config.schedule_interval_seconds if config else None)
+    try:
+        daemon = _pipeline_daemon(
+            args,
+            lambda _cycle: out_dir,
+            interval_seconds=60.0 if every is None else every,
+            watch_inputs=args.watch,
+            poll_seconds=args.poll,
+            max_cycles=args.max_cycles,
+        )
+        logger.info("Pipeline daemon running for %s; press Ctrl+C to stop.", args.input)
+        status = daemon.run_forever()
+    except (ValueError, OSError) as exc:
+        console.print(f"Serve failed to start: {exc}")
+        return 2
+    except KeyboardInterrupt:
+        status = 0
+    logger.info("Serve stopped after %s cycles: %s", daemon.stats["cycles"], daemon.stats)
+    return status
+
+
+def _send_alerts_if_configured(args: argparse.Namespace, run_id: str, events: List[Event]) -> None:
+    config = getattr(args, "config_obj", None)
+    if not config:
+        return
+    alert_events = [e.model_dump() for e in events]
+    if not alert_events:
+        return
+    routes: List[AlertRoute] = []
+    if config.alert_webhook_url:
+        min_level = config.alert_webhook_min_level or config.alert_min_level
+        routes.append(AlertRoute(name="webhook", destination="webhook", url=config.alert_webhook_url, min_level=min_level))
+    if config.alert_slack_webhook_url:
+        min_level = config.alert_slack_min_level or config.alert_min_level
+        routes.append(AlertRoute(name="slack", destination="slack", url=config.alert_slack_webhook_url, min_level=min_level))
+    if config.alert_email_to:
+        smtp_password = None
+        if config.alert_email_smtp_password_secret:
+            smtp_password = get_secret(config.alert_email_smtp_password_secret, provider=config.secrets_provider)
+        routes.append(
+            AlertRoute(
+                name="email",
+                destination="email",
+                url=config.alert_email_to,
+                min_level=config.alert_email_min_level or config.alert_min_level,
+                metadata={
+                    "provider": config.alert_email_provider,
+                    "smtp_host": config.alert_email_smtp_host,
+                    "smtp_port": config.alert_email_smtp_port,
+                    "smtp_user": config.alert_email_smtp_user,
+                    "smtp_password": smtp_password,
+                    "smtp_from": config.alert_email_from,
+                    "ses_region": config.alert_email_ses_region,
+                    "ses_from": config.alert_email_from,
+                },
+            )
+        )
+    if not routes:
+        return
+    try:
+        route_alerts(alert_events, routes, run_id=run_id)
+    except Exception as exc:
+        logger.warning("Alert routing failed: %s", exc)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from waveos.models import BaselineStats
+from waveos.policy import ShadowPolicy, load_shadow_policies
+from waveos.reporting import configure_template_cache, get_template
+from waveos.topology import PathEngine, PathOverlay, TopologyIndex, load_topology
+from waveos.utils import WaveOSConfig, config_fingerprint, get_logger, load_config, read_json, should_shutdown
+
+logger = get_logger("waveos.daemon")
+
+Signature = Tuple[Tuple[str, int, int], ...]
+WARM_TEMPLATES = ("report.html.j2", "report_paged.html.j2")
+TOPOLOGY_FILES = ("links.json", "ports.json", "paths.json", "workloads.json")
+
+
+def file_signature(paths: Sequence[Path]) -> Signature:
+    entries = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def load_baseline_map(path: Path) -> Dict[str, BaselineStats]:
+    stats = (BaselineStats(**record) for record in read_json(path))
+    return {entry.entity_id: entry for entry in stats}
+
+
+@dataclass
+class WarmTopology:
+    signature: Signature
+    path_k: Optional[int]
+    topology: Optional[TopologyIndex]
+    # Every link up, alternates cached lazily across runs; each run looks up through a PathOverlay.
+    path_engine: Optional[PathEngine] = None
+
+
+def load_warm_topology(in_dir: Path, path_k: Optional[int], cached: Optional[WarmTopology] = None) -> WarmTopology:
+    """Returns ``cached`` unless the topology files under ``in_dir`` or ``path_k`` changed."""
+    signature = file_signature([in_dir / name for name in TOPOLOGY_FILES])
+    if cached is not None and cached.signature == signature and cached.path_k == path_k:
+        return cached
+    topology = load_topology(in_dir)
+    path_engine = None
+    if topology is not None and path_k is not None:
+        path_engine = PathEngine(topology, k=path_k)
+    return WarmTopology(signature=signature, path_k=path_k, topology=topology, path_engine=path_engine)
+
+
+@dataclass
+class WarmState:
+    config: WaveOSConfig
+    config_fingerprint: str
+    baseline_map: Dict[str, BaselineStats]
+    baseline_fingerprint: Optional[str] = None
+    shadow_policies: List[ShadowPolicy] = field(default_factory=list)
+    # Bumped on every reload so callers can cache per-generation work (e.g. authorization).
+    generation: int = 0
+    # Topology and path engine per input directory; survives reloads since it is keyed by its own files.
+    topologies: Dict[str, WarmTopology] = field(default_factory=dict)
+
+    def topology(self, in_dir: Path, path_k: Optional[int]) -> Tuple[Optional[TopologyIndex], Optional[PathOverlay]]:
+        """The topology under ``in_dir`` and, when ``path_k`` is set, a per-run overlay of its shared path engine."""
+        key = str(in_dir)
+        warm = self.topologies[key] = load_warm_topology(in_dir, path_k, self.topologies.get(key))
+        return warm.topology, PathOverlay(warm.path_engine) if warm.path_engine is not None else None
+
+
+class PipelineDaemon:
+    """Runs the pipeline repeatedly against state that is loaded once and kept warm.
+
+    Config, baseline, shadow policies and report templates are reloaded only when
+    the (mtime, size) signature of their files changes. Cycles run every
+    ``interval_seconds`` and, with ``watch_inputs``, whenever a file in the input
+    directory changes (an interval of 0 then means change-triggered only).
+    """
+
+    def __init__(
+        self,
+        baseline_dir: Path,
+        input_dir: Path,
+        run_cycle: Callable[[WarmState], int],
+        config: Optional[WaveOSConfig] = None,
+        config_path: Optional[Path] = None,
+        shadow_paths: Sequence[str] = (),
+        interval_seconds: float = 60.0,
+        watch_inputs: bool = False,
+        poll_seconds: float = 1.0,
+        max_cycles: Optional[int] = None,
+    ) -> None:
+        if interval_seconds < 0:
+            raise ValueError("interval_seconds must be >= 0")
+        self.baseline_dir = baseline_dir
+        self.input_dir = input_dir
+        self.run_cycle = run_cycle
+        self.config_path = config_path
+        self.shadow_paths = [Path(path) for path in shadow_paths]
+        self.interval_seconds = interval_seconds
+        self.watch_inputs = watch_inputs
+        self.poll_seconds = max(0.01, poll_seconds)
+        self.max_cycles = max_cycles
+        self.state: Optional[WarmState] = None
+        self._config = config
+        self._signatures: Dict[str, Signature] = {}
+        if config is not None and config_path is not None:
+            self._signatures["config"] = file_signature([config_path])
+        self.stats: Dict[str, object] = {
+            "cycles": 0,
+            "failures": 0,
+            "last_cycle_seconds": None,
+            "reloads": {"config": 0, "baseline": 0, "shadow_policies": 0},
+        }
+
+    @property
+    def baseline_path(self) -> Path:
+        return self.baseline_dir / "baseline.json"
+
+    def _changed(self, name: str, paths: Sequence[Path]) -> Optional[Signature]:
+        signature = file_signature(paths)
+        if self._signatures.get(name) == signature:
+            return None
+        return signature
+
+    def refresh(self) -> List[str]:
+        """Reloads whatever changed on disk; a failed reload keeps the previous warm state."""
+        reloaded: List[str] = []
+        config = self._config
+        if self.config_path is not None:
+            signature = self._changed("config", [self.config_path])
+            if signature is not None:
+                try:
+                    config = load_config(self.config_path)
+                except ValueError as exc:
+                    if self.state is None:
+                        raise
+                    logger.error("Config reload failed; keeping previous config: %s", exc)
+                else:
+                    self._signatures["config"] = signature
+                    reloaded.append("config")
+        if config is None:
+            config = load_config(None)
+        if config is not self._config or self.state is None:
+            configure_template_cache(config.template_cache_dir)
+            for name in WARM_TEMPLATES:
+                get_template(name)
+        self._config = config
+
+        baseline_map = self.state.baseline_map if self.state else {}
+        baseline_fp = self.state.baseline_fingerprint if self.state else None
+        fp_path = self.baseline_dir / "config_fingerprint.json"
+        # Signatures are taken before reading, so a write racing the load triggers another reload.
+        signature = self._changed("baseline", [self.baseline_path, fp_path])
+        if signature is not None:
+            try:
+                if not self.baseline_path.exists():
+                    raise FileNotFoundError(f"Missing baseline.json in {self.baseline_dir}")
+                baseline_map = load_baseline_map(self.baseline_path)
+                baseline_fp = read_json(fp_path).get("fingerprint") if fp_path.exists() else None
+            except (ValueError, OSError) as exc:
+                if self.state is None:
+                    raise
+                logger.error("Baseline reload failed; keeping previous baseline: %s", exc)
+            else:
+                self._signatures["baseline"] = signature
+                reloaded.append("baseline")
+
+        shadows = self.state.shadow_policies if self.state else []
+        signature = self._changed("shadow_policies", self.shadow_paths)
+        if self.shadow_paths and signature is not None:
+            try:
+                shadows = load_shadow_policies(self.shadow_paths)
+            except (ValueError, OSError) as exc:
+                if self.state is None:
+                    raise
+                logger.error("Shadow policy reload failed; keeping previous policies: %s", exc)
+            else:
+                self._signatures["shadow_policies"] = signature
+                reloaded.append("shadow_policies")
+
+        if self.state is None or reloaded:
+            generation = self.state.generation + 1 if self.state else 0
+            self.state = WarmState(
+                config=config,
+                config_fingerprint=config_fingerprint(config),
+                baseline_map=baseline_map,
+                baseline_fingerprint=baseline_fp,
+                shadow_policies=shadows,
+                generation=generation,
+                topologies=self.state.topologies if self.state else {},
+            )
+            if generation:
+                reloads = self.stats["reloads"]
+                for name in reloaded:
+                    reloads[name] += 1
+                logger.info("Reloaded %s", ", ".join(reloaded))
+        return reloaded
+
+    def input_signature(self) -> Signature:
+        if not self.input_dir.exists():
+            return ()
+        return file_signature(sorted(path for path in self.input_dir.iterdir() if path.is_file()))
+
+    def run_once(self) -> int:
+        self.refresh()
+        assert self.state is not None
+        start = time.perf_counter()
+        try:
+            status = self.run_cycle(self.state)
+        except Exception:
+            logger.exception("Pipeline cycle failed")
+            status = 1
+        elapsed = time.perf_counter() - start
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_seconds"] = elapsed
+        if status != 0:
+            self.stats["failures"] += 1
+        logger.info("Pipeline cycle %s finished status=%s in %.3fs", self.stats["cycles"], status, elapsed)
+        return status
+
+    def run_forever(self) -> int:
+        self.refresh()
+        status = 0
+        next_due = time.monotonic()
+        last_inputs: Optional[Signature] = None
+        while not should_shutdown():
+            inputs = self.input_signature() if self.watch_inputs else None
+            now = time.monotonic()
+            if now >= next_due or (self.watch_inputs and inputs != last_inputs):
+                last_inputs = inputs
+                status = self.run_once()
+                # With watch_inputs, an interval of 0 means "only when inputs change".
+                if self.watch_inputs and self.interval_seconds == 0:
+                    next_due = float("inf")
+                else:
+                    next_due = time.monotonic() + self.interval_seconds
+                if self.max_cycles is not None and self.stats["cycles"] >= self.max_cycles:
+                    break
+                continue
+            time.sleep(min(self.poll_seconds, max(0.0, next_due - now)))
+        return status
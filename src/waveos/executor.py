@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from waveos.utils import counters, gauges, get_logger, histograms
+
+logger = get_logger("waveos.executor")
+
+_DONE = object()
+_POLL_SECONDS = 0.05
+
+
+class _Aborted(Exception):
+    pass
+
+
+@dataclass
+class Stage:
+    name: str
+    # Called once per input item and yields any number of outputs; barrier stages
+    # are called once with the list of every upstream item.
+    func: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+    barrier: bool = False
+
+
+@dataclass
+class StageStats:
+    status: str = "pending"
+    workers: int = 1
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    max_item_seconds: float = 0.0
+    # Blocked on a full downstream queue (backpressure) vs. waiting on an empty input queue.
+    stall_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    queue_max_depth: int = 0
+
+
+class StagedExecutor:
+    """Runs stages on their own worker threads, connected by bounded queues.
+
+    Each stage reads from its input queue and blocks on ``put`` when the next
+    queue is full, so a slow stage throttles its producers instead of letting
+    work pile up in memory. Per-stage latency, stall time and queue depth are
+    kept in ``stats`` and exported to Prometheus.
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = 8) -> None:
+        if not stages:
+            raise ValueError("StagedExecutor needs at least one stage")
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stage names must be unique")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.stats: Dict[str, StageStats] = {
+            stage.name: StageStats(workers=1 if stage.barrier else max(1, stage.workers)) for stage in self.stages
+        }
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._queues: List[queue.Queue] = []
+        # Time the input iterator spent blocked because the first stage was saturated.
+        self.source_stall_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: asdict(stats) for name, stats in self.stats.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        stages = self.snapshot()
+        with self._lock:
+            source_stall = self.source_stall_seconds
+        return {"queue_size": self.queue_size, "source_stall_seconds": source_stall, "stages": stages}
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: stats.queue_max_depth for name, stats in self.stats.items()}
+
+    def _fail(self, stage: Stage, exc: BaseException) -> None:
+        with self._lock:
+            self.stats[stage.name].status = "failed"
+            if self._error is None:
+                self._error = exc
+        self._abort.set()
+
+    def _get(self, stage: Stage, source: queue.Queue) -> Any:
+        start = time.perf_counter()
+        while True:
+            try:
+                item = source.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if self._abort.is_set():
+                    raise _Aborted()
+        waited = time.perf_counter() - start
+        gauges()["queue_depth"].labels(queue=stage.name).set(source.qsize())
+        with self._lock:
+            self.stats[stage.name].wait_seconds += waited
+        return item
+
+    def _put(self, producer: str, target: queue.Queue, target_name: str, item: Any) -> None:
+        start = time.perf_counter()
+        while True:
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                if self._abort.is_set():
+                    raise _Aborted()
+        stalled = time.perf_counter() - start
+        depth = target.qsize()
+        gauges()["queue_depth"].labels(queue=target_name).set(depth)
+        if stalled >= _POLL_SECONDS:
+            counters()["stage_stall"].labels(stage=producer).inc(stalled)
+        with self._lock:
+            if producer in self.stats:
+                self.stats[producer].stall_seconds += stalled
+            else:
+                self.source_stall_seconds += stalled
+            if target_name in self.stats and item is not _DONE:
+                target_stats = self.stats[target_name]
+                target_stats.queue_max_depth = max(target_stats.queue_max_depth, depth)
+
+    def _process(self, stage: Stage, item: Any, emit: Callable[[Any], None]) -> None:
+        start = time.perf_counter()
+        produced = 0
+        busy = 0.0
+        outputs = iter(stage.func(item))
+        while True:
+            chunk_start = time.perf_counter()
+            try:
+                output = next(outputs)
+            except StopIteration:
+                busy += time.perf_counter() - chunk_start
+                break
+            busy += time.perf_counter() - chunk_start
+            produced += 1
+            # Time blocked in emit is stall, not processing latency.
+            emit(output)
+        elapsed = time.perf_counter() - start
+        histograms()["stage_duration"].labels(stage=stage.name).observe(busy)
+        with self._lock:
+            stats = self.stats[stage.name]
+            stats.items_out += produced
+            stats.busy_seconds += busy
+            stats.max_item_seconds = max(stats.max_item_seconds, busy)
+        logger.debug("stage=%s item_seconds=%.4f wall_seconds=%.4f outputs=%s", stage.name, busy, elapsed, produced)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        results: List[Any] = []
+        results_lock = threading.Lock()
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = {stage.name: self.stats[stage.name].workers for stage in self.stages}
+
+        def _emitter(index: int) -> Callable[[Any], None]:
+            stage = self.stages[index]
+            if index + 1 == len(self.stages):
+
+                def _collect(output: Any) -> None:
+                    with results_lock:
+                        results.append(output)
+
+                return _collect
+            target = self._queues[index + 1]
+            target_name = self.stages[index + 1].name
+            return lambda output: self._put(stage.name, target, target_name, output)
+
+        def _finish(index: int) -> None:
+            stage = self.stages[index]
+            with self._lock:
+                remaining[stage.name] -= 1
+                last = remaining[stage.name] == 0
+                if last and self.stats[stage.name].status == "running":
+                    self.stats[stage.name].status = "ok"
+            # The last worker out tells the next stage that no more input is coming.
+            if last and index + 1 < len(self.stages):
+                self._put(stage.name, self._queues[index + 1], self.stages[index + 1].name, _DONE)
+
+        def _worker(index: int) -> None:
+            stage = self.stages[index]
+            source = self._queues[index]
+            emit = _emitter(index)
+            with self._lock:
+                self.stats[stage.name].status = "running"
+            try:
+                pending: List[Any] = []
+                while True:
+                    item = self._get(stage, source)
+                    if item is _DONE:
+                        # Let sibling workers see the sentinel too.
+                        source.put(_DONE)
+                        break
+                    with self._lock:
+                        self.stats[stage.name].items_in += 1
+                    if stage.barrier:
+                        pending.append(item)
+                    else:
+                        self._process(stage, item, emit)
+                if stage.barrier:
+                    self._process(stage, pending, emit)
+                _finish(index)
+            except _Aborted:
+                with self._lock:
+                    if self.stats[stage.name].status == "running":
+                        self.stats[stage.name].status = "aborted"
+            except BaseException as exc:  # noqa: BLE001 - surfaced to the caller of run()
+                self._fail(stage, exc)
+
+        threads = [
+            threading.Thread(target=_worker, args=(index,), name=f"stage-{stage.name}-{worker}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for worker in range(self.stats[stage.name].workers)
+        ]
+        for thread in threads:
+            thread.start()
+        first = self.stages[0]
+        try:
+            for item in items:
+                if self._abort.is_set():
+                    break
+                self._put("source", self._queues[0], first.name, item)
+            else:
+                self._put("source", self._queues[0], first.name, _DONE)
+        except _Aborted:
+            pass
+        except BaseException as exc:
+            self._fail(first, exc)
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return results
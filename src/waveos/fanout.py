@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from waveos.daemon import WARM_TEMPLATES, WarmState, WarmTopology, file_signature, load_baseline_map
+from waveos.policy import ShadowPolicy, load_shadow_policies
+from waveos.reporting import configure_template_cache, get_template
+from waveos.utils import WaveOSConfig, config_fingerprint, get_logger, load_config, read_json, utc_now
+
+logger = get_logger("waveos.fanout")
+
+
+@dataclass
+class SiteJob:
+    name: str
+    input: str
+    baseline: str
+    output: str
+    shadow_config: List[str] = field(default_factory=list)
+    # Counter, change-point and action state for this site; defaults to <output>/state.
+    state_dir: Optional[str] = None
+
+
+# Config fields holding cross-run state files, which must never be shared between sites.
+SITE_STATE_FIELDS = ("counter_state_path", "changepoint_state_path", "action_state_path")
+
+
+def load_manifest(path: Path) -> List[SiteJob]:
+    if path.suffix in {".toml", ".tml"}:
+        import tomllib
+
+        payload = tomllib.loads(path.read_text(encoding="utf-8"))
+    else:
+        payload = read_json(path)
+    sites = payload.get("sites") if isinstance(payload, dict) else payload
+    if not isinstance(sites, list) or not sites:
+        raise ValueError("Manifest must contain a non-empty 'sites' list")
+    base = path.parent
+    jobs: List[SiteJob] = []
+    names = set()
+    for idx, site in enumerate(sites):
+        missing = [key for key in ("in", "baseline", "out") if not site.get(key)]
+        if missing:
+            raise ValueError(f"Manifest site {idx} is missing {', '.join(missing)}")
+        name = str(site.get("name") or f"site-{idx}")
+        if name in names:
+            raise ValueError(f"Duplicate manifest site name: {name}")
+        names.add(name)
+        # Relative paths are resolved against the manifest so it can be moved with its data.
+        jobs.append(
+            SiteJob(
+                name=name,
+                input=str(base / site["in"]),
+                baseline=str(base / site["baseline"]),
+                output=str(base / site["out"]),
+                shadow_config=[str(base / item) for item in site.get("shadow_config", [])],
+                state_dir=str(base / site["state_dir"]) if site.get("state_dir") else None,
+            )
+        )
+    outputs = [job.output for job in jobs]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Manifest sites must not share an output directory")
+    state_dirs = [site_state_dir(job) for job in jobs]
+    if len(set(state_dirs)) != len(state_dirs):
+        raise ValueError("Manifest sites must not share a state_dir")
+    return jobs
+
+
+def site_state_dir(job: SiteJob) -> Path:
+    return Path(job.state_dir) if job.state_dir else Path(job.output) / "state"
+
+
+def site_config(config: WaveOSConfig, job: SiteJob) -> WaveOSConfig:
+    # Concurrent sites sharing one state file would overwrite each other and mix up
+    # entities, so each configured state file moves under the site's own state dir.
+    state_dir = site_state_dir(job)
+    update = {
+        name: str(state_dir / Path(getattr(config, name)).name)
+        for name in SITE_STATE_FIELDS
+        if getattr(config, name)
+    }
+    return config.model_copy(update=update)
+
+
+# Per-process warm state: every worker loads config and templates once, and each
+# baseline, shadow policy set and site topology once no matter how many sites reference it.
+_config: Optional[WaveOSConfig] = None
+_config_fingerprint: Optional[str] = None
+_baselines: Dict[str, Tuple[Any, Dict[str, Any], Optional[str]]] = {}
+_shadows: Dict[Tuple[str, ...], List[ShadowPolicy]] = {}
+_topologies: Dict[str, WarmTopology] = {}
+
+
+def init_worker(config: Optional[WaveOSConfig] = None) -> None:
+    global _config, _config_fingerprint
+    # The parent's already-validated config (and compiled policy plan) is shipped once per worker.
+    _config = config if config is not None else load_config(None)
+    _config_fingerprint = config_fingerprint(_config)
+    configure_template_cache(_config.template_cache_dir)
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    _baselines.clear()
+    _shadows.clear()
+    _topologies.clear()
+
+
+def _warm_state(job: SiteJob, shared_shadows: List[str]) -> WarmState:
+    assert _config is not None and _config_fingerprint is not None
+    baseline_dir = Path(job.baseline)
+    baseline_path = baseline_dir / "baseline.json"
+    fp_path = baseline_dir / "config_fingerprint.json"
+    signature = file_signature([baseline_path, fp_path])
+    cached = _baselines.get(job.baseline)
+    if cached is None or cached[0] != signature:
+        if not baseline_path.exists():
+            raise FileNotFoundError(f"Missing baseline.json in {baseline_dir}")
+        baseline_fp = read_json(fp_path).get("fingerprint") if fp_path.exists() else None
+        cached = (signature, load_baseline_map(baseline_path), baseline_fp)
+        _baselines[job.baseline] = cached
+    shadow_key = tuple([*shared_shadows, *job.shadow_config])
+    if shadow_key not in _shadows:
+        _shadows[shadow_key] = load_shadow_policies(shadow_key)
+    return WarmState(
+        config=_config,
+        config_fingerprint=_config_fingerprint,
+        baseline_map=cached[1],
+        baseline_fingerprint=cached[2],
+        shadow_policies=_shadows[shadow_key],
+        topologies=_topologies,
+    )
+
+
+def run_site(task: Tuple[SiteJob, Dict[str, Any], List[str]]) -> Dict[str, Any]:
+    job, base_args, shared_shadows = task
+    from waveos.commands.pipeline import _execute_run
+
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"name": job.name, "input": job.input, "output": job.output, "started_at": utc_now().isoformat()}
+    try:
+        warm = _warm_state(job, shared_shadows)
+        args = argparse.Namespace(**base_args)
+        args.input, args.baseline, args.output = job.input, job.baseline, job.output
+        args.config_obj = site_config(warm.config, job)
+        exit_code = _execute_run(args, warm=warm)
+        result.update(status="ok" if exit_code == 0 else "failed", exit_code=exit_code)
+    except Exception as exc:
+        # One broken site must not take the sweep down with it.
+        logger.exception("Site %s failed", job.name)
+        result.update(status="failed", exit_code=1, error=f"{type(exc).__name__}: {exc}")
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def run_fanout(
+    jobs: List[SiteJob],
+    base_args: Dict[str, Any],
+    workers: int = 1,
+    config: Optional[WaveOSConfig] = None,
+    shared_shadows: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    started_at = utc_now()
+    start = time.perf_counter()
+    tasks = [(job, base_args, list(shared_shadows or [])) for job in jobs]
+    results: List[Dict[str, Any]] = []
+    workers = max(1, min(workers, len(jobs)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(config,)) as executor:
+            futures = [executor.submit(run_site, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+    else:
+        init_worker(config)
+        results = [run_site(task) for task in tasks]
+    order = {job.name: idx for idx, job in enumerate(jobs)}
+    results.sort(key=lambda item: order[item["name"]])
+    failed = [item["name"] for item in results if item["status"] != "ok"]
+    return {
+        "started_at": started_at.isoformat(),
+        "completed_at": utc_now().isoformat(),
+        "seconds": time.perf_counter() - start,
+        "workers": workers,
+        "site_count": len(jobs),
+        "ok_count": len(jobs) - len(failed),
+        "failed_count": len(failed),
+        "failed": failed,
+        "sites": results,
+    }
@@ -49,6 +49,7 @@ class Workload(BaseModel):
     name: str
     priority: int = Field(ge=0, le=10)
     bandwidth_gbps: float = Field(..., ge=0)
+    paths: List[str] = Field(default_factory=list)
 
 
 class TelemetrySample(BaseModel):
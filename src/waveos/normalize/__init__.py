@@ -1,3 +1,20 @@
+from waveos.normalize.counters import COUNTER_FIELDS, CounterState, counter_delta, counters_to_deltas
 from waveos.normalize.pipeline import normalize_record, normalize_records
+from waveos.normalize.resample import LinkSeries, ResampledTelemetry, aggregate_resampled, resample
+from waveos.normalize.sample_cache import NormalizedFile, SampleCache, normalize_file
 
-__all__ = ["normalize_record", "normalize_records"]
+__all__ = [
+    "COUNTER_FIELDS",
+    "CounterState",
+    "counter_delta",
+    "counters_to_deltas",
+    "LinkSeries",
+    "ResampledTelemetry",
+    "aggregate_resampled",
+    "resample",
+    "normalize_record",
+    "normalize_records",
+    "NormalizedFile",
+    "SampleCache",
+    "normalize_file",
+]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from waveos.models import TelemetrySample
+from waveos.utils import get_logger, write_json
+
+logger = get_logger("waveos.normalize.counters")
+
+COUNTER_FIELDS: Tuple[str, ...] = ("errors", "drops", "retries", "fec_corrected", "fec_uncorrected")
+
+DEFAULT_COUNTER_WIDTH = 64
+
+
+def counter_delta(previous: int, current: int, width: int = DEFAULT_COUNTER_WIDTH) -> Tuple[int, bool]:
+    if current >= previous:
+        return current - previous, False
+    # Only a drop from the upper half of the counter's range into the lower half is read as a wrap;
+    # anything else going backwards is a device reset and the new reading is the delta since reset.
+    wrap = 2**width
+    if wrap // 2 <= previous < wrap and current < wrap // 2:
+        return wrap - previous + current, True
+    return current, True
+
+
+class CounterState:
+    def __init__(self, fields: Iterable[str] = COUNTER_FIELDS, widths: Dict[str, int] | None = None) -> None:
+        self.fields = tuple(fields)
+        self.widths = tuple((widths or {}).get(field, DEFAULT_COUNTER_WIDTH) for field in self.fields)
+        # link_id -> readings from the link's latest run, oldest first, each
+        # [timestamp_epoch, *counter values, *deltas emitted for it] in self.fields order
+        self.links: Dict[str, List[List[float]]] = {}
+        self.discontinuities = 0
+        self.stale_samples = 0
+
+    def to_dict(self) -> dict:
+        return {"schema_version": 2, "fields": list(self.fields), "links": self.links}
+
+    @classmethod
+    def load(
+        cls, path: Path | None, fields: Iterable[str] = COUNTER_FIELDS, widths: Dict[str, int] | None = None
+    ) -> "CounterState":
+        state = cls(fields, widths)
+        if not path or not path.exists():
+            return state
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Failed to load counter state from %s: %s", path, exc)
+            return state
+        version = payload.get("schema_version")
+        if version not in (1, 2) or tuple(payload.get("fields", ())) != state.fields:
+            logger.warning("Ignoring counter state with incompatible layout at %s", path)
+            return state
+        links = payload.get("links", {})
+        if version == 1:
+            # Version 1 kept only the last reading; its deltas were not recorded.
+            zeros = [0] * len(state.fields)
+            state.links = {link_id: [[*values, *zeros]] for link_id, values in links.items()}
+        else:
+            state.links = {link_id: [list(reading) for reading in readings] for link_id, readings in links.items()}
+        return state
+
+    def save(self, path: Path) -> None:
+        write_json(path, self.to_dict())
+
+
+def counters_to_deltas(
+    samples: Iterable[TelemetrySample],
+    state: CounterState | None = None,
+    fields: Iterable[str] = COUNTER_FIELDS,
+    widths: Dict[str, int] | None = None,
+) -> List[TelemetrySample]:
+    state = state or CounterState(fields, widths)
+    fields = state.fields
+    width_count = len(fields)
+    by_link: Dict[str, List[TelemetrySample]] = defaultdict(list)
+    for sample in samples:
+        by_link[sample.link_id].append(sample)
+
+    converted: List[TelemetrySample] = []
+    zero_deltas = dict.fromkeys(fields, 0)
+    for link_id, link_samples in by_link.items():
+        link_samples.sort(key=lambda s: s.timestamp)
+        timestamps = [s.timestamp.timestamp() for s in link_samples]
+        columns = [[getattr(s, field) for s in link_samples] for field in fields]
+        carried = state.links.get(link_id) or []
+        history: List[List[float]] = []
+        start = 0
+        if carried:
+            seen: Dict[float, List[List[float]]] = defaultdict(list)
+            for reading in carried:
+                seen[reading[0]].append(reading)
+            # Samples up to the carried reading were converted by an earlier run: a re-read sample
+            # gets back the deltas it was given then, and any other was already counted (zero deltas).
+            while start < len(timestamps) and timestamps[start] <= carried[-1][0]:
+                matches = seen.get(timestamps[start])
+                if matches:
+                    reading = matches.pop(0)
+                    deltas = [int(value) for value in reading[1 + width_count :]]
+                    converted.append(link_samples[start].model_copy(update=dict(zip(fields, deltas))))
+                    history.append(reading)
+                else:
+                    converted.append(link_samples[start].model_copy(update=zero_deltas))
+                start += 1
+            state.stale_samples += start
+            previous = [int(value) for value in carried[-1][1 : 1 + width_count]]
+        else:
+            previous = None
+        for idx in range(start, len(link_samples)):
+            current = [column[idx] for column in columns]
+            if previous is None:
+                deltas = [0] * width_count
+            else:
+                deltas = []
+                for prev_value, cur_value, width in zip(previous, current, state.widths):
+                    delta, discontinuity = counter_delta(prev_value, cur_value, width)
+                    if discontinuity:
+                        state.discontinuities += 1
+                    deltas.append(delta)
+            converted.append(link_samples[idx].model_copy(update=dict(zip(fields, deltas))))
+            history.append([timestamps[idx], *current, *deltas])
+            previous = current
+        if carried and start == len(link_samples) and history[-1:] != carried[-1:]:
+            # Nothing new for this link: the latest reading stays the base for the next run.
+            history.append(carried[-1])
+        state.links[link_id] = history
+    if state.discontinuities:
+        logger.info("Counter conversion handled %s resets/wraps", state.discontinuities)
+    return converted
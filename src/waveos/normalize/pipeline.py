@@ -34,7 +34,11 @@ def normalize_record(record: Dict[str, Any]) -> TelemetrySample:
         raise
 
 
-def normalize_records(records: Iterable[Dict[str, Any]], run_id: str | None = None) -> List[TelemetrySample]:
+def normalize_records(
+    records: Iterable[Dict[str, Any]],
+    run_id: str | None = None,
+    errors: List[str] | None = None,
+) -> List[TelemetrySample]:
     normalized: List[TelemetrySample] = []
     records_list = list(records)
     metrics_counters = counters()
@@ -47,8 +51,10 @@ def normalize_records(records: Iterable[Dict[str, Any]], run_id: str | None = No
             try:
                 normalized.append(normalize_record(record))
                 metrics_counters["telemetry_ingested"].inc()
-            except ValidationError:
+            except ValidationError as exc:
                 metrics_counters["normalize_errors"].inc()
+                if errors is not None:
+                    errors.append(str(exc))
                 continue
     return normalized
 
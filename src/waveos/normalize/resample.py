@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+from waveos.models import TelemetrySample
+
+ResampleMethod = Literal["last", "mean", "sum", "linear"]
+
+# Counter fields hold per-sample deltas (or fault indicators), so a bin's value is their total.
+DEFAULT_METHODS: Dict[str, ResampleMethod] = {
+    "errors": "sum",
+    "drops": "sum",
+    "retries": "sum",
+    "fec_corrected": "sum",
+    "fec_uncorrected": "sum",
+    "charger_faults": "sum",
+    "ber": "linear",
+    "temperature_c": "linear",
+    "rx_power_dbm": "linear",
+    "tx_power_dbm": "linear",
+    "congestion_pct": "linear",
+    "power_kw": "linear",
+    "current_a": "linear",
+    "voltage_v": "linear",
+    "energy_kwh": "last",
+    "battery_soc_pct": "last",
+}
+
+_NAN = float("nan")
+
+
+@dataclass
+class LinkSeries:
+    link_id: str
+    start: float
+    interval: float
+    fields: Dict[str, array]
+    observed: array
+    gaps: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def bins(self) -> int:
+        return len(self.observed)
+
+    def timestamp(self, idx: int) -> datetime:
+        return datetime.fromtimestamp(self.start + idx * self.interval, tz=timezone.utc)
+
+    def mean(self, name: str) -> Optional[float]:
+        values = [value for value in self.fields.get(name, ()) if not math.isnan(value)]
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+
+@dataclass
+class ResampledTelemetry:
+    start: float
+    interval: float
+    bins: int
+    links: Dict[str, LinkSeries]
+
+
+def _sample_value(sample: TelemetrySample, name: str) -> Optional[float]:
+    if name == "charger_faults":
+        if sample.charger_status is None and sample.charger_fault_code is None:
+            return None
+        return 1.0 if sample.charger_status == "fault" or sample.charger_fault_code else 0.0
+    value = getattr(sample, name, None)
+    return float(value) if value is not None else None
+
+
+def _empty_runs(observed: array) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    run_start = None
+    for idx, flag in enumerate(observed):
+        if not flag and run_start is None:
+            run_start = idx
+        elif flag and run_start is not None:
+            runs.append((run_start, idx))
+            run_start = None
+    if run_start is not None:
+        runs.append((run_start, len(observed)))
+    return runs
+
+
+def _fill(values: array, method: ResampleMethod, runs: List[Tuple[int, int]], max_fill_bins: int) -> None:
+    for run_start, run_end in runs:
+        # Empty bins of aggregated methods stay unobserved; inventing a total or mean would skew the series.
+        if run_end - run_start > max_fill_bins or method in ("mean", "sum"):
+            continue
+        before = values[run_start - 1] if run_start > 0 else _NAN
+        after = values[run_end] if run_end < len(values) else _NAN
+        if method == "last":
+            if not math.isnan(before):
+                for idx in range(run_start, run_end):
+                    values[idx] = before
+        elif not (math.isnan(before) or math.isnan(after)):
+            span = run_end - run_start + 1
+            for offset, idx in enumerate(range(run_start, run_end), start=1):
+                values[idx] = before + (after - before) * offset / span
+
+
+def resample(
+    samples: Iterable[TelemetrySample],
+    interval_seconds: float,
+    methods: Optional[Dict[str, ResampleMethod]] = None,
+    max_fill_bins: int = 3,
+) -> ResampledTelemetry:
+    if interval_seconds <= 0:
+        raise ValueError("interval_seconds must be positive")
+    methods = {**DEFAULT_METHODS, **(methods or {})}
+    by_link: Dict[str, List[TelemetrySample]] = defaultdict(list)
+    for sample in samples:
+        by_link[sample.link_id].append(sample)
+    if not by_link:
+        return ResampledTelemetry(start=0.0, interval=interval_seconds, bins=0, links={})
+
+    epochs = {link_id: [s.timestamp.timestamp() for s in items] for link_id, items in by_link.items()}
+    first = min(min(values) for values in epochs.values())
+    last = max(max(values) for values in epochs.values())
+    start = math.floor(first / interval_seconds) * interval_seconds
+    bins = int((last - start) // interval_seconds) + 1
+
+    links: Dict[str, LinkSeries] = {}
+    for link_id, items in by_link.items():
+        slots = [int((epoch - start) // interval_seconds) for epoch in epochs[link_id]]
+        order = sorted(range(len(items)), key=lambda idx: epochs[link_id][idx])
+        observed = array("b", [0]) * bins
+        for slot in slots:
+            observed[slot] = 1
+        runs = _empty_runs(observed)
+        columns: Dict[str, array] = {}
+        for name, method in methods.items():
+            sums = array("d", [0.0]) * bins
+            counts = array("l", [0]) * bins
+            lasts = array("d", [_NAN]) * bins
+            present = False
+            for idx in order:
+                value = _sample_value(items[idx], name)
+                if value is None:
+                    continue
+                present = True
+                slot = slots[idx]
+                sums[slot] += value
+                counts[slot] += 1
+                lasts[slot] = value
+            if not present:
+                continue
+            if method == "last":
+                values = lasts
+            elif method == "sum":
+                values = array("d", (total if count else _NAN for total, count in zip(sums, counts)))
+            else:
+                values = array("d", (total / count if count else _NAN for total, count in zip(sums, counts)))
+            _fill(values, method, _empty_runs(array("b", (1 if count else 0 for count in counts))), max_fill_bins)
+            columns[name] = values
+        links[link_id] = LinkSeries(
+            link_id=link_id,
+            start=start,
+            interval=interval_seconds,
+            fields=columns,
+            observed=observed,
+            gaps=[run for run in runs if run[1] - run[0] > max_fill_bins],
+        )
+    return ResampledTelemetry(start=start, interval=interval_seconds, bins=bins, links=links)
+
+
+def aggregate_resampled(resampled: ResampledTelemetry) -> Dict[str, Dict[str, float]]:
+    metrics: Dict[str, Dict[str, float]] = {}
+    for link_id, series in resampled.links.items():
+        values: Dict[str, float] = {}
+        for name in series.fields:
+            mean = series.mean(name)
+            if mean is not None:
+                values[name] = mean
+        metrics[link_id] = values
+    return metrics
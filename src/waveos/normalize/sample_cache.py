@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from waveos.collectors import load_records
+from waveos.models import TelemetrySample
+from waveos.normalize.pipeline import normalize_records
+from waveos.utils import counters, get_logger
+
+logger = get_logger("waveos.normalize.sample_cache")
+
+# Bump when the file layout changes; model field changes are caught by the model signature.
+SAMPLE_CACHE_SCHEMA = 1
+SAMPLE_CACHE_SUFFIX = ".wvs"
+MAX_STORED_ERRORS = 5
+
+_MAGIC = b"WVSAMP\x00\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGN = 8
+_NAIVE = -(2**31)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass
+class NormalizedFile:
+    samples: List[TelemetrySample]
+    record_count: int
+    rejected: int = 0
+    # Only the first few messages are kept; ``rejected`` has the full count.
+    errors: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+def _column_kinds() -> Dict[str, str]:
+    kinds: Dict[str, str] = {}
+    for name, info in TelemetrySample.model_fields.items():
+        annotation = info.annotation
+        if annotation is datetime:
+            kinds[name] = "timestamp"
+        elif annotation is int:
+            kinds[name] = "int64"
+        elif annotation in (float, Optional[float]):
+            kinds[name] = "float64"
+        elif annotation in (str, Optional[str]):
+            kinds[name] = "string"
+        else:
+            kinds[name] = "json"
+    return kinds
+
+
+COLUMN_KINDS = _column_kinds()
+_FIELD_NAMES = tuple(COLUMN_KINDS)
+_FIELDS_SET = frozenset(_FIELD_NAMES)
+MODEL_SIGNATURE = hashlib.sha256(
+    repr([(name, str(info.annotation)) for name, info in TelemetrySample.model_fields.items()]).encode("utf-8")
+).hexdigest()[:16]
+
+
+def _construct(values: Dict[str, Any]) -> TelemetrySample:
+    # model_construct re-walks every field for defaults and aliases (~8us per sample on
+    # pydantic 2.x, slower than validating); every field is present here, so set state directly.
+    sample = TelemetrySample.__new__(TelemetrySample)
+    object.__setattr__(sample, "__dict__", values)
+    object.__setattr__(sample, "__pydantic_fields_set__", set(_FIELDS_SET))
+    object.__setattr__(sample, "__pydantic_extra__", None)
+    object.__setattr__(sample, "__pydantic_private__", None)
+    return sample
+
+
+def _fast_construct_supported() -> bool:
+    probe = {name: None for name in _FIELD_NAMES}
+    probe.update(timestamp=_UTC_EPOCH, link_id="probe", meta={})
+    for name, kind in COLUMN_KINDS.items():
+        if kind == "int64":
+            probe[name] = 0
+    try:
+        return _construct(dict(probe)) == TelemetrySample.model_construct(**probe)
+    except Exception:  # noqa: BLE001 - any internals mismatch means "use the public API"
+        return False
+
+
+_build_sample = _construct if _fast_construct_supported() else (lambda values: TelemetrySample.model_construct(**values))
+
+
+class _Unencodable(ValueError):
+    pass
+
+
+def _encode_timestamps(values: List[datetime]) -> Tuple[array, array]:
+    micros = array("q")
+    offsets = array("i")
+    for value in values:
+        if value.tzinfo is None:
+            micros.append((value - _NAIVE_EPOCH) // _MICROSECOND)
+            offsets.append(_NAIVE)
+            continue
+        if not isinstance(value.tzinfo, timezone):
+            raise _Unencodable(f"unsupported tzinfo {value.tzinfo!r}")
+        offset = value.utcoffset()
+        if offset is None or offset.microseconds:
+            raise _Unencodable(f"unsupported utc offset {offset!r}")
+        micros.append((value - _UTC_EPOCH) // _MICROSECOND)
+        offsets.append(int(offset.total_seconds()))
+    return micros, offsets
+
+
+def _decode_timestamps(micros: List[int], offsets: List[int]) -> List[datetime]:
+    bases: Dict[int, datetime] = {}
+    decoded: List[datetime] = []
+    for micro, offset in zip(micros, offsets):
+        base = bases.get(offset)
+        if base is None:
+            if offset == _NAIVE:
+                base = _NAIVE_EPOCH
+            else:
+                tz = timezone.utc if offset == 0 else timezone(timedelta(seconds=offset))
+                # Local wall-clock epoch, so adding the offset yields the original local time.
+                base = datetime(1970, 1, 1, tzinfo=tz) + timedelta(seconds=offset)
+            bases[offset] = base
+        decoded.append(base + timedelta(microseconds=micro))
+    return decoded
+
+
+def _dictionary(values: List[Any], encode: Any) -> Tuple[array, List[str]]:
+    codes = array("i")
+    table: Dict[str, int] = {}
+    for value in values:
+        if value is None:
+            codes.append(-1)
+            continue
+        text = encode(value)
+        code = table.get(text)
+        if code is None:
+            code = table[text] = len(table)
+        codes.append(code)
+    return codes, list(table)
+
+
+def _encode_columns(samples: List[TelemetrySample]) -> List[Tuple[Dict[str, Any], List[array]]]:
+    columns: List[Tuple[Dict[str, Any], List[array]]] = []
+    rows = [sample.__dict__ for sample in samples]
+    for name, kind in COLUMN_KINDS.items():
+        values = [row.get(name) for row in rows]
+        meta: Dict[str, Any] = {"name": name, "kind": kind}
+        if kind == "timestamp":
+            buffers = list(_encode_timestamps(values))
+        elif kind == "int64":
+            if any(type(value) is not int for value in values):
+                raise _Unencodable(f"{name} holds non-int values")
+            buffers = [array("q", values)]
+        elif kind == "float64":
+            # NaN marks None; a genuine NaN cannot be told apart, so such files are not cached.
+            if any(value is not None and (not isinstance(value, float) or math.isnan(value)) for value in values):
+                raise _Unencodable(f"{name} holds values that cannot round-trip as float64")
+            buffers = [array("d", [math.nan if value is None else value for value in values])]
+        elif kind == "string":
+            if any(value is not None and type(value) is not str for value in values):
+                raise _Unencodable(f"{name} holds non-str values")
+            codes, table = _dictionary(values, lambda value: value)
+            meta["values"] = table
+            buffers = [codes]
+        else:
+            try:
+                codes, table = _dictionary(values, json.dumps)
+            except (TypeError, ValueError) as exc:
+                raise _Unencodable(f"{name} is not JSON serializable: {exc}") from exc
+            meta["values"] = table
+            buffers = [codes]
+        columns.append((meta, buffers))
+    return columns
+
+
+def _decode_column(meta: Dict[str, Any], buffers: List[List[Any]]) -> List[Any]:
+    kind = meta["kind"]
+    if kind == "timestamp":
+        return _decode_timestamps(buffers[0], buffers[1])
+    if kind == "int64":
+        return buffers[0]
+    if kind == "float64":
+        return [None if value != value else value for value in buffers[0]]
+    table = meta["values"]
+    if kind == "string":
+        return [None if code < 0 else table[code] for code in buffers[0]]
+    # JSON values are decoded per row so samples never share mutable containers.
+    return [None if code < 0 else ({} if table[code] == "{}" else json.loads(table[code])) for code in buffers[0]]
+
+
+def _padding(size: int) -> int:
+    return (-size) % _ALIGN
+
+
+class SampleCache:
+    """Normalized telemetry samples cached per source file in a binary columnar layout.
+
+    One ``.wvs`` file per source holds a JSON header (source identity, schema
+    version, model signature, column directory) followed by 8-byte aligned
+    native-endian column buffers: int64/float64 arrays, dictionary-encoded
+    strings and JSON values, and timestamps as epoch microseconds plus UTC
+    offset. Loads memory-map the file and rebuild samples without JSON parsing
+    or pydantic validation. An entry is valid while the source path, size and
+    mtime match; a changed source simply overwrites it.
+    """
+
+    def __init__(self, directory: Path, count_lookups: bool = True) -> None:
+        self.directory = directory
+        # Run checkpoints reuse the format but should not show up as cache lookups.
+        self.count_lookups = count_lookups
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, source: Path) -> Path:
+        digest = hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{digest}{SAMPLE_CACHE_SUFFIX}"
+
+    def _identity(self, source: Path, stat: os.stat_result) -> Dict[str, Any]:
+        return {"path": str(source.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load(self, source: Path) -> Optional[NormalizedFile]:
+        entry = self.entry_path(source)
+        try:
+            identity = self._identity(source, source.stat())
+            with entry.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                result = self._decode(mapped, identity)
+        except FileNotFoundError:
+            result = None
+        except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error) as exc:
+            logger.warning("Ignoring unreadable sample cache entry %s: %s", entry.name, exc)
+            result = None
+        if self.count_lookups:
+            counters()["sample_cache"].labels(result="miss" if result is None else "hit").inc()
+        if result is not None:
+            # Keeps `waveos cleanup --days` from pruning entries that are still in use.
+            os.utime(entry)
+        return result
+
+    def _decode(self, mapped: mmap.mmap, identity: Dict[str, Any]) -> Optional[NormalizedFile]:
+        if mapped[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("bad magic")
+        start = len(_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(mapped, len(_MAGIC))
+        header = json.loads(mapped[start : start + header_length])
+        if (
+            header["schema"] != SAMPLE_CACHE_SCHEMA
+            or header["model"] != MODEL_SIGNATURE
+            or header["byteorder"] != sys.byteorder
+            or header["source"] != identity
+        ):
+            return None
+        columns: Dict[str, List[Any]] = {}
+        with memoryview(mapped) as view:
+            for meta in header["columns"]:
+                buffers = []
+                for typecode, offset, count in meta["buffers"]:
+                    end = offset + count * array(typecode).itemsize
+                    with view[offset:end] as raw, raw.cast(typecode) as typed:
+                        buffers.append(typed.tolist())
+                columns[meta["name"]] = _decode_column(meta, buffers)
+        names = list(columns)
+        # Allocating 100k+ acyclic objects would otherwise trigger repeated full GC passes (~2x slower).
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            samples = [_build_sample(dict(zip(names, row))) for row in zip(*columns.values())]
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return NormalizedFile(
+            samples=samples,
+            record_count=header["record_count"],
+            rejected=header["rejected"],
+            errors=list(header["errors"]),
+            cached=True,
+        )
+
+    def store(self, source: Path, normalized: NormalizedFile, stat: os.stat_result) -> bool:
+        """Writes ``normalized`` for ``source`` as it was when ``stat`` was taken."""
+        try:
+            columns = _encode_columns(normalized.samples)
+        except _Unencodable as exc:
+            logger.info("Not caching samples from %s: %s", source, exc)
+            return False
+        header: Dict[str, Any] = {
+            "schema": SAMPLE_CACHE_SCHEMA,
+            "model": MODEL_SIGNATURE,
+            "byteorder": sys.byteorder,
+            "source": self._identity(source, stat),
+            "rows": len(normalized.samples),
+            "record_count": normalized.record_count,
+            "rejected": normalized.rejected,
+            "errors": normalized.errors[:MAX_STORED_ERRORS],
+            "columns": [],
+        }
+        # Buffer offsets depend on the header size, which depends on the offsets; widen until stable.
+        reserve = 0
+        while True:
+            offset = len(_MAGIC) + _HEADER_LENGTH.size + reserve
+            offset += _padding(offset)
+            header["columns"] = []
+            for meta, buffers in columns:
+                directory = []
+                for buffer in buffers:
+                    directory.append([buffer.typecode, offset, len(buffer)])
+                    offset += len(buffer) * buffer.itemsize
+                    offset += _padding(offset)
+                header["columns"].append({**meta, "buffers": directory})
+            encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            if len(encoded) <= reserve:
+                break
+            reserve = len(encoded) + 64
+        entry = self.entry_path(source)
+        temp_path: Optional[Path] = None
+        try:
+            with tempfile.NamedTemporaryFile("wb", delete=False, dir=self.directory, suffix=".tmp") as handle:
+                temp_path = Path(handle.name)
+                handle.write(_MAGIC)
+                handle.write(_HEADER_LENGTH.pack(len(encoded)))
+                handle.write(encoded.ljust(reserve, b" "))
+                handle.write(b"\0" * _padding(handle.tell()))
+                for _, buffers in columns:
+                    for buffer in buffers:
+                        buffer.tofile(handle)
+                        handle.write(b"\0" * _padding(handle.tell()))
+            temp_path.replace(entry)
+        except OSError as exc:
+            logger.warning("Could not write sample cache entry for %s: %s", source, exc)
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+
+def normalize_file(
+    path: Path,
+    cache: Optional[SampleCache] = None,
+    run_id: str | None = None,
+    max_failures: int | None = None,
+    reset_after: float | None = None,
+) -> NormalizedFile:
+    """Normalized samples for one telemetry file, served from ``cache`` when it is current."""
+    if cache is not None:
+        hit = cache.load(path)
+        if hit is not None:
+            return hit
+    # Identity is taken before reading, so a write racing the load leaves a stale-looking entry.
+    stat = path.stat()
+    records = load_records(path, max_failures=max_failures, reset_after=reset_after)
+    errors: List[str] = []
+    samples = normalize_records(records, run_id=run_id, errors=errors)
+    normalized = NormalizedFile(samples=samples, record_count=len(records), rejected=len(errors), errors=errors[:MAX_STORED_ERRORS])
+    if cache is not None and cacheable_records(records):
+        cache.store(path, normalized, stat)
+    return normalized
+
+
+def cacheable_records(records: List[Any]) -> bool:
+    # Records without a timestamp are stamped with the ingest time, which must not be frozen into a cache.
+    return all(isinstance(record, dict) and (record.get("timestamp") or record.get("ts")) for record in records)
@@ -1,3 +1,35 @@
-from waveos.policy.engine import recommend_actions
+from __future__ import annotations
 
-__all__ = ["recommend_actions"]
+from typing import TYPE_CHECKING
+
+from waveos._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from waveos.policy.batch import ScoreColumns, recommend_actions_batch
+    from waveos.policy.engine import recommend_actions
+    from waveos.policy.rules import CompiledRule, PolicyPlan, PolicyRuleError, compile_policy_rules
+    from waveos.policy.selectors import EntitySelector, SelectorIndex
+    from waveos.policy.shadow import ShadowPolicy, diff_actions, evaluate_shadow_policies, load_shadow_policies
+    from waveos.policy.state import ActionDiff, ActionStateStore
+
+# Resolved on first access: config validation only needs ``waveos.policy.rules`` and
+# should not drag in scoring, state and the batch engine.
+_EXPORTS = {
+    "ScoreColumns": "waveos.policy.batch",
+    "recommend_actions_batch": "waveos.policy.batch",
+    "recommend_actions": "waveos.policy.engine",
+    "CompiledRule": "waveos.policy.rules",
+    "PolicyPlan": "waveos.policy.rules",
+    "PolicyRuleError": "waveos.policy.rules",
+    "compile_policy_rules": "waveos.policy.rules",
+    "EntitySelector": "waveos.policy.selectors",
+    "SelectorIndex": "waveos.policy.selectors",
+    "ShadowPolicy": "waveos.policy.shadow",
+    "diff_actions": "waveos.policy.shadow",
+    "evaluate_shadow_policies": "waveos.policy.shadow",
+    "load_shadow_policies": "waveos.policy.shadow",
+    "ActionDiff": "waveos.policy.state",
+    "ActionStateStore": "waveos.policy.state",
+}
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
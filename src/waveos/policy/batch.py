@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+from waveos.models import ActionRecommendation, ActionType, HealthScore, HealthStatus
+from waveos.policy.engine import _reroute_parameters
+from waveos.policy.rules import CompiledRule, PolicyPlan, compile_policy_rules
+from waveos.utils import span
+
+if TYPE_CHECKING:
+    from waveos.topology import PathEngine, PathOverlay
+
+STATUS_CODES: Dict[HealthStatus, int] = {HealthStatus.PASS: 0, HealthStatus.WARN: 1, HealthStatus.FAIL: 2}
+STATUS_BY_CODE: Tuple[HealthStatus, ...] = (HealthStatus.PASS, HealthStatus.WARN, HealthStatus.FAIL)
+
+# Per-row emission order matches recommend_actions: built-ins first, then custom rules by position.
+_SLOT_REROUTE, _SLOT_RATE_LIMIT, _SLOT_QOS, _SLOT_THERMAL, _SLOT_RULES = range(5)
+_hit_order = itemgetter(0, 1)
+
+
+@dataclass
+class ScoreColumns:
+    entity_type: List[str] = field(default_factory=list)
+    entity_id: List[str] = field(default_factory=list)
+    status: array = field(default_factory=lambda: array("b"))
+    score: array = field(default_factory=lambda: array("d"))
+    drivers: List[int] = field(default_factory=list)
+    driver_vocab: List[str] = field(default_factory=list)
+    details: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.entity_id)
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[HealthScore]) -> "ScoreColumns":
+        columns = cls()
+        driver_bits: Dict[str, int] = {}
+        # Details are sparse (most rows carry few keys), so collect them by row and pad each column once.
+        sparse: Dict[str, Dict[int, Any]] = {}
+        entity_type, entity_id = columns.entity_type.append, columns.entity_id.append
+        status, score_column, driver_masks = columns.status.append, columns.score.append, columns.drivers.append
+        row = -1
+        for row, score in enumerate(scores):
+            entity_type(score.entity_type)
+            entity_id(score.entity_id)
+            status(STATUS_CODES[score.status])
+            score_column(score.score)
+            mask = 0
+            for driver in score.drivers:
+                bit = driver_bits.get(driver)
+                if bit is None:
+                    bit = driver_bits[driver] = len(columns.driver_vocab)
+                    columns.driver_vocab.append(driver)
+                mask |= 1 << bit
+            driver_masks(mask)
+            if score.details:
+                for key, value in score.details.items():
+                    values = sparse.get(key)
+                    if values is None:
+                        values = sparse[key] = {}
+                    values[row] = value
+        for key, values in sparse.items():
+            column: List[Any] = [None] * (row + 1)
+            for idx, value in values.items():
+                column[idx] = value
+            columns.details[key] = column
+        return columns
+
+    def driver_mask(self, predicate) -> int:
+        mask = 0
+        for bit, driver in enumerate(self.driver_vocab):
+            if predicate(driver):
+                mask |= 1 << bit
+        return mask
+
+    def row(self, idx: int) -> "_RowView":
+        return _RowView(self, idx)
+
+
+class _RowView:
+    # Duck-types the HealthScore attributes read by selectors, compiled rules and reroute parameters.
+    __slots__ = ("entity_type", "entity_id", "score", "status", "details")
+
+    def __init__(self, columns: ScoreColumns, idx: int) -> None:
+        self.entity_type = columns.entity_type[idx]
+        self.entity_id = columns.entity_id[idx]
+        self.score = columns.score[idx]
+        self.status = STATUS_BY_CODE[columns.status[idx]]
+        self.details = {key: column[idx] for key, column in columns.details.items() if column[idx] is not None}
+
+
+class _ActionTemplate:
+    """The fixed part of one kind of action; rows only add the entity."""
+
+    __slots__ = ("action", "rationale", "parameters")
+
+    def __init__(self, action: ActionType, rationale: str, parameters: Dict[str, Any]) -> None:
+        self.action = action
+        self.rationale = rationale
+        self.parameters = parameters
+
+    def build(self, entity_type: str, entity_id: str, parameters: Dict[str, Any] | None = None) -> ActionRecommendation:
+        # Validated construction is faster than model_construct on pydantic 2.x; every action owns its parameters.
+        return ActionRecommendation(
+            action=self.action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            rationale=self.rationale,
+            parameters=dict(self.parameters) if parameters is None else parameters,
+        )
+
+
+def _compare_rows(rule: CompiledRule, rows: List[int], values: List[Any] | array) -> List[int]:
+    compare, threshold = rule.compare, rule.threshold
+    fired: List[int] = []
+    for idx in rows:
+        try:
+            if compare(values[idx], threshold):
+                fired.append(idx)
+        except TypeError:
+            continue
+    return fired
+
+
+def _rule_hits(plan: PolicyPlan, rows_by_status: Dict[str, List[int]], columns: ScoreColumns) -> Iterable[Tuple[CompiledRule, List[int]]]:
+    """Yield (rule, fired rows) for every unscoped rule, driven by the plan's metric buckets.
+
+    Status is constant within a status bucket, so status rules are decided once per
+    bucket instead of once per row; meta rules only visit rows that carry the key.
+    """
+    active_rows = sorted(row for rows in rows_by_status.values() for row in rows)
+    for rule in plan.score_rules:
+        yield rule, _compare_rows(rule, active_rows, columns.score)
+    for value, rules in plan.status_eq.items():
+        rows = rows_by_status.get(value)
+        if rows:
+            for rule in rules:
+                yield rule, rows
+    for rule in plan.status_rules:
+        fired = [row for value, rows in rows_by_status.items() if _decide(rule, value) for row in rows]
+        if fired:
+            yield rule, sorted(fired)
+    for key, rules in plan.meta_rules.items():
+        column = columns.details.get(key)
+        present = [idx for idx in active_rows if column[idx] is not None] if column is not None else []
+        absent: List[int] | None = None
+        for rule in rules:
+            fired = _compare_rows(rule, present, column) if present else []
+            if rule.operator == "!=" and _decide(rule, None):
+                # "!=" is the only comparison a missing detail value can satisfy.
+                if absent is None:
+                    absent = [idx for idx in active_rows if column is None or column[idx] is None]
+                fired = sorted(fired + absent)
+            yield rule, fired
+
+
+def _decide(rule: CompiledRule, value: Any) -> bool:
+    try:
+        return bool(rule.compare(value, rule.threshold))
+    except TypeError:
+        return False
+
+
+def recommend_actions_batch(
+    columns: ScoreColumns,
+    run_id: str | None = None,
+    feature_flags: dict[str, bool] | None = None,
+    policy_rules: List[Dict[str, Any]] | PolicyPlan | None = None,
+    path_engine: "PathEngine | PathOverlay | None" = None,
+) -> List[ActionRecommendation]:
+    feature_flags = feature_flags or {}
+    plan = policy_rules if isinstance(policy_rules, PolicyPlan) else compile_policy_rules(policy_rules or [])
+    hits: List[Tuple[int, int, ActionRecommendation]] = []
+    with span("policy_recommendations_batch") as active_span:
+        if run_id:
+            active_span.set_attribute("waveos.run_id", run_id)
+        active_span.set_attribute("waveos.entity_count", len(columns))
+        _collect_hits(columns, plan, feature_flags, path_engine, hits)
+        # (row, slot) is unique per hit, so the sort never falls through to comparing actions.
+        hits.sort(key=_hit_order)
+        active_span.set_attribute("waveos.action_count", len(hits))
+    return [hit[2] for hit in hits]
+
+
+def _collect_hits(
+    columns: ScoreColumns,
+    plan: PolicyPlan,
+    feature_flags: dict[str, bool],
+    path_engine: "PathEngine | PathOverlay | None",
+    hits: List[Tuple[int, int, ActionRecommendation]],
+) -> None:
+    status = columns.status
+    fail_rows = [idx for idx, code in enumerate(status) if code == 2]
+    warn_rows = [idx for idx, code in enumerate(status) if code == 1]
+    entity_type, entity_id = columns.entity_type, columns.entity_id
+    append = hits.append
+
+    if feature_flags.get("action_reroute", True):
+        reroute = _ActionTemplate(ActionType.REROUTE, "Link health is FAIL; recommend reroute.", {})
+        for idx in fail_rows:
+            parameters = _reroute_parameters(columns.row(idx), path_engine)
+            append((idx, _SLOT_REROUTE, reroute.build(entity_type[idx], entity_id[idx], parameters)))
+    if feature_flags.get("action_rate_limit", True):
+        rate_limit = _ActionTemplate(ActionType.RATE_LIMIT, "Degraded link; reduce load to stabilize.", {"limit_pct": 60})
+        for idx in fail_rows:
+            append((idx, _SLOT_RATE_LIMIT, rate_limit.build(entity_type[idx], entity_id[idx])))
+    if feature_flags.get("action_qos", True):
+        qos = _ActionTemplate(ActionType.QOS_PRIORITIZATION, "Moderate drift detected; prioritize critical traffic.", {"class": "gold"})
+        for idx in warn_rows:
+            append((idx, _SLOT_QOS, qos.build(entity_type[idx], entity_id[idx])))
+    thermal_mask = columns.driver_mask(lambda driver: "temperature" in driver)
+    if thermal_mask and feature_flags.get("action_thermal", True):
+        thermal = _ActionTemplate(
+            ActionType.POWER_THERMAL_CONSTRAINT, "Temperature drift detected; apply thermal constraints.", {"max_temp_c": 75}
+        )
+        drivers = columns.drivers
+        for idx in fail_rows + warn_rows:
+            if drivers[idx] & thermal_mask:
+                append((idx, _SLOT_THERMAL, thermal.build(entity_type[idx], entity_id[idx])))
+
+    rows_by_status = {HealthStatus.FAIL.value: fail_rows, HealthStatus.WARN.value: warn_rows}
+    for rule, fired in _rule_hits(plan, rows_by_status, columns):
+        if not fired:
+            continue
+        template = _ActionTemplate(rule.action, rule.message, rule.parameters)
+        slot = _SLOT_RULES + rule.position
+        for idx in fired:
+            append((idx, slot, template.build(entity_type[idx], entity_id[idx])))
+    if plan.scoped.size:
+        for idx in sorted(fail_rows + warn_rows):
+            row = columns.row(idx)
+            for rule in plan.scoped.candidates(row):
+                if rule.matches(row):
+                    append((idx, _SLOT_RULES + rule.position, rule.recommend(row)))
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Dict, Any
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any
 
 from waveos.models import ActionRecommendation, ActionType, HealthScore, HealthStatus
+from waveos.policy.rules import PolicyPlan, compile_policy_rules
 from waveos.utils import span
 
+if TYPE_CHECKING:
+    from waveos.topology import PathEngine, PathOverlay
+
 
 def recommend_actions(
     scores: Iterable[HealthScore],
     run_id: str | None = None,
     feature_flags: dict[str, bool] | None = None,
-    policy_rules: List[Dict[str, Any]] | None = None,
+    policy_rules: List[Dict[str, Any]] | PolicyPlan | None = None,
+    path_engine: "PathEngine | PathOverlay | None" = None,
 ) -> List[ActionRecommendation]:
     actions: List[ActionRecommendation] = []
     feature_flags = feature_flags or {}
@@ -18,6 +23,7 @@ def recommend_actions(
     enable_rate_limit = feature_flags.get("action_rate_limit", True)
     enable_qos = feature_flags.get("action_qos", True)
     enable_thermal = feature_flags.get("action_thermal", True)
+    plan = policy_rules if isinstance(policy_rules, PolicyPlan) else compile_policy_rules(policy_rules or [])
     with span("policy_recommendations") as active_span:
         if run_id:
             active_span.set_attribute("waveos.run_id", run_id)
@@ -36,7 +42,7 @@ def recommend_actions(
                             entity_type=score.entity_type,
                             entity_id=score.entity_id,
                             rationale="Link health is FAIL; recommend reroute.",
-                            parameters={"priority": "high"},
+                            parameters=_reroute_parameters(score, path_engine),
                         )
                     )
                 if enable_rate_limit:
@@ -69,44 +75,21 @@ def recommend_actions(
                         parameters={"max_temp_c": 75},
                     )
                 )
-            actions.extend(_apply_policy_rules(score, policy_rules or []))
+            if plan:
+                actions.extend(plan.evaluate(score))
         active_span.set_attribute("waveos.action_count", len(actions))
     return actions
 
 
-def _apply_policy_rules(score: HealthScore, rules: List[Dict[str, Any]]) -> List[ActionRecommendation]:
-    results: List[ActionRecommendation] = []
-    for rule in rules:
-        metric = str(rule.get("metric", "score"))
-        if metric.startswith("meta."):
-            value = score_meta_lookup(score, metric.replace("meta.", "", 1))
-        elif metric == "score":
-            value = score.score
-        elif metric == "status":
-            value = score.status.value
-        else:
-            continue
-        operator = str(rule.get("operator", "<="))
-        threshold = rule.get("threshold")
-        if threshold is None:
-            continue
-        if _compare(value, threshold, operator):
-            action = rule.get("action", ActionType.RATE_LIMIT)
-            if isinstance(action, str):
-                try:
-                    action = ActionType(action)
-                except ValueError:
-                    action = ActionType.RATE_LIMIT
-            results.append(
-                ActionRecommendation(
-                    action=action,
-                    entity_type=score.entity_type,
-                    entity_id=score.entity_id,
-                    rationale=rule.get("message", "Policy rule triggered."),
-                    parameters=rule.get("parameters", {}),
-                )
-            )
-    return results
+def _reroute_parameters(score: HealthScore, path_engine: "PathEngine | PathOverlay | None") -> Dict[str, Any]:
+    parameters: Dict[str, Any] = {"priority": "high"}
+    if path_engine is None or score.entity_type != "link":
+        return parameters
+    alternates = path_engine.alternates(score.entity_id)
+    if alternates:
+        parameters["target_path"] = alternates[0].to_dict()
+        parameters["fallback_paths"] = [alternate.to_dict() for alternate in alternates[1:]]
+    return parameters
 
 
 def score_meta_lookup(score: HealthScore, key: str) -> Any:
@@ -114,31 +97,3 @@ def score_meta_lookup(score: HealthScore, key: str) -> Any:
     if isinstance(details, dict):
         return details.get(key)
     return None
-
-
-def _compare(value: Any, threshold: Any, operator: str) -> bool:
-    if operator == "<=":
-        return value <= threshold
-    if operator == "<":
-        return value < threshold
-    if operator == ">=":
-        return value >= threshold
-    if operator == ">":
-        return value > threshold
-    if operator == "==":
-        return value == threshold
-    if operator == "!=":
-        return value != threshold
-    if operator == "contains":
-        if isinstance(value, (list, tuple, set)):
-            return threshold in value
-        if isinstance(value, str):
-            return str(threshold) in value
-        return False
-    if operator == "not_contains":
-        if isinstance(value, (list, tuple, set)):
-            return threshold not in value
-        if isinstance(value, str):
-            return str(threshold) not in value
-        return False
-    return False
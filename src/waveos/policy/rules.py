@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from waveos.models import ActionRecommendation, ActionType, HealthScore, HealthStatus
+from waveos.policy.selectors import EntitySelector, SelectorIndex, parse_selector
+
+
+class PolicyRuleError(ValueError):
+    pass
+
+
+def _contains(value: Any, threshold: Any) -> bool:
+    if isinstance(value, (list, tuple, set)):
+        return threshold in value
+    if isinstance(value, str):
+        return str(threshold) in value
+    return False
+
+
+def _not_contains(value: Any, threshold: Any) -> bool:
+    if isinstance(value, (list, tuple, set)):
+        return threshold not in value
+    if isinstance(value, str):
+        return str(threshold) not in value
+    return False
+
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<=": operator.le,
+    "<": operator.lt,
+    ">=": operator.ge,
+    ">": operator.gt,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "contains": _contains,
+    "not_contains": _not_contains,
+}
+_ORDERING = {"<=", "<", ">=", ">"}
+_STATUS_VALUES = {status.value for status in HealthStatus}
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    position: int
+    rule_id: str
+    metric: str
+    operator: str
+    threshold: Any
+    compare: Callable[[Any, Any], bool]
+    action: ActionType
+    message: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    meta_key: Optional[str] = None
+    selector: Optional[EntitySelector] = None
+
+    def value(self, score: HealthScore) -> Any:
+        if self.meta_key is not None:
+            details = score.details if isinstance(score.details, dict) else {}
+            return details.get(self.meta_key)
+        if self.metric == "score":
+            return score.score
+        return score.status.value
+
+    def matches(self, score: HealthScore) -> bool:
+        try:
+            return bool(self.compare(self.value(score), self.threshold))
+        except TypeError:
+            return False
+
+    def recommend(self, score: HealthScore) -> ActionRecommendation:
+        return ActionRecommendation(
+            action=self.action,
+            entity_type=score.entity_type,
+            entity_id=score.entity_id,
+            rationale=self.message,
+            parameters=dict(self.parameters),
+        )
+
+
+@dataclass
+class PolicyPlan:
+    rules: List[CompiledRule] = field(default_factory=list)
+    score_rules: List[CompiledRule] = field(default_factory=list)
+    status_rules: List[CompiledRule] = field(default_factory=list)
+    status_eq: Dict[str, List[CompiledRule]] = field(default_factory=dict)
+    meta_rules: Dict[str, List[CompiledRule]] = field(default_factory=dict)
+    meta_absent_rules: List[CompiledRule] = field(default_factory=list)
+    scoped: SelectorIndex = field(default_factory=SelectorIndex)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def candidates(self, score: HealthScore) -> List[CompiledRule]:
+        candidates: List[CompiledRule] = [*self.score_rules, *self.status_rules]
+        candidates.extend(self.status_eq.get(score.status.value, ()))
+        details = score.details if isinstance(score.details, dict) else {}
+        if self.meta_rules:
+            for key, rules in self.meta_rules.items():
+                if details.get(key) is not None:
+                    candidates.extend(rules)
+        # "!=" is the only comparison a missing detail value can satisfy.
+        for rule in self.meta_absent_rules:
+            if details.get(rule.meta_key) is None:
+                candidates.append(rule)
+        if self.scoped.size:
+            candidates.extend(self.scoped.candidates(score))
+        candidates.sort(key=lambda rule: rule.position)
+        return candidates
+
+    def evaluate(self, score: HealthScore) -> List[ActionRecommendation]:
+        return [rule.recommend(score) for rule in self.candidates(score) if rule.matches(score)]
+
+
+def compile_rule(position: int, rule: Dict[str, Any]) -> CompiledRule:
+    if not isinstance(rule, dict):
+        raise PolicyRuleError(f"policy_rules[{position}] must be a table/object")
+    label = f"policy_rules[{position}]"
+    metric = str(rule.get("metric", "score"))
+    meta_key = None
+    if metric.startswith("meta."):
+        meta_key = metric.replace("meta.", "", 1)
+        if not meta_key:
+            raise PolicyRuleError(f"{label}: metric 'meta.' is missing a details key")
+    elif metric not in {"score", "status"}:
+        raise PolicyRuleError(f"{label}: unsupported metric {metric!r}")
+    op = str(rule.get("operator", "<="))
+    compare = OPERATORS.get(op)
+    if compare is None:
+        raise PolicyRuleError(f"{label}: unsupported operator {op!r}")
+    threshold = rule.get("threshold")
+    if threshold is None:
+        raise PolicyRuleError(f"{label}: threshold is required")
+    if metric == "score" and op in _ORDERING and not isinstance(threshold, (int, float)):
+        raise PolicyRuleError(f"{label}: score threshold must be numeric")
+    if metric == "status" and op in {"==", "!="} and str(threshold) not in _STATUS_VALUES:
+        raise PolicyRuleError(f"{label}: status threshold must be one of {sorted(_STATUS_VALUES)}")
+    action = rule.get("action", ActionType.RATE_LIMIT)
+    try:
+        action = ActionType(action)
+    except ValueError as exc:
+        raise PolicyRuleError(f"{label}: unknown action {action!r}") from exc
+    parameters = rule.get("parameters", {})
+    if not isinstance(parameters, dict):
+        raise PolicyRuleError(f"{label}: parameters must be a table/object")
+    selector = parse_selector(rule["selector"], label) if rule.get("selector") is not None else None
+    return CompiledRule(
+        position=position,
+        rule_id=str(rule.get("id", f"rule-{position}")),
+        metric=metric,
+        operator=op,
+        threshold=threshold,
+        compare=compare,
+        action=action,
+        message=str(rule.get("message", "Policy rule triggered.")),
+        parameters=parameters,
+        meta_key=meta_key,
+        selector=selector,
+    )
+
+
+def compile_policy_rules(rules: Iterable[Dict[str, Any]]) -> PolicyPlan:
+    plan = PolicyPlan()
+    for position, rule in enumerate(rules):
+        compiled = compile_rule(position, rule)
+        plan.rules.append(compiled)
+        if compiled.selector is not None:
+            plan.scoped.add(compiled)
+        elif compiled.meta_key is not None:
+            plan.meta_rules.setdefault(compiled.meta_key, []).append(compiled)
+            if compiled.operator == "!=":
+                plan.meta_absent_rules.append(compiled)
+        elif compiled.metric == "score":
+            plan.score_rules.append(compiled)
+        elif compiled.operator == "==":
+            plan.status_eq.setdefault(str(compiled.threshold), []).append(compiled)
+        else:
+            plan.status_rules.append(compiled)
+    plan.scoped.freeze()
+    return plan
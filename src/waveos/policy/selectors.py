@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Pattern
+
+from waveos.models import HealthScore
+
+if TYPE_CHECKING:
+    from waveos.policy.rules import CompiledRule
+
+SELECTOR_KEYS = {"entity_type", "glob", "prefix", "regex", "labels"}
+_WILDCARDS = re.compile(r"[*?\[]")
+
+
+@dataclass(frozen=True)
+class EntitySelector:
+    entity_type: Optional[str] = None
+    glob: Optional[str] = None
+    prefix: Optional[str] = None
+    regex: Optional[Pattern[str]] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def literal_prefix(self) -> str:
+        # Longest literal that every matching entity_id must start with; used as the trie key.
+        candidates = [self.prefix or ""]
+        if self.glob:
+            wildcard = _WILDCARDS.search(self.glob)
+            candidates.append(self.glob[: wildcard.start()] if wildcard else self.glob)
+        return max(candidates, key=len)
+
+    def matches(self, score: HealthScore) -> bool:
+        if self.entity_type is not None and score.entity_type != self.entity_type:
+            return False
+        entity_id = score.entity_id
+        if self.prefix is not None and not entity_id.startswith(self.prefix):
+            return False
+        if self.glob is not None and not fnmatchcase(entity_id, self.glob):
+            return False
+        if self.regex is not None and not self.regex.search(entity_id):
+            return False
+        if self.labels:
+            details = score.details if isinstance(score.details, dict) else {}
+            labels = details.get("labels") or {}
+            if any(str(labels.get(key)) != value for key, value in self.labels.items()):
+                return False
+        return True
+
+
+def parse_selector(payload: Any, label: str) -> EntitySelector:
+    from waveos.policy.rules import PolicyRuleError
+
+    if not isinstance(payload, dict) or not payload:
+        raise PolicyRuleError(f"{label}: selector must be a non-empty table/object")
+    unknown = set(payload) - SELECTOR_KEYS
+    if unknown:
+        raise PolicyRuleError(f"{label}: unsupported selector keys {sorted(unknown)}")
+    regex = None
+    if payload.get("regex") is not None:
+        try:
+            regex = re.compile(str(payload["regex"]))
+        except re.error as exc:
+            raise PolicyRuleError(f"{label}: invalid selector regex: {exc}") from exc
+    labels = payload.get("labels") or {}
+    if not isinstance(labels, dict):
+        raise PolicyRuleError(f"{label}: selector labels must be a table/object")
+    return EntitySelector(
+        entity_type=str(payload["entity_type"]) if payload.get("entity_type") is not None else None,
+        glob=str(payload["glob"]) if payload.get("glob") is not None else None,
+        prefix=str(payload["prefix"]) if payload.get("prefix") is not None else None,
+        regex=regex,
+        labels={str(key): str(value) for key, value in labels.items()},
+    )
+
+
+def _joinable(pattern: Pattern[str]) -> bool:
+    # Joined into one alternation, group numbers shift, so backreferences and conditionals
+    # (\1, (?(1)...)) would point at another pattern's groups, and inline flags can no longer
+    # be scoped to their own pattern. Only group-free, default-flag patterns keep their meaning.
+    return pattern.groups == 0 and pattern.flags == re.UNICODE
+
+
+class _TrieNode:
+    __slots__ = ("children", "rules")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.rules: List["CompiledRule"] = []
+
+
+class SelectorIndex:
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._regex_rules: List["CompiledRule"] = []
+        # Regex-only rules whose pattern cannot be joined into the filter; always checked one by one.
+        self._separate_rules: List["CompiledRule"] = []
+        self._regex_filter: Optional[Pattern[str]] = None
+        self.size = 0
+
+    def add(self, rule: "CompiledRule") -> None:
+        selector = rule.selector
+        assert selector is not None
+        self.size += 1
+        prefix = selector.literal_prefix
+        if not prefix and selector.regex is not None:
+            if _joinable(selector.regex):
+                self._regex_rules.append(rule)
+            else:
+                self._separate_rules.append(rule)
+            return
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.rules.append(rule)
+
+    def freeze(self) -> None:
+        if not self._regex_rules:
+            return
+        # One pass over the id decides whether any joinable regex-only rule can match at all.
+        try:
+            self._regex_filter = re.compile("|".join(f"(?:{rule.selector.regex.pattern})" for rule in self._regex_rules))
+        except re.error:
+            # Anything _joinable missed that still cannot be joined; check each pattern instead.
+            self._regex_filter = None
+
+    def candidates(self, score: HealthScore) -> List["CompiledRule"]:
+        entity_id = score.entity_id
+        found: List["CompiledRule"] = list(self._root.rules)
+        node = self._root
+        for char in entity_id:
+            node = node.children.get(char)
+            if node is None:
+                break
+            found.extend(node.rules)
+        if self._regex_rules and (self._regex_filter is None or self._regex_filter.search(entity_id)):
+            found.extend(self._regex_rules)
+        found.extend(self._separate_rules)
+        return [rule for rule in found if rule.selector.matches(score)]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence
+
+from waveos.models import ActionRecommendation, HealthScore
+from waveos.policy.engine import recommend_actions
+from waveos.policy.rules import PolicyPlan
+
+if TYPE_CHECKING:
+    from waveos.topology import PathEngine, PathOverlay
+
+
+@dataclass
+class ShadowPolicy:
+    policy_version: str
+    source: str
+    plan: PolicyPlan
+    feature_flags: Dict[str, bool] = field(default_factory=dict)
+
+
+def load_shadow_policies(paths: Iterable[str | Path]) -> List[ShadowPolicy]:
+    from waveos.utils.config import load_config
+
+    shadows: List[ShadowPolicy] = []
+    for path in paths:
+        # Environment overrides belong to the live config, not to the candidate policy files.
+        shadow_config = load_config(Path(path), include_env=False)
+        shadows.append(
+            ShadowPolicy(
+                policy_version=shadow_config.policy_version or Path(path).stem,
+                source=str(path),
+                plan=shadow_config.policy_plan,
+                feature_flags=shadow_config.feature_flags,
+            )
+        )
+    return shadows
+
+
+def _compact(action: ActionRecommendation) -> Dict[str, Any]:
+    return {
+        "action": action.action.value,
+        "entity_type": action.entity_type,
+        "entity_id": action.entity_id,
+        "parameters": action.parameters,
+    }
+
+
+def diff_actions(
+    current: Iterable[ActionRecommendation],
+    candidate: Iterable[ActionRecommendation],
+) -> Dict[str, List[Dict[str, Any]]]:
+    # Multiset diff on the actuator-relevant fields; rationale text changes are not behaviour changes.
+    items: Dict[str, Dict[str, Any]] = {}
+
+    def _counts(actions: Iterable[ActionRecommendation]) -> Counter:
+        counts: Counter = Counter()
+        for item in map(_compact, actions):
+            key = json.dumps(item, sort_keys=True, default=str)
+            items.setdefault(key, item)
+            counts[key] += 1
+        return counts
+
+    current_counts, candidate_counts = _counts(current), _counts(candidate)
+    added = candidate_counts - current_counts
+    removed = current_counts - candidate_counts
+    return {
+        "added": [items[key] for key in sorted(added) for _ in range(added[key])],
+        "removed": [items[key] for key in sorted(removed) for _ in range(removed[key])],
+    }
+
+
+def evaluate_shadow_policies(
+    scores: Sequence[HealthScore],
+    actions: Sequence[ActionRecommendation],
+    shadows: Iterable[ShadowPolicy],
+    run_id: str | None = None,
+    policy_version: str | None = None,
+    path_engine: "PathEngine | PathOverlay | None" = None,
+) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for shadow in shadows:
+        candidate = recommend_actions(
+            scores,
+            run_id=run_id,
+            feature_flags=shadow.feature_flags,
+            policy_rules=shadow.plan,
+            path_engine=path_engine,
+        )
+        diff = diff_actions(actions, candidate)
+        results.append(
+            {
+                "policy_version": shadow.policy_version,
+                "source": shadow.source,
+                "action_count": len(candidate),
+                "added_count": len(diff["added"]),
+                "removed_count": len(diff["removed"]),
+                **diff,
+            }
+        )
+    return {
+        "run_id": run_id,
+        "policy_version": policy_version,
+        "action_count": len(actions),
+        "shadows": results,
+    }
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from waveos.models import ActionRecommendation, HealthScore, HealthStatus
+from waveos.scoring.health import status_for_score
+from waveos.utils import get_logger, write_json
+
+logger = get_logger("waveos.policy.state")
+
+_SEVERITY = {HealthStatus.PASS: 0, HealthStatus.WARN: 1, HealthStatus.FAIL: 2}
+
+
+def action_key(action: ActionRecommendation) -> str:
+    return f"{action.entity_type}:{action.entity_id}|{action.action.value}"
+
+
+def stable_parameters(parameters: dict) -> dict:
+    """The parameters that identify an action in force; live-load details recomputed every run are dropped."""
+    stable = {key: value for key, value in parameters.items() if key != "fallback_paths"}
+    target = stable.get("target_path")
+    if isinstance(target, dict):
+        # Residual capacity moves with load every run; only the route itself is a change.
+        stable["target_path"] = target.get("links")
+    return stable
+
+
+@dataclass
+class ActionDiff:
+    applied: List[ActionRecommendation] = field(default_factory=list)
+    unchanged: List[ActionRecommendation] = field(default_factory=list)
+    suppressed: List[ActionRecommendation] = field(default_factory=list)
+    held: List[str] = field(default_factory=list)
+    released: List[str] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "applied": len(self.applied),
+            "unchanged": len(self.unchanged),
+            "suppressed": len(self.suppressed),
+            "held": len(self.held),
+            "released": len(self.released),
+        }
+
+
+class ActionStateStore:
+    def __init__(
+        self,
+        cooldown_seconds: float = 0.0,
+        min_dwell_seconds: float = 0.0,
+        hysteresis_band: float = 0.0,
+    ) -> None:
+        self.cooldown_seconds = cooldown_seconds
+        self.min_dwell_seconds = min_dwell_seconds
+        self.hysteresis_band = hysteresis_band
+        # key -> {"applied_at", "status", "parameters"} for actions currently in force.
+        self.active: Dict[str, dict] = {}
+        # key -> epoch seconds the action was last released, kept only while its cooldown runs.
+        self.released: Dict[str, float] = {}
+
+    def to_dict(self) -> dict:
+        return {"schema_version": 1, "active": self.active, "released": self.released}
+
+    @classmethod
+    def load(cls, path: Path | None, **kwargs) -> "ActionStateStore":
+        store = cls(**kwargs)
+        if not path or not path.exists():
+            return store
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Failed to load action state from %s: %s", path, exc)
+            return store
+        if payload.get("schema_version") != 1:
+            logger.warning("Ignoring action state with unsupported schema at %s", path)
+            return store
+        store.active = dict(payload.get("active", {}))
+        store.released = {key: float(value) for key, value in payload.get("released", {}).items()}
+        return store
+
+    def save(self, path: Path) -> None:
+        write_json(path, self.to_dict())
+
+    def _recovered(self, entry: dict, score: Optional[HealthScore]) -> bool:
+        if score is None:
+            return True
+        # Only release once the entity clears its apply-time status by the hysteresis band.
+        applied_status = HealthStatus(entry.get("status", HealthStatus.FAIL.value))
+        banded = status_for_score(score.score - self.hysteresis_band)
+        return _SEVERITY[banded] < _SEVERITY[applied_status]
+
+    def reconcile(
+        self,
+        actions: Iterable[ActionRecommendation],
+        scores: Iterable[HealthScore],
+        now: float,
+    ) -> ActionDiff:
+        score_map = {f"{score.entity_type}:{score.entity_id}": score for score in scores}
+        diff = ActionDiff()
+        desired: Dict[str, ActionRecommendation] = {}
+        for action in actions:
+            desired.setdefault(action_key(action), action)
+
+        for key, action in desired.items():
+            entry = self.active.get(key)
+            score = score_map.get(key.split("|", 1)[0])
+            if entry is not None:
+                applied_status = HealthStatus(entry.get("status", HealthStatus.FAIL.value))
+                if score is not None and _SEVERITY[score.status] > _SEVERITY[applied_status]:
+                    # Escalated while in force: release is judged against the worse status from now on.
+                    entry["status"] = score.status.value
+                if stable_parameters(entry.get("parameters", {})) == stable_parameters(action.parameters):
+                    diff.unchanged.append(action)
+                    continue
+                # A real change (e.g. a new reroute target) waits out the dwell like a release does.
+                if now - float(entry.get("applied_at", now)) < self.min_dwell_seconds:
+                    diff.held.append(key)
+                    continue
+                entry["parameters"] = action.parameters
+                entry["applied_at"] = now
+                diff.applied.append(action)
+                continue
+            released_at = self.released.get(key)
+            if released_at is not None and now - released_at < self.cooldown_seconds:
+                diff.suppressed.append(action)
+                continue
+            self.active[key] = {
+                "applied_at": now,
+                "status": score.status.value if score else HealthStatus.FAIL.value,
+                "parameters": action.parameters,
+            }
+            self.released.pop(key, None)
+            diff.applied.append(action)
+
+        for key in [key for key in self.active if key not in desired]:
+            entry = self.active[key]
+            dwell_elapsed = now - float(entry.get("applied_at", now)) >= self.min_dwell_seconds
+            if dwell_elapsed and self._recovered(entry, score_map.get(key.split("|", 1)[0])):
+                del self.active[key]
+                self.released[key] = now
+                diff.released.append(key)
+            else:
+                diff.held.append(key)
+        self.prune(now)
+        return diff
+
+    def prune(self, now: float) -> int:
+        """Drops release times whose cooldown has lapsed; they can no longer suppress anything."""
+        expired = [key for key, released_at in self.released.items() if now - released_at >= self.cooldown_seconds]
+        for key in expired:
+            del self.released[key]
+        return len(expired)
@@ -1,3 +1,22 @@
-from waveos.reporting.report import render_report, write_outputs
+from __future__ import annotations
 
-__all__ = ["render_report", "write_outputs"]
+from typing import TYPE_CHECKING
+
+from waveos._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from waveos.reporting.evidence import EvidencePackBuilder
+    from waveos.reporting.report import render_report, write_outputs
+    from waveos.reporting.templating import clear_template_cache, configure_template_cache, get_template
+
+# Resolved on first access; report.py pulls in the models and the output writers.
+_EXPORTS = {
+    "EvidencePackBuilder": "waveos.reporting.evidence",
+    "clear_template_cache": "waveos.reporting.templating",
+    "configure_template_cache": "waveos.reporting.templating",
+    "get_template": "waveos.reporting.templating",
+    "render_report": "waveos.reporting.report",
+    "write_outputs": "waveos.reporting.report",
+}
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
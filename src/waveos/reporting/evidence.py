@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Dict, List, Optional, Set
+
+from waveos.utils import WriteSession, get_logger
+
+logger = get_logger("waveos.reporting.evidence")
+
+EVIDENCE_PACK_PREFIX = "evidence_pack_"
+# Recompressing these costs CPU and saves nothing, so they are stored as-is.
+COMPRESSED_SUFFIXES = {".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".lz4", ".parquet", ".png", ".jpg", ".jpeg", ".gif", ".webp"}
+_CHUNK = 1 << 20
+
+
+@dataclass
+class PackedMember:
+    arcname: str
+    mtime: float
+    file_size: int
+    crc: int
+    compress_type: int
+    payload: bytes
+    digest: Optional[str] = None
+    reused: bool = False
+
+
+def _read_chunks(path: Path):
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK), b""):
+            yield chunk
+
+
+class EvidencePackBuilder:
+    def __init__(
+        self,
+        pack_path: Path,
+        workers: int = 4,
+        compresslevel: int = 6,
+        store_dir: Optional[Path] = None,
+    ) -> None:
+        self.pack_path = pack_path
+        self.compresslevel = compresslevel
+        self.store_dir = store_dir
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="evidence")
+        self._futures: List[Future] = []
+        self._names: Set[str] = set()
+        self.stats: Dict[str, int] = {"members": 0, "stored": 0, "deflated": 0, "reused": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def add(self, path: Path, arcname: Optional[str] = None) -> None:
+        # Compression starts as soon as an artifact is written, overlapping with the remaining writers.
+        arcname = arcname or path.name
+        if arcname in self._names or path == self.pack_path:
+            return
+        self._names.add(arcname)
+        self._futures.append(self._executor.submit(self._pack, path, arcname))
+
+    def add_remaining(self, directory: Path, skip: Collection[Path] = ()) -> None:
+        for path in sorted(directory.iterdir()):
+            # Dotfiles are bookkeeping (e.g. the digest cache), not run artifacts.
+            if not path.is_file() or path.name.startswith((EVIDENCE_PACK_PREFIX, ".")) or path in skip:
+                continue
+            self.add(path)
+
+    def _blob_path(self, digest: str) -> Path:
+        assert self.store_dir is not None
+        return self.store_dir / digest[:2] / f"{digest}.deflate"
+
+    def _pack(self, path: Path, arcname: str) -> PackedMember:
+        stat = path.stat()
+        if path.suffix.lower() in COMPRESSED_SUFFIXES:
+            crc = 0
+            parts = []
+            for chunk in _read_chunks(path):
+                crc = zlib.crc32(chunk, crc)
+                parts.append(chunk)
+            return PackedMember(arcname, stat.st_mtime, stat.st_size, crc, zipfile.ZIP_STORED, b"".join(parts))
+        digest = None
+        if self.store_dir is not None:
+            hasher = hashlib.sha256()
+            crc = 0
+            for chunk in _read_chunks(path):
+                hasher.update(chunk)
+                crc = zlib.crc32(chunk, crc)
+            digest = hasher.hexdigest()
+            blob = self._blob_path(digest)
+            if blob.exists():
+                return PackedMember(
+                    arcname, stat.st_mtime, stat.st_size, crc, zipfile.ZIP_DEFLATED, blob.read_bytes(), digest, True
+                )
+        # Raw deflate (wbits=-15) is exactly the member payload format zip expects; zlib releases the GIL.
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        crc = 0
+        parts = []
+        for chunk in _read_chunks(path):
+            crc = zlib.crc32(chunk, crc)
+            parts.append(compressor.compress(chunk))
+        parts.append(compressor.flush())
+        payload = b"".join(parts)
+        if digest is not None:
+            blob = self._blob_path(digest)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, blob)
+        return PackedMember(arcname, stat.st_mtime, stat.st_size, crc, zipfile.ZIP_DEFLATED, payload, digest)
+
+    def _write_member(self, handle: zipfile.ZipFile, member: PackedMember) -> None:
+        zinfo = zipfile.ZipInfo(member.arcname, date_time=time.localtime(member.mtime)[:6])
+        zinfo.external_attr = 0o600 << 16
+        zinfo.compress_type = member.compress_type
+        zinfo.file_size = member.file_size
+        zinfo.compress_size = len(member.payload)
+        zinfo.CRC = member.crc
+        zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+        # ZipFile has no public API for already-compressed payloads; this mirrors what
+        # ZipFile.open(mode="w") does once compression has finished.
+        with handle._lock:
+            handle._writecheck(zinfo)
+            handle._didModify = True
+            zinfo.header_offset = handle.fp.tell()
+            handle.fp.write(zinfo.FileHeader(zip64))
+            handle.fp.write(member.payload)
+            handle.start_dir = handle.fp.tell()
+            handle.filelist.append(zinfo)
+            handle.NameToInfo[zinfo.filename] = zinfo
+
+    def cancel(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self, session: Optional[WriteSession] = None) -> Path:
+        tmp_path = self.pack_path.with_name(f"{self.pack_path.name}.tmp")
+        try:
+            with zipfile.ZipFile(tmp_path, "w", allowZip64=True) as handle:
+                for future in as_completed(self._futures):
+                    member = future.result()
+                    self._write_member(handle, member)
+                    self.stats["members"] += 1
+                    self.stats["stored" if member.compress_type == zipfile.ZIP_STORED else "deflated"] += 1
+                    self.stats["reused"] += int(member.reused)
+                    self.stats["bytes_in"] += member.file_size
+                    self.stats["bytes_out"] += len(member.payload)
+            if session is not None:
+                session.stage(tmp_path, self.pack_path)
+            else:
+                os.replace(tmp_path, self.pack_path)
+        finally:
+            self._executor.shutdown(wait=True)
+            if session is None or session.pending(self.pack_path) != tmp_path:
+                tmp_path.unlink(missing_ok=True)
+        logger.info("Evidence pack %s: %s", self.pack_path.name, self.stats)
+        return self.pack_path
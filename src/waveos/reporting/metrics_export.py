@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from waveos.models import RunStats
+from waveos.utils import WriteSession, atomic_open, get_logger
+
+logger = get_logger("waveos.reporting.metrics")
+
+LONG_FIELDS = ["run_id", "entity_type", "entity_id", "metric", "value", "window_start", "window_end"]
+WIDE_KEY_FIELDS = ["entity_type", "entity_id", "window_start", "window_end"]
+
+
+def metric_columns(run_stats: Iterable[RunStats]) -> List[str]:
+    names = set()
+    for stat in run_stats:
+        names.update(stat.metrics)
+    return sorted(names)
+
+
+def iter_long_rows(run_stats: Iterable[RunStats], run_id: str | None) -> Iterator[dict]:
+    for stat in run_stats:
+        for metric, value in stat.metrics.items():
+            yield {
+                "run_id": run_id or "",
+                "entity_type": stat.entity_type,
+                "entity_id": stat.entity_id,
+                "metric": metric,
+                "value": value,
+                "window_start": stat.window_start,
+                "window_end": stat.window_end,
+            }
+
+
+def write_metrics_wide_csv(path: Path, run_stats: Sequence[RunStats], session: Optional[WriteSession] = None) -> List[str]:
+    # One row per entity; run_id lives in run_meta.json instead of on every row.
+    columns = metric_columns(run_stats)
+    with atomic_open(path, session, newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow([*WIDE_KEY_FIELDS, *columns])
+        for stat in run_stats:
+            metrics = stat.metrics
+            writer.writerow(
+                [
+                    stat.entity_type,
+                    stat.entity_id,
+                    stat.window_start.isoformat(),
+                    stat.window_end.isoformat(),
+                    *(metrics.get(name, "") for name in columns),
+                ]
+            )
+    return columns
+
+
+def write_metrics_parquet(
+    path: Path,
+    run_stats: Sequence[RunStats],
+    run_id: str | None = None,
+    session: Optional[WriteSession] = None,
+) -> Optional[Path]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.warning("pyarrow is not installed; skipping %s (install waveos[parquet])", path.name)
+        return None
+    columns = metric_columns(run_stats)
+    arrays = {
+        "entity_type": pa.array([stat.entity_type for stat in run_stats], pa.string()).dictionary_encode(),
+        "entity_id": pa.array([stat.entity_id for stat in run_stats], pa.string()).dictionary_encode(),
+        "window_start": pa.array([stat.window_start for stat in run_stats], pa.timestamp("us", tz="UTC")),
+        "window_end": pa.array([stat.window_end for stat in run_stats], pa.timestamp("us", tz="UTC")),
+    }
+    for name in columns:
+        arrays[name] = pa.array([stat.metrics.get(name) for stat in run_stats], pa.float64())
+    table = pa.table(arrays).replace_schema_metadata({"run_id": run_id or ""})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    if session is not None:
+        session.stage(tmp_path, path)
+    else:
+        tmp_path.replace(path)
+    return path
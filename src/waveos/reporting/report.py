@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import heapq
+import json
+import shutil
+from collections import Counter
+from enum import Enum
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List, Optional
-import zipfile
-
-from jinja2 import Environment, FileSystemLoader
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from waveos.models import ActionRecommendation, Event, HealthScore, RunStats
-from waveos.utils import span, write_csv, write_json, write_jsonl
+from waveos.reporting.evidence import EVIDENCE_PACK_PREFIX, EvidencePackBuilder
+from waveos.reporting.metrics_export import LONG_FIELDS, iter_long_rows, write_metrics_parquet, write_metrics_wide_csv
+from waveos.reporting.templating import get_template
+from waveos.utils import DIGEST_CACHE_NAME, DigestCache, WriteSession, atomic_open, span, write_csv, write_json, write_json_array, write_jsonl
 
 
 def write_outputs(
@@ -20,12 +27,33 @@ def write_outputs(
     run_meta: Optional[dict] = None,
     run_stats: Optional[Iterable[RunStats]] = None,
     evidence_pack_enabled: bool = True,
+    report_mode: str = "full",
+    report_top_n: int = 100,
+    report_page_size: int = 5000,
+    evidence_workers: int = 4,
+    evidence_store_dir: Optional[Path] = None,
+    output_workers: int = 4,
+    metrics_format: str = "wide",
+    metrics_parquet: bool = False,
+    durability: str = "none",
+    skip_unchanged: bool = False,
+    rollups: Optional[Iterable[HealthScore]] = None,
 ) -> Path:
     out_dir.mkdir(parents=True, exist_ok=True)
-    health_payload = [score.model_dump() for score in health_scores]
-    events_payload = [event.model_dump() for event in events]
-    actions_payload = [action.model_dump() for action in actions]
-    explainability_payload = _build_explainability(health_payload, actions_payload, run_id=run_id) if explainability else []
+    # Keep references to the source models only; each artifact serializes straight from them.
+    health_scores = list(health_scores)
+    events = list(events)
+    actions = list(actions)
+    run_stats = list(run_stats or [])
+    # Every artifact is staged next to its target and renamed in one group once all writers succeed.
+    session = WriteSession(durability, digests=DigestCache(out_dir / DIGEST_CACHE_NAME) if skip_unchanged else None)
+    evidence: Optional[EvidencePackBuilder] = None
+    if evidence_pack_enabled:
+        evidence = EvidencePackBuilder(
+            out_dir / f"{EVIDENCE_PACK_PREFIX}{run_id or 'run'}.zip",
+            workers=evidence_workers,
+            store_dir=evidence_store_dir,
+        )
 
     health_path = out_dir / "health_summary.json"
     events_path = out_dir / "events.jsonl"
@@ -33,94 +61,249 @@ def write_outputs(
     explainability_path = out_dir / "explainability.json"
     run_meta_path = out_dir / "run_meta.json"
     metrics_path = out_dir / "metrics.csv"
-    write_json(health_path, health_payload)
-    write_json(actions_path, actions_payload)
+    report_path = out_dir / "report.html"
+    rollups_path = out_dir / "rollups.json"
+
+    def _write(path: Path, writer: Callable[[], object]) -> Optional[Path]:
+        writer()
+        # Optional writers (Parquet without pyarrow) stage nothing when they skip.
+        return path if session.pending(path) is not None or path.exists() else None
+
+    tasks: List[Tuple[Path, Callable[[], object]]] = [
+        (health_path, lambda: write_json_array(health_path, (score.model_dump() for score in health_scores), session)),
+        (actions_path, lambda: write_json_array(actions_path, (action.model_dump() for action in actions), session)),
+        (events_path, lambda: write_jsonl(events_path, (event.model_dump() for event in events), session)),
+        (
+            report_path,
+            lambda: render_report(
+                out_dir,
+                health_scores,
+                events,
+                actions,
+                run_id=run_id,
+                mode=report_mode,
+                top_n=report_top_n,
+                page_size=report_page_size,
+                session=session,
+            ),
+        ),
+    ]
     if explainability:
-        write_json(explainability_path, explainability_payload)
+        tasks.append(
+            (
+                explainability_path,
+                lambda: write_json_array(
+                    explainability_path, _iter_explainability(health_scores, actions, run_id=run_id), session
+                ),
+            )
+        )
     else:
         explainability_path.unlink(missing_ok=True)
-    write_jsonl(events_path, events_payload)
-    if run_meta:
-        write_json(run_meta_path, run_meta)
-    if run_stats:
-        rows = []
-        for stat in run_stats:
-            for metric, value in stat.metrics.items():
-                rows.append(
-                    {
-                        "run_id": run_id or "",
-                        "entity_type": stat.entity_type,
-                        "entity_id": stat.entity_id,
-                        "metric": metric,
-                        "value": value,
-                        "window_start": stat.window_start,
-                        "window_end": stat.window_end,
-                    }
+    if rollups is not None:
+        # Device/path/workload rollups are derived views, kept out of the link-level summary and report.
+        rollup_scores = list(rollups)
+        tasks.append((rollups_path, lambda: write_json_array(rollups_path, (score.model_dump() for score in rollup_scores), session)))
+    else:
+        rollups_path.unlink(missing_ok=True)
+    if any(stat.metrics for stat in run_stats):
+        if metrics_format == "long":
+            tasks.append((metrics_path, lambda: write_csv(metrics_path, iter_long_rows(run_stats, run_id), LONG_FIELDS, session)))
+        else:
+            tasks.append((metrics_path, lambda: write_metrics_wide_csv(metrics_path, run_stats, session)))
+        if metrics_parquet:
+            parquet_path = out_dir / "metrics.parquet"
+            tasks.append(
+                (
+                    parquet_path,
+                    lambda: write_metrics_parquet(parquet_path, run_stats, run_id=run_id, session=session)
+                    or parquet_path.unlink(missing_ok=True),
                 )
-        if rows:
-            write_csv(metrics_path, rows, fieldnames=list(rows[0].keys()))
+            )
 
-    report_path = render_report(out_dir, health_payload, events_payload, actions_payload, run_id=run_id)
-    if evidence_pack_enabled:
-        _export_evidence_pack(out_dir, run_id)
+    # Artifacts are independent, so the phase takes as long as the slowest one.
+    try:
+        with span("write_outputs") as active_span, ThreadPoolExecutor(
+            max_workers=max(1, output_workers), thread_name_prefix="output"
+        ) as executor:
+            if run_id:
+                active_span.set_attribute("waveos.run_id", run_id)
+            active_span.set_attribute("waveos.output_durability", durability)
+            futures = [executor.submit(_write, path, writer) for path, writer in tasks]
+            for future in as_completed(futures):
+                path = future.result()
+                if evidence and path is not None:
+                    # Pack the staged copy; the target only appears at commit.
+                    evidence.add(session.pending(path) or path, arcname=path.name)
+        if run_meta:
+            # Written last so it can report what the other writers skipped.
+            run_meta = {**run_meta, "output_writes": {"durability": durability, **session.stats()}}
+            write_json(run_meta_path, run_meta, session)
+            if evidence:
+                evidence.add(session.pending(run_meta_path) or run_meta_path, arcname=run_meta_path.name)
+        if evidence:
+            # Other top-level artifacts of this run (drift, shadow diff, enforced actions); never other runs' packs.
+            evidence.add_remaining(out_dir, skip=session.pending_temp_paths())
+            evidence.close(session)
+            evidence = None
+        session.commit()
+    except BaseException:
+        if evidence:
+            evidence.cancel()
+        session.abort()
+        raise
     return report_path
 
 
-def _export_evidence_pack(out_dir: Path, run_id: str | None) -> None:
-    name = f"evidence_pack_{run_id or 'run'}.zip"
-    pack_path = out_dir / name
-    with zipfile.ZipFile(pack_path, "w", compression=zipfile.ZIP_DEFLATED) as handle:
-        for path in out_dir.iterdir():
-            if path.is_file() and path.name != pack_path.name:
-                handle.write(path, arcname=path.name)
+def _field(item: Any, key: str, default: Any = None) -> Any:
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
 
 
-def _build_explainability(
-    health_payload: List[dict],
-    actions_payload: List[dict],
+def _iter_explainability(
+    health_scores: Iterable[Any],
+    actions: Iterable[Any],
     run_id: str | None = None,
-) -> List[dict]:
-    health_map = {(h["entity_type"], h["entity_id"]): h for h in health_payload}
-    explainability: List[dict] = []
-    for action in actions_payload:
-        key = (action["entity_type"], action["entity_id"])
-        health = health_map.get(key, {})
-        explainability.append(
-            {
-                "schema_version": 1,
-                "run_id": run_id,
-                "entity_type": action["entity_type"],
-                "entity_id": action["entity_id"],
-                "action": action["action"],
-                "rationale": action.get("rationale"),
-                "drivers": health.get("drivers", []),
-                "status": health.get("status"),
-                "score": health.get("score"),
-            }
-        )
-    return explainability
+) -> Iterator[dict]:
+    health_map = {(_field(h, "entity_type"), _field(h, "entity_id")): h for h in health_scores}
+    for action in actions:
+        key = (_field(action, "entity_type"), _field(action, "entity_id"))
+        health = health_map.get(key)
+        yield {
+            "schema_version": 1,
+            "run_id": run_id,
+            "entity_type": key[0],
+            "entity_id": key[1],
+            "action": _field(action, "action"),
+            "rationale": _field(action, "rationale"),
+            "drivers": _field(health, "drivers", []) if health is not None else [],
+            "status": _field(health, "status") if health is not None else None,
+            "score": _field(health, "score") if health is not None else None,
+        }
 
 
 def render_report(
     out_dir: Path,
-    health_payload: List[dict],
-    events_payload: List[dict],
-    actions_payload: List[dict],
+    health_payload: Sequence[Any],
+    events_payload: Sequence[Any],
+    actions_payload: Sequence[Any],
     run_id: str | None = None,
+    mode: str = "full",
+    top_n: int = 100,
+    page_size: int = 5000,
+    session: Optional[WriteSession] = None,
 ) -> Path:
-    templates_dir = Path(__file__).parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir), autoescape=True)
-    template = env.get_template("report.html.j2")
+    report_path = out_dir / "report.html"
     with span("report_render") as active_span:
         if run_id:
             active_span.set_attribute("waveos.run_id", run_id)
         active_span.set_attribute("waveos.action_count", len(actions_payload))
         active_span.set_attribute("waveos.event_count", len(events_payload))
-        html = template.render(
-            health_scores=health_payload,
-            events=events_payload,
-            actions=actions_payload,
-        )
-    report_path = out_dir / "report.html"
-    report_path.write_text(html, encoding="utf-8")
+        active_span.set_attribute("waveos.report_mode", mode)
+        if mode == "paged":
+            context = _paged_context(out_dir, health_payload, events_payload, actions_payload, run_id, top_n, page_size)
+            template = get_template("report_paged.html.j2")
+        else:
+            context = {"health_scores": health_payload, "events": events_payload, "actions": actions_payload}
+            template = get_template("report.html.j2")
+        # Stream to disk instead of materializing the whole document as one string.
+        with atomic_open(report_path, session) as handle:
+            handle.writelines(template.generate(**context))
     return report_path
+
+
+_REPORT_DATA_DIR = "report_data"
+_PAGED_TABLES = (
+    ("health", "Health Summary", ("Entity Type", "Entity", "Status", "Score", "Drivers")),
+    ("actions", "Recommended Actions", ("Action", "Entity Type", "Entity", "Rationale")),
+    ("events", "Events", ("Timestamp", "Level", "Message")),
+)
+
+
+def _write_pages(data_dir: Path, name: str, rows: Iterable[list], page_size: int) -> Tuple[int, int]:
+    pages = 0
+    count = 0
+    for page in _chunks(rows, page_size):
+        payload = json.dumps(page, separators=(",", ":"), default=str)
+        (data_dir / f"{name}-{pages}.js").write_text(
+            f"window.WAVEOS_PAGE({json.dumps(name)},{pages},{payload});\n", encoding="utf-8"
+        )
+        pages += 1
+        count += len(page)
+    return pages, count
+
+
+def _label(value: object) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+def _chunks(rows: Iterable[list], size: int) -> Iterator[List[list]]:
+    iterator = iter(rows)
+    while True:
+        page = list(islice(iterator, size))
+        if not page:
+            return
+        yield page
+
+
+def _paged_context(
+    out_dir: Path,
+    health_payload: Sequence[Any],
+    events_payload: Sequence[Any],
+    actions_payload: Sequence[Any],
+    run_id: str | None,
+    top_n: int,
+    page_size: int,
+) -> dict:
+    data_dir = out_dir / _REPORT_DATA_DIR
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+    data_dir.mkdir(parents=True)
+    # Heap selection of the worst entities avoids sorting the whole fleet.
+    worst = heapq.nsmallest(
+        top_n, health_payload, key=lambda item: (_field(item, "score", 0.0), _field(item, "entity_id", ""))
+    )
+    sources = {
+        "health": (
+            [
+                _field(h, "entity_type"),
+                _field(h, "entity_id"),
+                _label(_field(h, "status")),
+                round(_field(h, "score"), 1),
+                _field(h, "drivers", []),
+            ]
+            for h in health_payload
+        ),
+        "actions": (
+            [_label(_field(a, "action")), _field(a, "entity_type"), _field(a, "entity_id"), _field(a, "rationale")]
+            for a in actions_payload
+        ),
+        "events": ([_field(e, "timestamp"), _label(_field(e, "level")), _field(e, "message")] for e in events_payload),
+    }
+    tables = []
+    for name, title, columns in _PAGED_TABLES:
+        pages, rows = _write_pages(data_dir, name, sources[name], page_size)
+        tables.append({"name": name, "title": title, "columns": columns, "pages": pages, "rows": rows})
+    summary = {
+        "entity_count": len(health_payload),
+        "status_counts": dict(Counter(_label(_field(h, "status")) for h in health_payload)),
+        "action_count": len(actions_payload),
+        "action_counts": dict(Counter(_label(_field(a, "action")) for a in actions_payload)),
+        "event_count": len(events_payload),
+    }
+    return {
+        "run_id": run_id,
+        "summary": summary,
+        "worst": [
+            {
+                "entity_type": _field(item, "entity_type"),
+                "entity_id": _field(item, "entity_id"),
+                "status": _label(_field(item, "status")),
+                "score": _field(item, "score"),
+                "drivers": _field(item, "drivers", []),
+            }
+            for item in worst
+        ],
+        "tables": tables,
+        "data_dir": _REPORT_DATA_DIR,
+    }
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+_lock = threading.Lock()
+_environments: Dict[Tuple[str, Optional[str]], Environment] = {}
+_bytecode_cache_dir: Optional[str] = None
+
+
+def configure_template_cache(bytecode_cache_dir: Optional[Path | str]) -> None:
+    global _bytecode_cache_dir
+    directory = str(bytecode_cache_dir) if bytecode_cache_dir else None
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _bytecode_cache_dir = directory
+
+
+def get_environment(templates_dir: Optional[Path] = None) -> Environment:
+    key = (str(templates_dir or TEMPLATES_DIR), _bytecode_cache_dir)
+    env = _environments.get(key)
+    if env is not None:
+        return env
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    with _lock:
+        env = _environments.get(key)
+        if env is None:
+            # auto_reload stats the source on each lookup and recompiles only when its mtime changes.
+            env = Environment(
+                loader=FileSystemLoader(key[0]),
+                autoescape=True,
+                auto_reload=True,
+                bytecode_cache=FileSystemBytecodeCache(key[1]) if key[1] else None,
+            )
+            _environments[key] = env
+    return env
+
+
+def get_template(name: str, templates_dir: Optional[Path] = None) -> Template:
+    return get_environment(templates_dir).get_template(name)
+
+
+def clear_template_cache() -> None:
+    with _lock:
+        _environments.clear()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from waveos.normalize import SampleCache
+from waveos.utils import get_logger, read_json, utc_now, write_json
+
+logger = get_logger("waveos.runstate")
+
+RUN_STATE_SCHEMA = 1
+STATE_FILE = "state.json"
+# EX_TEMPFAIL: the run stopped cleanly and should be resumed, not treated as a failure.
+EXIT_INTERRUPTED = 75
+# Inputs a resumed attempt must share with the attempt that wrote the checkpoints.
+RESUME_KEYS = ("input_dir", "baseline_dir", "output_dir", "config_fingerprint", "baseline")
+
+
+class RunInterrupted(Exception):
+    """Raised at a checkpoint boundary once shutdown has been requested."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"shutdown requested during {stage}")
+        self.stage = stage
+
+
+def file_identity(path: Path) -> Optional[Dict[str, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class RunState:
+    """Checkpoints of one run, kept under ``<run_state_dir>/<run_id>``.
+
+    ``state.json`` records the run's inputs, its status (``running``,
+    ``partial`` or ``complete``) and the stages completed so far. Each
+    telemetry file is checkpointed in the sample cache format under
+    ``files/`` as soon as all of its batches are normalized, and each
+    completed stage's output is pickled as ``<stage>.pkl``. A resumed attempt
+    reads finished files and stages back instead of recomputing them, so
+    stages with side effects (counter, change-point and action state) are not
+    applied twice. Checkpoints are dropped once the run completes.
+    """
+
+    def __init__(self, directory: Path, state: Dict[str, Any]) -> None:
+        self.directory = directory
+        self.state = state
+        self.files = SampleCache(directory / "files", count_lookups=False)
+        self.restored: List[str] = []
+
+    @property
+    def run_id(self) -> str:
+        return self.state["run_id"]
+
+    @classmethod
+    def create(cls, root: Path, run_id: str, meta: Dict[str, Any]) -> "RunState":
+        now = utc_now().isoformat()
+        state = {
+            "schema": RUN_STATE_SCHEMA,
+            "run_id": run_id,
+            "status": "running",
+            "attempts": 1,
+            "stages": [],
+            "interrupted_during": None,
+            "started_at": now,
+            "updated_at": now,
+            **meta,
+        }
+        run_state = cls(root / run_id, state)
+        run_state.save()
+        return run_state
+
+    @classmethod
+    def load(cls, root: Path, run_id: str) -> "RunState":
+        path = root / run_id / STATE_FILE
+        if not path.exists():
+            raise ValueError(f"No run state for {run_id} in {root}")
+        state = read_json(path)
+        if state.get("schema") != RUN_STATE_SCHEMA:
+            raise ValueError(f"Run state for {run_id} has unsupported schema {state.get('schema')}")
+        return cls(root / run_id, state)
+
+    def resume(self, meta: Dict[str, Any]) -> None:
+        for key in RESUME_KEYS:
+            if self.state.get(key) != meta.get(key):
+                raise ValueError(f"Cannot resume {self.run_id}: {key} changed since it started")
+        self.state["attempts"] += 1
+        self.state["status"] = "running"
+        self.state["interrupted_during"] = None
+        self.save()
+
+    def save(self) -> None:
+        self.state["updated_at"] = utc_now().isoformat()
+        write_json(self.directory / STATE_FILE, self.state)
+
+    def _stage_path(self, stage: str) -> Path:
+        return self.directory / f"{stage}.pkl"
+
+    def restore(self, stage: str) -> Optional[Any]:
+        if stage not in self.state["stages"]:
+            return None
+        with self._stage_path(stage).open("rb") as handle:
+            value = pickle.load(handle)
+        self.restored.append(stage)
+        return value
+
+    def checkpoint(self, stage: str, value: Any) -> None:
+        # Unlike the stage cache, a checkpoint that cannot be written fails the run: resuming depends on it.
+        with tempfile.NamedTemporaryFile("wb", delete=False, dir=self.directory, suffix=".tmp") as handle:
+            temp_path = Path(handle.name)
+            pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(self._stage_path(stage))
+        self.state["stages"].append(stage)
+        self.save()
+
+    def interrupted(self, stage: str) -> None:
+        self.state["status"] = "partial"
+        self.state["interrupted_during"] = stage
+        self.save()
+
+    def complete(self) -> None:
+        for stage in self.state["stages"]:
+            self._stage_path(stage).unlink(missing_ok=True)
+        shutil.rmtree(self.files.directory, ignore_errors=True)
+        self.state["status"] = "complete"
+        self.save()
+
+    def summary(self, restored_files: int) -> Dict[str, Any]:
+        return {
+            "dir": str(self.directory),
+            "attempt": self.state["attempts"],
+            "restored_stages": list(self.restored),
+            "restored_files": restored_files,
+        }
@@ -1,3 +1,4 @@
-from waveos.scoring.health import build_stats, score_links
+from waveos.scoring.changepoint import ChangePointAlarm, ChangePointDetector, apply_changepoint_alarms
+from waveos.scoring.health import build_stats, score_links, status_for_score
 
-__all__ = ["build_stats", "score_links"]
+__all__ = ["ChangePointAlarm", "ChangePointDetector", "apply_changepoint_alarms", "build_stats", "score_links", "status_for_score"]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from waveos.models import HealthScore, TelemetrySample
+from waveos.normalize.resample import ResampledTelemetry
+from waveos.utils import get_logger, write_json
+
+logger = get_logger("waveos.scoring.changepoint")
+
+CHANGEPOINT_METRICS: Tuple[str, ...] = (
+    "errors",
+    "drops",
+    "retries",
+    "fec_corrected",
+    "fec_uncorrected",
+    "ber",
+    "temperature_c",
+    "rx_power_dbm",
+    "tx_power_dbm",
+    "congestion_pct",
+    "current_a",
+)
+
+# Per (link, metric) state layout: [count, mean, variance, cusum_high, cusum_low, last_timestamp_epoch].
+_COUNT, _MEAN, _VAR, _HIGH, _LOW, _LAST = range(6)
+_SCHEMA_VERSION = 2
+
+
+@dataclass
+class ChangePointAlarm:
+    entity_id: str
+    metric: str
+    timestamp: datetime
+    value: float
+    expected: float
+    direction: str
+    statistic: float
+
+    def to_dict(self) -> dict:
+        return {
+            "metric": self.metric,
+            "timestamp": self.timestamp.isoformat(),
+            "value": self.value,
+            "expected": self.expected,
+            "direction": self.direction,
+            "statistic": self.statistic,
+        }
+
+
+# Two-sided CUSUM over an EWMA baseline: constant time per sample, constant memory per link/metric.
+class ChangePointDetector:
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        drift: float = 0.5,
+        threshold: float = 5.0,
+        warmup: int = 10,
+        min_relative_std: float = 0.05,
+        metrics: Iterable[str] = CHANGEPOINT_METRICS,
+    ) -> None:
+        self.alpha = alpha
+        self.drift = drift
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_relative_std = min_relative_std
+        self.metrics = tuple(metrics)
+        self._state: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+
+    def update(self, link_id: str, metric: str, value: float, timestamp: datetime) -> Optional[ChangePointAlarm]:
+        epoch = timestamp.timestamp()
+        state = self._state[link_id].get(metric)
+        if state is None:
+            self._state[link_id][metric] = [1.0, value, 0.0, 0.0, 0.0, epoch]
+            return None
+        if epoch <= state[_LAST]:
+            # Already folded into the baseline by an earlier run over overlapping input.
+            return None
+        state[_LAST] = epoch
+        count, mean, var = state[_COUNT], state[_MEAN], state[_VAR]
+        if count < self.warmup:
+            count += 1
+            delta = value - mean
+            new_mean = mean + delta / count
+            state[_VAR] = ((count - 1) * var + delta * (value - new_mean)) / count
+            state[_MEAN] = new_mean
+            state[_COUNT] = count
+            return None
+        std = max(math.sqrt(var), abs(mean) * self.min_relative_std, 1e-12)
+        z = (value - mean) / std
+        state[_HIGH] = max(0.0, state[_HIGH] + z - self.drift)
+        state[_LOW] = max(0.0, state[_LOW] - z - self.drift)
+        alarm = None
+        if state[_HIGH] > self.threshold or state[_LOW] > self.threshold:
+            direction = "up" if state[_HIGH] > self.threshold else "down"
+            alarm = ChangePointAlarm(
+                entity_id=link_id,
+                metric=metric,
+                timestamp=timestamp,
+                value=value,
+                expected=mean,
+                direction=direction,
+                statistic=max(state[_HIGH], state[_LOW]),
+            )
+            state[_HIGH] = 0.0
+            state[_LOW] = 0.0
+        delta = value - mean
+        state[_MEAN] = mean + self.alpha * delta
+        state[_VAR] = (1.0 - self.alpha) * (var + self.alpha * delta * delta)
+        state[_COUNT] = count + 1
+        return alarm
+
+    def observe(self, sample: TelemetrySample) -> List[ChangePointAlarm]:
+        alarms: List[ChangePointAlarm] = []
+        for metric in self.metrics:
+            value = getattr(sample, metric, None)
+            if value is None:
+                continue
+            alarm = self.update(sample.link_id, metric, float(value), sample.timestamp)
+            if alarm:
+                alarms.append(alarm)
+        return alarms
+
+    def observe_all(self, samples: Iterable[TelemetrySample]) -> List[ChangePointAlarm]:
+        alarms: List[ChangePointAlarm] = []
+        for sample in sorted(samples, key=lambda s: s.timestamp):
+            alarms.extend(self.observe(sample))
+        return alarms
+
+    def observe_resampled(self, resampled: ResampledTelemetry) -> List[ChangePointAlarm]:
+        alarms: List[ChangePointAlarm] = []
+        for link_id, series in resampled.links.items():
+            columns = [(metric, series.fields[metric]) for metric in self.metrics if metric in series.fields]
+            for idx in range(series.bins):
+                for metric, values in columns:
+                    value = values[idx]
+                    if math.isnan(value):
+                        continue
+                    alarm = self.update(link_id, metric, value, series.timestamp(idx))
+                    if alarm:
+                        alarms.append(alarm)
+        alarms.sort(key=lambda alarm: alarm.timestamp)
+        return alarms
+
+    @property
+    def params(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "drift": self.drift,
+            "threshold": self.threshold,
+            "warmup": self.warmup,
+            "min_relative_std": self.min_relative_std,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "schema_version": _SCHEMA_VERSION,
+            "params": self.params,
+            "links": {link_id: dict(metrics) for link_id, metrics in self._state.items()},
+        }
+
+    def load_state(self, payload: dict) -> None:
+        if payload.get("schema_version") != _SCHEMA_VERSION:
+            logger.warning("Ignoring change-point state with unsupported schema_version")
+            return
+        if payload.get("params") != self.params:
+            # Baselines and CUSUM sums built under other parameters would skew the new detector.
+            logger.warning("Resetting change-point state saved with different detector parameters")
+            return
+        for link_id, metrics in payload.get("links", {}).items():
+            self._state[link_id] = {metric: [float(v) for v in values] for metric, values in metrics.items()}
+
+    @classmethod
+    def load(cls, path: Path | None, **kwargs) -> "ChangePointDetector":
+        detector = cls(**kwargs)
+        if path and path.exists():
+            try:
+                detector.load_state(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as exc:
+                logger.warning("Failed to load change-point state from %s: %s", path, exc)
+        return detector
+
+    def save(self, path: Path) -> None:
+        write_json(path, self.to_dict())
+
+
+def apply_changepoint_alarms(scores: List[HealthScore], alarms: Iterable[ChangePointAlarm]) -> List[HealthScore]:
+    by_entity: Dict[str, List[ChangePointAlarm]] = defaultdict(list)
+    for alarm in alarms:
+        by_entity[alarm.entity_id].append(alarm)
+    for score in scores:
+        entity_alarms = by_entity.get(score.entity_id)
+        if not entity_alarms:
+            continue
+        first_by_metric: Dict[str, ChangePointAlarm] = {}
+        for alarm in entity_alarms:
+            first_by_metric.setdefault(alarm.metric, alarm)
+        for metric in first_by_metric:
+            driver = f"{metric}_changepoint"
+            if driver not in score.drivers:
+                score.drivers.append(driver)
+        score.details["changepoints"] = [alarm.to_dict() for alarm in first_by_metric.values()]
+    return scores
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from waveos.models import BaselineStats, HealthScore, HealthStatus, RunStats, TelemetrySample
+from waveos.normalize.resample import ResampledTelemetry, aggregate_resampled
 from waveos.utils import get_logger, histograms, span
 
 logger = get_logger("waveos.scoring")
@@ -49,12 +50,24 @@ def _aggregate(samples: Iterable[TelemetrySample]) -> Dict[str, Dict[str, float]
     return metrics
 
 
-def build_stats(samples: List[TelemetrySample]) -> Tuple[List[BaselineStats], List[RunStats]]:
+def status_for_score(score: float) -> HealthStatus:
+    if score >= 85:
+        return HealthStatus.PASS
+    if score >= 60:
+        return HealthStatus.WARN
+    return HealthStatus.FAIL
+
+
+def build_stats(
+    samples: List[TelemetrySample],
+    resampled: Optional[ResampledTelemetry] = None,
+) -> Tuple[List[BaselineStats], List[RunStats]]:
     if not samples:
         return [], []
     window_start = min(s.timestamp for s in samples)
     window_end = max(s.timestamp for s in samples)
-    metrics = _aggregate(samples)
+    # A uniform grid weights every interval equally instead of every sample.
+    metrics = aggregate_resampled(resampled) if resampled is not None else _aggregate(samples)
     baseline = [
         BaselineStats(entity_type="link", entity_id=link_id, metrics=values, window_start=window_start, window_end=window_end)
         for link_id, values in metrics.items()
@@ -111,12 +124,7 @@ def score_links(
                         drivers.append(f"{metric}_increase")
                         severity += 15
             score = max(0.0, 100.0 - severity)
-            if score >= 85:
-                status = HealthStatus.PASS
-            elif score >= 60:
-                status = HealthStatus.WARN
-            else:
-                status = HealthStatus.FAIL
+            status = status_for_score(score)
             scores.append(
                 HealthScore(
                     entity_type="link",
@@ -0,0 +1,4 @@
+from waveos.topology.index import TopologyIndex, load_topology, rollup_scores
+from waveos.topology.paths import AlternatePath, PathEngine, PathOverlay
+
+__all__ = ["AlternatePath", "PathEngine", "PathOverlay", "TopologyIndex", "load_topology", "rollup_scores"]
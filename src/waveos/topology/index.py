@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from pathlib import Path as FilePath
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from waveos.models import HealthScore, HealthStatus, Link, Path, Port, Workload
+from waveos.scoring.health import status_for_score
+from waveos.utils import get_logger, read_json
+
+logger = get_logger("waveos.topology")
+
+
+def _csr(pairs: Iterable[Tuple[int, int]], rows: int) -> Tuple[array, array]:
+    counts = array("l", [0]) * (rows + 1)
+    pair_list = list(pairs)
+    for row, _ in pair_list:
+        counts[row + 1] += 1
+    for idx in range(rows):
+        counts[idx + 1] += counts[idx]
+    indices = array("l", [0]) * len(pair_list)
+    cursor = array("l", counts[:-1])
+    for row, col in pair_list:
+        indices[cursor[row]] = col
+        cursor[row] += 1
+    return counts, indices
+
+
+@dataclass
+class Adjacency:
+    offsets: array
+    indices: array
+
+    @classmethod
+    def build(cls, pairs: Iterable[Tuple[int, int]], rows: int) -> "Adjacency":
+        offsets, indices = _csr(pairs, rows)
+        return cls(offsets=offsets, indices=indices)
+
+    def neighbors(self, row: int) -> array:
+        return self.indices[self.offsets[row] : self.offsets[row + 1]]
+
+
+def _port_device(port_id: str, ports: Dict[str, Port]) -> str:
+    port = ports.get(port_id)
+    if port:
+        return port.device
+    # Simulator/port naming convention is "<device>/<interface>".
+    return port_id.split("/", 1)[0]
+
+
+class TopologyIndex:
+    def __init__(
+        self,
+        links: Sequence[Link],
+        ports: Sequence[Port] = (),
+        paths: Sequence[Path] = (),
+        workloads: Sequence[Workload] = (),
+    ) -> None:
+        port_map = {port.id: port for port in ports}
+        self.links = list(links)
+        self.paths = list(paths)
+        self.workloads = list(workloads)
+        self.link_ids = [link.id for link in self.links]
+        self.link_pos = {link_id: idx for idx, link_id in enumerate(self.link_ids)}
+        self.path_ids = [path.id for path in self.paths]
+        self.path_pos = {path_id: idx for idx, path_id in enumerate(self.path_ids)}
+        self.workload_ids = [workload.id for workload in self.workloads]
+
+        device_pos: Dict[str, int] = {}
+        link_devices: List[Tuple[int, int]] = []
+        for link_idx, link in enumerate(self.links):
+            for port_id in (link.src_port, link.dst_port):
+                device = _port_device(port_id, port_map)
+                device_idx = device_pos.setdefault(device, len(device_pos))
+                link_devices.append((link_idx, device_idx))
+        self.device_ids = list(device_pos)
+        self.device_pos = device_pos
+        link_devices = sorted(set(link_devices))
+
+        path_links: List[Tuple[int, int]] = []
+        for path_idx, path in enumerate(self.paths):
+            for link_id in path.links:
+                link_idx = self.link_pos.get(link_id)
+                if link_idx is None:
+                    logger.warning("Path %s references unknown link %s", path.id, link_id)
+                    continue
+                path_links.append((path_idx, link_idx))
+        workload_paths: List[Tuple[int, int]] = []
+        for workload_idx, workload in enumerate(self.workloads):
+            for path_id in workload.paths:
+                path_idx = self.path_pos.get(path_id)
+                if path_idx is None:
+                    logger.warning("Workload %s references unknown path %s", workload.id, path_id)
+                    continue
+                workload_paths.append((workload_idx, path_idx))
+
+        n_links, n_devices = len(self.link_ids), len(self.device_ids)
+        n_paths, n_workloads = len(self.path_ids), len(self.workload_ids)
+        self.link_to_devices = Adjacency.build(link_devices, n_links)
+        self.device_to_links = Adjacency.build(((d, l) for l, d in link_devices), n_devices)
+        self.path_to_links = Adjacency.build(path_links, n_paths)
+        self.link_to_paths = Adjacency.build(((l, p) for p, l in path_links), n_links)
+        self.workload_to_paths = Adjacency.build(workload_paths, n_workloads)
+        self.path_to_workloads = Adjacency.build(((p, w) for w, p in workload_paths), n_paths)
+
+    def blast_radius(self, link_id: str) -> Dict[str, List[str]]:
+        link_idx = self.link_pos.get(link_id)
+        if link_idx is None:
+            return {"devices": [], "paths": [], "workloads": []}
+        path_indices = self.link_to_paths.neighbors(link_idx)
+        workload_indices = sorted({w for p in path_indices for w in self.path_to_workloads.neighbors(p)})
+        return {
+            "devices": [self.device_ids[d] for d in self.link_to_devices.neighbors(link_idx)],
+            "paths": [self.path_ids[p] for p in path_indices],
+            "workloads": [self.workload_ids[w] for w in workload_indices],
+        }
+
+
+def load_topology(in_dir: FilePath) -> Optional[TopologyIndex]:
+    links_path = in_dir / "links.json"
+    if not links_path.exists():
+        return None
+
+    def _load(name: str, model):
+        path = in_dir / name
+        if not path.exists():
+            return []
+        return [model(**record) for record in read_json(path)]
+
+    return TopologyIndex(
+        links=_load("links.json", Link),
+        ports=_load("ports.json", Port),
+        paths=_load("paths.json", Path),
+        workloads=_load("workloads.json", Workload),
+    )
+
+
+def _min_over(adjacency: Adjacency, values: array) -> array:
+    result = array("d", [math.nan]) * (len(adjacency.offsets) - 1)
+    for row in range(len(result)):
+        members = [values[col] for col in adjacency.neighbors(row) if not math.isnan(values[col])]
+        if members:
+            result[row] = min(members)
+    return result
+
+
+def _rollup_entities(
+    entity_type: str,
+    ids: Sequence[str],
+    adjacency: Adjacency,
+    member_ids: Sequence[str],
+    member_scores: array,
+    rolled: array,
+    window: Tuple,
+) -> List[HealthScore]:
+    scores: List[HealthScore] = []
+    for row, entity_id in enumerate(ids):
+        value = rolled[row]
+        if math.isnan(value):
+            continue
+        members = adjacency.neighbors(row)
+        degraded = [
+            member_ids[col]
+            for col in members
+            if not math.isnan(member_scores[col]) and status_for_score(member_scores[col]) != HealthStatus.PASS
+        ]
+        scores.append(
+            HealthScore(
+                entity_type=entity_type,
+                entity_id=entity_id,
+                score=value,
+                status=status_for_score(value),
+                drivers=[f"degraded:{member}" for member in degraded],
+                details={"member_count": len(members), "degraded_members": degraded},
+                window_start=window[0],
+                window_end=window[1],
+            )
+        )
+    return scores
+
+
+def rollup_scores(index: TopologyIndex, link_scores: Iterable[HealthScore]) -> List[HealthScore]:
+    link_values = array("d", [math.nan]) * len(index.link_ids)
+    link_list = [score for score in link_scores if score.entity_type == "link"]
+    if not link_list:
+        return []
+    for score in link_list:
+        link_idx = index.link_pos.get(score.entity_id)
+        if link_idx is not None:
+            link_values[link_idx] = score.score
+        if score.status != HealthStatus.PASS:
+            score.details["blast_radius"] = index.blast_radius(score.entity_id)
+    window = (min(s.window_start for s in link_list), max(s.window_end for s in link_list))
+
+    # A device, path or workload is only as healthy as its worst member.
+    device_values = _min_over(index.device_to_links, link_values)
+    path_values = _min_over(index.path_to_links, link_values)
+    workload_values = _min_over(index.workload_to_paths, path_values)
+    return [
+        *_rollup_entities("device", index.device_ids, index.device_to_links, index.link_ids, link_values, device_values, window),
+        *_rollup_entities("path", index.path_ids, index.path_to_links, index.link_ids, link_values, path_values, window),
+        *_rollup_entities(
+            "workload", index.workload_ids, index.workload_to_paths, index.path_ids, path_values, workload_values, window
+        ),
+    ]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from waveos.topology.index import TopologyIndex
+
+
+@dataclass
+class AlternatePath:
+    links: List[str]
+    devices: List[str]
+    residual_gbps: float
+
+    @property
+    def hops(self) -> int:
+        return len(self.links)
+
+    def to_dict(self) -> dict:
+        return {"links": self.links, "devices": self.devices, "residual_gbps": self.residual_gbps}
+
+
+class PathEngine:
+    def __init__(self, index: TopologyIndex, k: int = 2) -> None:
+        self.index = index
+        self.k = k
+        n_links = len(index.link_ids)
+        self.link_up = array("b", [1]) * n_links
+        self.capacity = array("d", (link.capacity_gbps for link in index.links))
+        load = array("d", [0.0]) * n_links
+        for workload_idx, workload in enumerate(index.workloads):
+            for path_idx in index.workload_to_paths.neighbors(workload_idx):
+                for link_idx in index.path_to_links.neighbors(path_idx):
+                    load[link_idx] += workload.bandwidth_gbps
+        self.load = load
+        self.residual = array("d", (cap - used for cap, used in zip(self.capacity, load)))
+        # Device graph: device_idx -> [(neighbor_device_idx, link_idx)], links are bidirectional.
+        self._graph: List[List[Tuple[int, int]]] = [[] for _ in index.device_ids]
+        self._endpoints: List[Tuple[int, int]] = []
+        for link_idx in range(n_links):
+            devices = list(index.link_to_devices.neighbors(link_idx))
+            src, dst = (devices[0], devices[-1]) if devices else (-1, -1)
+            self._endpoints.append((src, dst))
+            if src >= 0 and src != dst:
+                self._graph[src].append((dst, link_idx))
+                self._graph[dst].append((src, link_idx))
+        self._cache: Dict[int, Tuple[int, List[AlternatePath]]] = {}
+        self._users: Dict[int, Set[int]] = {}
+        self._generation = 0
+
+    def _shortest(self, src: int, dst: int, excluded: Set[int]) -> Optional[List[int]]:
+        # Fewest hops first, then widest bottleneck residual among equal-hop paths.
+        best: Dict[int, Tuple[int, float]] = {src: (0, float("inf"))}
+        parent: Dict[int, Tuple[int, int]] = {}
+        heap: List[Tuple[int, float, int]] = [(0, -float("inf"), src)]
+        while heap:
+            hops, neg_width, node = heapq.heappop(heap)
+            if node == dst:
+                break
+            if (hops, -neg_width) != best.get(node):
+                continue
+            for neighbor, link_idx in self._graph[node]:
+                if link_idx in excluded or not self.link_up[link_idx]:
+                    continue
+                candidate = (hops + 1, min(-neg_width, self.residual[link_idx]))
+                current = best.get(neighbor)
+                if current is None or candidate[0] < current[0] or (candidate[0] == current[0] and candidate[1] > current[1]):
+                    best[neighbor] = candidate
+                    parent[neighbor] = (node, link_idx)
+                    heapq.heappush(heap, (candidate[0], -candidate[1], neighbor))
+        if dst not in parent:
+            return None
+        links: List[int] = []
+        node = dst
+        while node != src:
+            node, link_idx = parent[node]
+            links.append(link_idx)
+        links.reverse()
+        return links
+
+    def _compute(self, link_idx: int, down: Iterable[int] = ()) -> List[AlternatePath]:
+        src, dst = self._endpoints[link_idx]
+        if src < 0 or src == dst:
+            return []
+        excluded = {link_idx, *down}
+        alternates: List[AlternatePath] = []
+        while len(alternates) < self.k:
+            route = self._shortest(src, dst, excluded)
+            if not route:
+                break
+            # Link-disjoint alternates so one further failure cannot take out every option.
+            excluded.update(route)
+            devices = [self.index.device_ids[src]]
+            node = src
+            for hop in route:
+                a, b = self._endpoints[hop]
+                node = b if node == a else a
+                devices.append(self.index.device_ids[node])
+            alternates.append(
+                AlternatePath(
+                    links=[self.index.link_ids[hop] for hop in route],
+                    devices=devices,
+                    residual_gbps=min(self.residual[hop] for hop in route),
+                )
+            )
+        return alternates
+
+    def alternates(self, link_id: str) -> List[AlternatePath]:
+        link_idx = self.index.link_pos.get(link_id)
+        if link_idx is None:
+            return []
+        cached = self._cache.get(link_idx)
+        if cached and cached[0] == self._generation:
+            return cached[1]
+        if cached:
+            self._forget(link_idx, cached[1])
+        result = self._compute(link_idx)
+        self._cache[link_idx] = (self._generation, result)
+        for alternate in result:
+            for hop_id in alternate.links:
+                self._users.setdefault(self.index.link_pos[hop_id], set()).add(link_idx)
+        return result
+
+    def precompute(self, link_ids: Iterable[str] | None = None) -> None:
+        for link_id in link_ids if link_ids is not None else self.index.link_ids:
+            self.alternates(link_id)
+
+    def _forget(self, link_idx: int, alternates: List[AlternatePath]) -> None:
+        for alternate in alternates:
+            for hop_id in alternate.links:
+                users = self._users.get(self.index.link_pos[hop_id])
+                if users:
+                    users.discard(link_idx)
+
+    def set_link_state(self, link_id: str, up: bool) -> None:
+        link_idx = self.index.link_pos.get(link_id)
+        if link_idx is None or bool(self.link_up[link_idx]) == up:
+            return
+        self.link_up[link_idx] = 1 if up else 0
+        if up:
+            # A recovered link can shorten any route; mark every entry stale and recompute lazily on lookup.
+            self._generation += 1
+            return
+        # A failed link only invalidates the cached alternates that traverse it.
+        for user in self._users.pop(link_idx, set()):
+            cached = self._cache.pop(user, None)
+            if cached:
+                self._forget(user, cached[1])
+
+
+class PathOverlay:
+    """One run's link failures over a shared, warm :class:`PathEngine`.
+
+    The engine keeps every link up and fills its cache lazily, so it is never
+    precomputed for the whole fleet and never copied. A lookup whose shared
+    alternates avoid every link this run took down returns them as is; only
+    the rest are recomputed, and those results stay in the overlay.
+    """
+
+    def __init__(self, engine: PathEngine) -> None:
+        self.engine = engine
+        self.down: Set[int] = set()
+        self._cache: Dict[int, List[AlternatePath]] = {}
+
+    def set_link_state(self, link_id: str, up: bool) -> None:
+        link_idx = self.engine.index.link_pos.get(link_id)
+        if link_idx is None or (link_idx not in self.down) == up:
+            return
+        if up:
+            self.down.discard(link_idx)
+        else:
+            self.down.add(link_idx)
+        self._cache.clear()
+
+    def alternates(self, link_id: str) -> List[AlternatePath]:
+        link_idx = self.engine.index.link_pos.get(link_id)
+        if link_idx is None:
+            return []
+        cached = self._cache.get(link_idx)
+        if cached is not None:
+            return cached
+        shared = self.engine.alternates(link_id)
+        link_pos = self.engine.index.link_pos
+        if self.down and any(link_pos[hop] in self.down for alternate in shared for hop in alternate.links):
+            shared = self.engine._compute(link_idx, self.down)
+        self._cache[link_idx] = shared
+        return shared
+
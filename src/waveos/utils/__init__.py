@@ -1,76 +1,108 @@
-from waveos.utils.io import read_csv, read_json, read_jsonl, write_csv, write_json, write_jsonl
-from waveos.utils.logging import get_logger, setup_logging
-from waveos.utils.metrics import counters, histograms, start_metrics_server
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from waveos._lazy import lazy_exports
+
+# Imported eagerly: the submodule shares the function's name and would otherwise shadow it.
 from waveos.utils.retry import retry
-from waveos.utils.shutdown import install_signal_handlers, should_shutdown, trigger_shutdown, reset_shutdown
-from waveos.utils.circuit_breaker import CircuitBreaker
-from waveos.utils.config import WaveOSConfig, load_config
-from waveos.utils.config import config_fingerprint
-from waveos.utils.tracing import init_tracer, span
-from waveos.utils.alerts import send_webhook
-from waveos.utils.alerting import AlertRoute, route_alerts
-from waveos.utils.secrets import (
-    get_secret,
-    get_secret_from_aws,
-    get_secret_from_gcp,
-    get_secret_from_vault,
-)
-from waveos.utils.audit import append_audit
-from waveos.utils.rbac import Principal, Role, Permission, authorize
-from waveos.utils.auth import TokenAuth, load_token_roles_from_env, load_token_roles_from_config
-from waveos.utils.time import parse_timestamp, utc_now
-from waveos.utils.spooler import LogSpooler
-from waveos.utils.proxy import ProxyConfig, start_proxy
-from waveos.utils.system_metrics import collect_system_metrics
-from waveos.utils.supervisor import supervise
-from waveos.utils.security import drop_privileges
-from waveos.utils.resource_limits import apply_resource_limits
 
-__all__ = [
-    "get_logger",
-    "counters",
-    "histograms",
-    "retry",
-    "install_signal_handlers",
-    "should_shutdown",
-    "trigger_shutdown",
-    "reset_shutdown",
-    "CircuitBreaker",
-    "WaveOSConfig",
-    "load_config",
-    "config_fingerprint",
-    "init_tracer",
-    "span",
-    "send_webhook",
-    "AlertRoute",
-    "route_alerts",
-    "get_secret",
-    "get_secret_from_vault",
-    "get_secret_from_aws",
-    "get_secret_from_gcp",
-    "append_audit",
-    "Principal",
-    "Role",
-    "Permission",
-    "authorize",
-    "TokenAuth",
-    "load_token_roles_from_env",
-    "load_token_roles_from_config",
-    "parse_timestamp",
-    "read_csv",
-    "read_json",
-    "read_jsonl",
-    "write_csv",
-    "setup_logging",
-    "start_metrics_server",
-    "utc_now",
-    "write_json",
-    "write_jsonl",
-    "LogSpooler",
-    "ProxyConfig",
-    "start_proxy",
-    "collect_system_metrics",
-    "supervise",
-    "drop_privileges",
-    "apply_resource_limits",
-]
+if TYPE_CHECKING:
+    from waveos.utils.io import (
+        DIGEST_CACHE_NAME,
+        DURABILITY_POLICIES,
+        DigestCache,
+        WriteSession,
+        atomic_open,
+        read_csv,
+        read_json,
+        read_jsonl,
+        write_csv,
+        write_json,
+        write_json_array,
+        write_jsonl,
+    )
+    from waveos.utils.logging import get_logger, setup_logging
+    from waveos.utils.metrics import counters, gauges, histograms, start_metrics_server
+    from waveos.utils.shutdown import install_signal_handlers, should_shutdown, trigger_shutdown, reset_shutdown
+    from waveos.utils.circuit_breaker import CircuitBreaker
+    from waveos.utils.config import WaveOSConfig, load_config
+    from waveos.utils.config import config_fingerprint
+    from waveos.utils.tracing import init_tracer, span
+    from waveos.utils.alerts import send_webhook
+    from waveos.utils.alerting import AlertRoute, route_alerts
+    from waveos.utils.secrets import (
+        get_secret,
+        get_secret_from_aws,
+        get_secret_from_gcp,
+        get_secret_from_vault,
+    )
+    from waveos.utils.audit import append_audit
+    from waveos.utils.rbac import Principal, Role, Permission, authorize
+    from waveos.utils.auth import TokenAuth, load_token_roles_from_env, load_token_roles_from_config
+    from waveos.utils.time import parse_timestamp, utc_now
+    from waveos.utils.spooler import LogSpooler
+    from waveos.utils.proxy import ProxyConfig, start_proxy
+    from waveos.utils.system_metrics import collect_system_metrics
+    from waveos.utils.supervisor import supervise
+    from waveos.utils.security import drop_privileges
+    from waveos.utils.resource_limits import apply_resource_limits
+
+# Submodules are imported on first attribute access so that light callers (the CLI
+# parser, cron entrypoints) do not pay for pydantic, prometheus_client and friends.
+_EXPORTS = {
+    "DIGEST_CACHE_NAME": "waveos.utils.io",
+    "DURABILITY_POLICIES": "waveos.utils.io",
+    "DigestCache": "waveos.utils.io",
+    "WriteSession": "waveos.utils.io",
+    "atomic_open": "waveos.utils.io",
+    "get_logger": "waveos.utils.logging",
+    "counters": "waveos.utils.metrics",
+    "gauges": "waveos.utils.metrics",
+    "histograms": "waveos.utils.metrics",
+    "install_signal_handlers": "waveos.utils.shutdown",
+    "should_shutdown": "waveos.utils.shutdown",
+    "trigger_shutdown": "waveos.utils.shutdown",
+    "reset_shutdown": "waveos.utils.shutdown",
+    "CircuitBreaker": "waveos.utils.circuit_breaker",
+    "WaveOSConfig": "waveos.utils.config",
+    "load_config": "waveos.utils.config",
+    "config_fingerprint": "waveos.utils.config",
+    "init_tracer": "waveos.utils.tracing",
+    "span": "waveos.utils.tracing",
+    "send_webhook": "waveos.utils.alerts",
+    "AlertRoute": "waveos.utils.alerting",
+    "route_alerts": "waveos.utils.alerting",
+    "get_secret": "waveos.utils.secrets",
+    "get_secret_from_vault": "waveos.utils.secrets",
+    "get_secret_from_aws": "waveos.utils.secrets",
+    "get_secret_from_gcp": "waveos.utils.secrets",
+    "append_audit": "waveos.utils.audit",
+    "Principal": "waveos.utils.rbac",
+    "Role": "waveos.utils.rbac",
+    "Permission": "waveos.utils.rbac",
+    "authorize": "waveos.utils.rbac",
+    "TokenAuth": "waveos.utils.auth",
+    "load_token_roles_from_env": "waveos.utils.auth",
+    "load_token_roles_from_config": "waveos.utils.auth",
+    "parse_timestamp": "waveos.utils.time",
+    "read_csv": "waveos.utils.io",
+    "read_json": "waveos.utils.io",
+    "read_jsonl": "waveos.utils.io",
+    "write_csv": "waveos.utils.io",
+    "setup_logging": "waveos.utils.logging",
+    "start_metrics_server": "waveos.utils.metrics",
+    "utc_now": "waveos.utils.time",
+    "write_json": "waveos.utils.io",
+    "write_json_array": "waveos.utils.io",
+    "write_jsonl": "waveos.utils.io",
+    "LogSpooler": "waveos.utils.spooler",
+    "ProxyConfig": "waveos.utils.proxy",
+    "start_proxy": "waveos.utils.proxy",
+    "collect_system_metrics": "waveos.utils.system_metrics",
+    "supervise": "waveos.utils.supervisor",
+    "drop_privileges": "waveos.utils.security",
+    "apply_resource_limits": "waveos.utils.resource_limits",
+}
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, eager=("retry",))
@@ -3,12 +3,15 @@ from __future__ import annotations
 import os
 import tomllib
 from pathlib import Path
-from typing import Any, Dict, Optional, Literal
+from typing import TYPE_CHECKING, Any, Dict, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 import hashlib
 import json
 
+if TYPE_CHECKING:
+    from waveos.policy.rules import PolicyPlan
+
 
 class WaveOSConfig(BaseModel):
     schema_version: int = 1
@@ -74,6 +77,66 @@ class WaveOSConfig(BaseModel):
     max_cpu_seconds: Optional[int] = None
     idempotent_outputs: bool = True
     retention_days: Optional[int] = None
+    cumulative_counters: bool = False
+    counter_state_path: Optional[str] = "out/state/counters.json"
+    counter_width_bits: Dict[str, Literal[32, 64]] = Field(default_factory=dict)
+    resample_interval_seconds: Optional[float] = Field(default=None, gt=0.0)
+    resample_max_fill_bins: int = Field(default=3, ge=0)
+    topology_rollups: bool = False
+    reroute_paths_enabled: bool = False
+    reroute_path_k: int = Field(default=2, ge=1)
+    changepoint_enabled: bool = False
+    changepoint_state_path: Optional[str] = "out/state/changepoint.json"
+    changepoint_alpha: float = Field(default=0.1, gt=0.0, le=1.0)
+    changepoint_drift: float = Field(default=0.5, ge=0.0)
+    changepoint_threshold: float = Field(default=5.0, gt=0.0)
+    changepoint_warmup: int = Field(default=10, ge=1)
+    policy_batch_mode: bool = False
+    action_state_enabled: bool = False
+    action_state_path: Optional[str] = "out/state/actions.json"
+    action_cooldown_seconds: float = Field(default=0.0, ge=0.0)
+    action_min_dwell_seconds: float = Field(default=0.0, ge=0.0)
+    action_hysteresis_band: float = Field(default=0.0, ge=0.0)
+    template_cache_dir: Optional[str] = None
+    report_mode: Literal["full", "paged"] = "full"
+    report_top_n: int = Field(default=100, ge=0)
+    report_page_size: int = Field(default=5000, ge=1)
+    evidence_pack_workers: int = Field(default=4, ge=1)
+    evidence_store_dir: Optional[str] = None
+    output_workers: int = Field(default=4, ge=1)
+    metrics_format: Literal["wide", "long"] = "wide"
+    metrics_parquet: bool = False
+    output_durability: Literal["none", "batch", "per-file"] = "none"
+    output_skip_unchanged: bool = False
+    pipeline_queue_size: int = Field(default=8, ge=1)
+    pipeline_batch_size: int = Field(default=10000, ge=1)
+    pipeline_stage_workers: Dict[str, int] = Field(default_factory=dict)
+    fanout_workers: Optional[int] = Field(default=None, ge=1)
+    stage_cache_dir: Optional[str] = None
+    stage_cache_max_bytes: int = Field(default=512 * 1024 * 1024, ge=0)
+    sample_cache_dir: Optional[str] = None
+    run_state_dir: Optional[str] = None
+
+    _policy_plan: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _compile_policy_rules(self) -> "WaveOSConfig":
+        # Compiling is the validation: a malformed rule raises PolicyRuleError (a ValueError),
+        # and the plan is kept so the policy stage never compiles the rules again.
+        if self.policy_rules:
+            from waveos.policy.rules import compile_policy_rules
+
+            self._policy_plan = compile_policy_rules(self.policy_rules)
+        return self
+
+    @property
+    def policy_plan(self) -> "PolicyPlan":
+        if self._policy_plan is None:
+            # No rules: the empty plan is built on first use so loading config never imports the policy engine.
+            from waveos.policy.rules import PolicyPlan
+
+            self._policy_plan = PolicyPlan()
+        return self._policy_plan
 
 
 def _load_file(path: Path) -> Dict[str, Any]:
@@ -88,7 +151,7 @@ def _load_file(path: Path) -> Dict[str, Any]:
     raise ValueError(f"Unsupported config format: {path.suffix}")
 
 
-def load_config(path: Optional[Path] = None) -> WaveOSConfig:
+def load_config(path: Optional[Path] = None, include_env: bool = True) -> WaveOSConfig:
     config_path = path or (Path(os.getenv("WAVEOS_CONFIG")) if os.getenv("WAVEOS_CONFIG") else None)
     payload: Dict[str, Any] = {}
     if config_path:
@@ -149,6 +212,27 @@ def load_config(path: Optional[Path] = None) -> WaveOSConfig:
         "max_cpu_seconds": os.getenv("WAVEOS_MAX_CPU_SECONDS"),
         "idempotent_outputs": os.getenv("WAVEOS_IDEMPOTENT_OUTPUTS"),
         "retention_days": os.getenv("WAVEOS_RETENTION_DAYS"),
+        "cumulative_counters": os.getenv("WAVEOS_CUMULATIVE_COUNTERS"),
+        "counter_state_path": os.getenv("WAVEOS_COUNTER_STATE_PATH"),
+        "resample_interval_seconds": os.getenv("WAVEOS_RESAMPLE_INTERVAL_SECONDS"),
+        "topology_rollups": os.getenv("WAVEOS_TOPOLOGY_ROLLUPS"),
+        "reroute_paths_enabled": os.getenv("WAVEOS_REROUTE_PATHS_ENABLED"),
+        "changepoint_enabled": os.getenv("WAVEOS_CHANGEPOINT_ENABLED"),
+        "changepoint_state_path": os.getenv("WAVEOS_CHANGEPOINT_STATE_PATH"),
+        "policy_batch_mode": os.getenv("WAVEOS_POLICY_BATCH_MODE"),
+        "action_state_enabled": os.getenv("WAVEOS_ACTION_STATE_ENABLED"),
+        "action_state_path": os.getenv("WAVEOS_ACTION_STATE_PATH"),
+        "template_cache_dir": os.getenv("WAVEOS_TEMPLATE_CACHE_DIR"),
+        "report_mode": os.getenv("WAVEOS_REPORT_MODE"),
+        "metrics_format": os.getenv("WAVEOS_METRICS_FORMAT"),
+        "output_durability": os.getenv("WAVEOS_OUTPUT_DURABILITY"),
+        "output_skip_unchanged": os.getenv("WAVEOS_OUTPUT_SKIP_UNCHANGED"),
+        "pipeline_queue_size": os.getenv("WAVEOS_PIPELINE_QUEUE_SIZE"),
+        "fanout_workers": os.getenv("WAVEOS_FANOUT_WORKERS"),
+        "stage_cache_dir": os.getenv("WAVEOS_STAGE_CACHE_DIR"),
+        "stage_cache_max_bytes": os.getenv("WAVEOS_STAGE_CACHE_MAX_BYTES"),
+        "sample_cache_dir": os.getenv("WAVEOS_SAMPLE_CACHE_DIR"),
+        "run_state_dir": os.getenv("WAVEOS_RUN_STATE_DIR"),
     }
     env = {key: value for key, value in env.items() if value is not None}
     if "metrics_port" in env:
@@ -206,7 +290,7 @@ def load_config(path: Optional[Path] = None) -> WaveOSConfig:
             env["alert_email_smtp_port"] = int(env["alert_email_smtp_port"])
         except ValueError as exc:
             raise ValueError("alert_email_smtp_port must be an integer") from exc
-    for key in ("collector_threads", "max_memory_mb", "max_cpu_seconds", "retention_days"):
+    for key in ("collector_threads", "max_memory_mb", "max_cpu_seconds", "retention_days", "pipeline_queue_size", "fanout_workers", "stage_cache_max_bytes"):
         if key in env and env[key] is not None:
             try:
                 env[key] = int(env[key])
@@ -214,7 +298,11 @@ def load_config(path: Optional[Path] = None) -> WaveOSConfig:
                 raise ValueError(f"{key} must be an integer") from exc
     if "idempotent_outputs" in env and env["idempotent_outputs"] is not None:
         env["idempotent_outputs"] = str(env["idempotent_outputs"]).lower() in {"1", "true", "yes", "on"}
-    payload.update(env)
+    for key in ("cumulative_counters", "topology_rollups", "reroute_paths_enabled", "changepoint_enabled", "policy_batch_mode", "action_state_enabled", "output_skip_unchanged"):
+        if key in env and env[key] is not None:
+            env[key] = str(env[key]).lower() in {"1", "true", "yes", "on"}
+    if include_env:
+        payload.update(env)
     config = WaveOSConfig(**payload)
     if config.schema_version != 1:
         raise ValueError(f"Unsupported config schema_version: {config.schema_version}")
@@ -1,10 +1,196 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import tempfile
-from typing import Any, Iterable, List
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DURABILITY_POLICIES = ("none", "batch", "per-file")
+DIGEST_CACHE_NAME = ".waveos_digests.json"
+_HASH_CHUNK = 1 << 20
+
+
+def _fsync_path(path: Path, directory: bool = False) -> None:
+    fd = os.open(path, os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if directory else 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class DigestCache:
+    """SHA-256 digests of previously written files, trusted while size and mtime match."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        if path.exists():
+            try:
+                self._entries = dict(read_json(path).get("files", {}))
+            except (OSError, ValueError, AttributeError):
+                self._entries = {}
+
+    def digest(self, path: Path) -> Optional[str]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["sha256"]
+        digest = _file_digest(path)
+        self.record(path, digest)
+        return digest
+
+    def record(self, path: Path, digest: str) -> None:
+        stat = path.stat()
+        with self._lock:
+            self._entries[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+    def unchanged(self, temp_path: Path, path: Path) -> Tuple[bool, str]:
+        # Different sizes cannot match, so only same-size candidates are hashed.
+        digest = _file_digest(temp_path)
+        if not path.exists() or path.stat().st_size != temp_path.stat().st_size:
+            return False, digest
+        return self.digest(path) == digest, digest
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"schema_version": 1, "files": dict(self._entries)}
+        write_json(self.path, payload)
+
+
+class WriteSession:
+    """Stages a run's artifacts and makes them visible together on commit.
+
+    Writers produce temp files next to their targets; renames are deferred to
+    ``commit``. ``per-file`` fsyncs each file as it is staged, ``batch`` fsyncs
+    all staged files at commit, and both then fsync each target directory once.
+    With a ``DigestCache``, files identical to what is already on disk are
+    dropped at stage time and the existing target is left untouched.
+    """
+
+    def __init__(self, durability: str = "none", digests: Optional[DigestCache] = None) -> None:
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"durability must be one of {DURABILITY_POLICIES}")
+        self.durability = durability
+        self.digests = digests
+        self._lock = threading.Lock()
+        self._staged: Dict[Path, Path] = {}
+        self._staged_digests: Dict[Path, str] = {}
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+        self.committed = False
+
+    def stage(self, temp_path: Path, path: Path) -> None:
+        if self.digests is not None:
+            unchanged, digest = self.digests.unchanged(temp_path, path)
+            if unchanged:
+                size = temp_path.stat().st_size
+                temp_path.unlink()
+                with self._lock:
+                    self.skipped_files += 1
+                    self.skipped_bytes += size
+                    previous = self._staged.pop(path, None)
+                if previous is not None:
+                    previous.unlink(missing_ok=True)
+                return
+            with self._lock:
+                self._staged_digests[path] = digest
+        if self.durability == "per-file":
+            _fsync_path(temp_path)
+        with self._lock:
+            previous = self._staged.pop(path, None)
+            self._staged[path] = temp_path
+        if previous is not None and previous != temp_path:
+            previous.unlink(missing_ok=True)
+
+    def pending(self, path: Path) -> Optional[Path]:
+        with self._lock:
+            return self._staged.get(path)
+
+    def pending_temp_paths(self) -> List[Path]:
+        with self._lock:
+            return list(self._staged.values())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"skipped_files": self.skipped_files, "skipped_bytes": self.skipped_bytes}
+
+    def commit(self) -> List[Path]:
+        with self._lock:
+            staged = list(self._staged.items())
+            digests = dict(self._staged_digests)
+            self._staged.clear()
+            self._staged_digests.clear()
+        if self.durability == "batch":
+            for _, temp_path in staged:
+                _fsync_path(temp_path)
+        directories = []
+        for path, temp_path in staged:
+            temp_path.replace(path)
+            if path.parent not in directories:
+                directories.append(path.parent)
+        if self.durability != "none":
+            for directory in directories:
+                _fsync_path(directory, directory=True)
+        if self.digests is not None:
+            for path, _ in staged:
+                if path in digests:
+                    self.digests.record(path, digests[path])
+            self.digests.save()
+        self.committed = True
+        return [path for path, _ in staged]
+
+    def abort(self) -> None:
+        with self._lock:
+            staged = list(self._staged.values())
+            self._staged.clear()
+            self._staged_digests.clear()
+        for temp_path in staged:
+            temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "WriteSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+@contextmanager
+def atomic_open(path: Path, session: Optional[WriteSession] = None, newline: Optional[str] = None) -> Iterator[IO[str]]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = tempfile.NamedTemporaryFile("w", encoding="utf-8", newline=newline, delete=False, dir=path.parent)
+    temp_path = Path(handle.name)
+    try:
+        with handle:
+            yield handle
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    if session is not None:
+        session.stage(temp_path, path)
+    else:
+        temp_path.replace(path)
 
 
 def read_json(path: Path) -> Any:
@@ -12,12 +198,22 @@ def read_json(path: Path) -> Any:
         return json.load(handle)
 
 
-def write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, dir=path.parent) as handle:
+def write_json(path: Path, payload: Any, session: Optional[WriteSession] = None) -> None:
+    with atomic_open(path, session) as handle:
         json.dump(payload, handle, indent=2, sort_keys=True, default=str)
-        temp_name = handle.name
-    Path(temp_name).replace(path)
+
+
+def write_json_array(path: Path, items: Iterable[Any], session: Optional[WriteSession] = None) -> int:
+    # Serializes item by item so a large array never exists as one in-memory string.
+    count = 0
+    with atomic_open(path, session) as handle:
+        handle.write("[")
+        for item in items:
+            handle.write(",\n" if count else "\n")
+            handle.write(json.dumps(item, sort_keys=True, default=str))
+            count += 1
+        handle.write("\n]\n" if count else "]\n")
+    return count
 
 
 def read_jsonl(path: Path) -> List[Any]:
@@ -31,14 +227,11 @@ def read_jsonl(path: Path) -> List[Any]:
     return records
 
 
-def write_jsonl(path: Path, records: Iterable[Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, dir=path.parent) as handle:
+def write_jsonl(path: Path, records: Iterable[Any], session: Optional[WriteSession] = None) -> None:
+    with atomic_open(path, session) as handle:
         for record in records:
             handle.write(json.dumps(record, default=str))
             handle.write("\n")
-        temp_name = handle.name
-    Path(temp_name).replace(path)
 
 
 def read_csv(path: Path) -> List[dict]:
@@ -47,12 +240,9 @@ def read_csv(path: Path) -> List[dict]:
         return list(reader)
 
 
-def write_csv(path: Path, rows: Iterable[dict], fieldnames: List[str]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, dir=path.parent) as handle:
+def write_csv(path: Path, rows: Iterable[dict], fieldnames: List[str], session: Optional[WriteSession] = None) -> None:
+    with atomic_open(path, session) as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
         for row in rows:
             writer.writerow(row)
-        temp_name = handle.name
-    Path(temp_name).replace(path)
@@ -3,12 +3,13 @@ from __future__ import annotations
 import os
 from typing import Optional
 
-from prometheus_client import CollectorRegistry, Counter, Histogram, start_http_server
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
 
 _registry: Optional[CollectorRegistry] = None
 _started = False
 _counters: Optional[dict[str, Counter]] = None
 _histograms: Optional[dict[str, Histogram]] = None
+_gauges: Optional[dict[str, Gauge]] = None
 
 
 def init_registry() -> CollectorRegistry:
@@ -58,6 +59,24 @@ def counters() -> dict[str, Counter]:
             ["direction"],
             registry=registry,
         ),
+        "stage_stall": Counter(
+            "waveos_stage_stall_seconds_total",
+            "Time pipeline stage workers spent blocked on a full downstream queue",
+            ["stage"],
+            registry=registry,
+        ),
+        "stage_cache": Counter(
+            "waveos_stage_cache_lookups_total",
+            "Stage cache lookups by pipeline stage and result (hit, miss)",
+            ["stage", "result"],
+            registry=registry,
+        ),
+        "sample_cache": Counter(
+            "waveos_sample_cache_lookups_total",
+            "Per-file normalized sample cache lookups by result (hit, miss)",
+            ["result"],
+            registry=registry,
+        ),
     }
     return _counters
 
@@ -78,5 +97,27 @@ def histograms() -> dict[str, Histogram]:
             "Time spent scoring telemetry",
             registry=registry,
         ),
+        "stage_duration": Histogram(
+            "waveos_stage_duration_seconds",
+            "Time a pipeline stage spent processing one item",
+            ["stage"],
+            registry=registry,
+        ),
     }
     return _histograms
+
+
+def gauges() -> dict[str, Gauge]:
+    global _gauges
+    if _gauges is not None:
+        return _gauges
+    registry = init_registry()
+    _gauges = {
+        "queue_depth": Gauge(
+            "waveos_queue_depth",
+            "Items waiting in a pipeline stage input queue",
+            ["queue"],
+            registry=registry,
+        ),
+    }
+    return _gauges
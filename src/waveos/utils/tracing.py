@@ -2,12 +2,10 @@ from __future__ import annotations
 
 import os
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span
 
 _tracer_initialized = False
 
@@ -16,6 +14,12 @@ def init_tracer(service_name: str = "waveos", endpoint: Optional[str] = None) ->
     global _tracer_initialized
     if _tracer_initialized:
         return
+    # The SDK is imported here rather than at module load; it costs ~60ms of startup.
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
     endpoint = endpoint or os.getenv("WAVEOS_OTEL_ENDPOINT")
     resource = Resource.create({"service.name": service_name})
     provider = TracerProvider(resource=resource)
@@ -34,7 +38,9 @@ def init_tracer(service_name: str = "waveos", endpoint: Optional[str] = None) ->
 
 
 @contextmanager
-def span(name: str) -> Iterator[trace.Span]:
+def span(name: str) -> Iterator[Span]:
+    from opentelemetry import trace
+
     tracer = trace.get_tracer("waveos")
     with tracer.start_as_current_span(name) as active_span:
         yield active_span
@@ -5,7 +5,8 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
 from waveos.models import TelemetrySample
-from waveos.utils import read_jsonl, write_json
+from waveos.normalize import SampleCache, normalize_file
+from waveos.utils import write_json
 
 
 @dataclass
@@ -28,18 +29,25 @@ PROFILES = {
 
 def validate_records(records: Iterable[Dict[str, Any]], profile: ValidationProfile) -> Dict[str, Any]:
     total = 0
-    valid = 0
+    samples: List[TelemetrySample] = []
     errors: List[str] = []
-    missing_required = {field: 0 for field in profile.required_fields}
-    stats: Dict[str, Dict[str, float]] = {}
-
     for record in records:
         total += 1
         try:
-            sample = TelemetrySample(**record)
+            samples.append(TelemetrySample(**record))
         except Exception as exc:
             errors.append(str(exc))
-            continue
+    return validate_samples(samples, profile, total, errors)
+
+
+def validate_samples(
+    samples: Iterable[TelemetrySample], profile: ValidationProfile, total: int, errors: List[str]
+) -> Dict[str, Any]:
+    valid = 0
+    missing_required = {field: 0 for field in profile.required_fields}
+    stats: Dict[str, Dict[str, float]] = {}
+
+    for sample in samples:
         valid += 1
         for field in profile.required_fields:
             if getattr(sample, field, None) is None:
@@ -65,12 +73,15 @@ def validate_records(records: Iterable[Dict[str, Any]], profile: ValidationProfi
     }
 
 
-def validate_file(path: Path, profile_name: str, out_path: Path | None = None) -> Dict[str, Any]:
-    records = read_jsonl(path)
+def validate_file(
+    path: Path, profile_name: str, out_path: Path | None = None, sample_cache: SampleCache | None = None
+) -> Dict[str, Any]:
     profile = PROFILES.get(profile_name)
     if not profile:
         raise ValueError(f"Unknown profile: {profile_name}")
-    payload = validate_records(records, profile)
+    # Validate what a run would ingest: the normalized samples, shared with runs through the sample cache.
+    normalized = normalize_file(path, cache=sample_cache)
+    payload = validate_samples(normalized.samples, profile, normalized.record_count, normalized.errors)
     if out_path:
         write_json(out_path, payload)
     return payload
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from importlib import metadata
-
 
 def current_version() -> str:
+    from importlib import metadata
+
     try:
         return metadata.version("waveos")
     except metadata.PackageNotFoundError:
@@ -0,0 +1,89 @@
+from waveos.models import ActionRecommendation, ActionType, HealthScore
+from waveos.policy import ActionStateStore
+from waveos.scoring import status_for_score
+
+
+def _score(value: float) -> HealthScore:
+    return HealthScore(
+        entity_type="link",
+        entity_id="link-1",
+        score=value,
+        status=status_for_score(value),
+        window_start="2025-01-01T00:00:00Z",
+        window_end="2025-01-01T00:05:00Z",
+    )
+
+
+def _reroute() -> ActionRecommendation:
+    return ActionRecommendation(
+        action=ActionType.REROUTE,
+        entity_type="link",
+        entity_id="link-1",
+        rationale="Link health is FAIL; recommend reroute.",
+        parameters={"priority": "high"},
+    )
+
+
+def test_steady_state_only_applies_changes(tmp_path) -> None:
+    path = tmp_path / "actions.json"
+    store = ActionStateStore.load(path)
+    first = store.reconcile([_reroute()], [_score(40.0)], now=0.0)
+    assert len(first.applied) == 1
+    store.save(path)
+    second = ActionStateStore.load(path).reconcile([_reroute()], [_score(40.0)], now=60.0)
+    assert second.applied == [] and len(second.unchanged) == 1
+
+
+def test_dwell_hysteresis_and_cooldown() -> None:
+    store = ActionStateStore(cooldown_seconds=300, min_dwell_seconds=120, hysteresis_band=5)
+    store.reconcile([_reroute()], [_score(40.0)], now=0.0)
+    # Recovered past the threshold but still inside the dwell window.
+    assert store.reconcile([], [_score(70.0)], now=60.0).held
+    # Dwell elapsed, but 62 is within the band above the FAIL/WARN boundary.
+    assert store.reconcile([], [_score(62.0)], now=200.0).held
+    assert store.reconcile([], [_score(70.0)], now=210.0).released
+    # Flapping back to FAIL inside the cooldown is suppressed.
+    diff = store.reconcile([_reroute()], [_score(40.0)], now=300.0)
+    assert diff.applied == [] and len(diff.suppressed) == 1
+    assert len(store.reconcile([_reroute()], [_score(40.0)], now=600.0).applied) == 1
+
+
+def test_released_entries_are_pruned_after_cooldown(tmp_path) -> None:
+    path = tmp_path / "actions.json"
+    store = ActionStateStore(cooldown_seconds=300)
+    store.reconcile([_reroute()], [_score(40.0)], now=0.0)
+    store.reconcile([], [_score(100.0)], now=10.0)
+    assert list(store.released) == ["link:link-1|REROUTE"]
+    store.reconcile([], [_score(100.0)], now=200.0)
+    assert store.released
+    store.reconcile([], [_score(100.0)], now=310.0)
+    store.save(path)
+    assert ActionStateStore.load(path).released == {}
+
+
+def _reroute_via(links: list, residual: float) -> ActionRecommendation:
+    action = _reroute()
+    action.parameters = {
+        "priority": "high",
+        "target_path": {"links": links, "devices": [], "residual_gbps": residual},
+        "fallback_paths": [{"links": ["link-9"], "devices": [], "residual_gbps": residual / 2}],
+    }
+    return action
+
+
+def test_reroute_load_drift_is_not_a_change_and_route_changes_wait_for_dwell() -> None:
+    store = ActionStateStore(min_dwell_seconds=120)
+    store.reconcile([_reroute_via(["link-2"], 40.0)], [_score(40.0)], now=0.0)
+    # Only the residual capacity moved: nothing to re-apply.
+    assert len(store.reconcile([_reroute_via(["link-2"], 35.5)], [_score(40.0)], now=60.0).unchanged) == 1
+    # A new route inside the dwell window is held, then applied once the dwell has elapsed.
+    assert store.reconcile([_reroute_via(["link-3"], 50.0)], [_score(40.0)], now=90.0).held == ["link:link-1|REROUTE"]
+    assert len(store.reconcile([_reroute_via(["link-3"], 50.0)], [_score(40.0)], now=150.0).applied) == 1
+
+
+def test_escalation_updates_stored_status() -> None:
+    store = ActionStateStore()
+    store.reconcile([_reroute()], [_score(70.0)], now=0.0)
+    assert store.active["link:link-1|REROUTE"]["status"] == "WARN"
+    store.reconcile([_reroute()], [_score(40.0)], now=60.0)
+    assert store.active["link:link-1|REROUTE"]["status"] == "FAIL"
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from waveos.backtest import RUN_INDEX_NAME, conflicting_rule_ids, discover_runs, run_backtest
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.sim import build_demo_dataset
+from waveos.utils.config import WaveOSConfig
+
+
+def _write_run(root, name: str, started_at: str, score: float) -> None:
+    run_dir = root / name
+    run_dir.mkdir(parents=True)
+    status = "PASS" if score >= 85 else "WARN" if score >= 60 else "FAIL"
+    record = {
+        "entity_type": "link",
+        "entity_id": "link-1",
+        "score": score,
+        "status": status,
+        "drivers": [],
+        "details": {},
+        "window_start": "2025-01-01T00:00:00Z",
+        "window_end": "2025-01-01T00:05:00Z",
+    }
+    (run_dir / "health_summary.json").write_text(json.dumps([record]), encoding="utf-8")
+    (run_dir / "run_meta.json").write_text(json.dumps({"started_at": started_at}), encoding="utf-8")
+
+
+def test_backtest_counts_actions_flaps_and_rule_coverage(tmp_path) -> None:
+    for idx, score in enumerate([50.0, 70.0, 50.0, 90.0]):
+        _write_run(tmp_path, f"run-{idx}", f"2025-01-0{idx + 1}T00:00:00Z", score)
+    rules = [{"id": "deep-fail", "metric": "score", "operator": "<", "threshold": 55, "action": "RATE_LIMIT"}]
+    summary = run_backtest(tmp_path, rules, feature_flags={"action_rate_limit": False})
+    assert summary["run_count"] == 4
+    assert summary["action_counts"] == {"QOS_PRIORITIZATION": 1, "RATE_LIMIT": 2, "REROUTE": 2}
+    assert summary["rule_coverage"]["deep-fail"] == {"hits": 2, "runs": 2, "run_coverage": 0.5, "entities": 1}
+    assert summary["transitions"] == 8
+    assert {item["key"] for item in summary["top_flapping"]} == {
+        "link:link-1|REROUTE",
+        "link:link-1|RATE_LIMIT",
+        "link:link-1|QOS_PRIORITIZATION",
+    }
+    assert run_backtest(tmp_path, rules, feature_flags={"action_rate_limit": False}, workers=2) == summary
+
+
+def test_runs_without_meta_sort_by_time_with_the_rest(tmp_path) -> None:
+    _write_run(tmp_path, "a", "2025-01-01T00:00:00+02:00", 90.0)
+    _write_run(tmp_path, "b", "2025-01-01T00:00:00", 90.0)
+    _write_run(tmp_path, "c", "2025-01-02T00:00:00Z", 90.0)
+    _write_run(tmp_path, "d", "2025-01-01T12:00:00Z", 90.0)
+    (tmp_path / "d" / "run_meta.json").unlink()
+    # 2025-01-01T12:00:00Z, between "b" and "c"; a string key would have sorted it after every ISO date.
+    os.utime(tmp_path / "d" / "health_summary.json", (1735732800, 1735732800))
+    assert [path.parent.name for _, path in discover_runs(tmp_path)] == ["a", "b", "d", "c"]
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def test_run_index_and_since_window_select_runs(tmp_path) -> None:
+    for name, started_at in (("old", "2025-01-01T00:00:00"), ("new", "2025-02-01T00:00:00"), ("stray", "2025-03-01T00:00:00")):
+        _write_run(tmp_path, name, started_at, 90.0)
+    # "gone" was removed by cleanup; "stray" was never indexed, so the index is what gets read.
+    entries = [
+        {"path": "old", "started_at": "2025-01-01T00:00:00"},
+        {"path": "new", "started_at": "2025-02-01T00:00:00"},
+        {"path": "gone", "started_at": "2025-02-02T00:00:00"},
+    ]
+    (tmp_path / RUN_INDEX_NAME).write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+    assert [path.parent.name for _, path in discover_runs(tmp_path)] == ["old", "new"]
+    assert [path.parent.name for _, path in discover_runs(tmp_path, since=_epoch("2025-01-15T00:00:00"))] == ["new"]
+    assert run_backtest(tmp_path, [], since=_epoch("2025-01-15T00:00:00"))["run_count"] == 1
+
+
+def test_pipeline_runs_are_indexed(tmp_path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(audit_enabled=False, evidence_pack_enabled=False)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    out_dir = tmp_path / "history"
+    for _ in range(2):
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(out_dir), role="operator", token=None, config_obj=config
+        )
+        assert cmd_run(args) == 0
+    runs = discover_runs(out_dir)
+    # The second run lands in a run-id subdirectory; both are read from the index.
+    assert [path.parent == out_dir for _, path in runs] == [True, False]
+    assert len((out_dir / RUN_INDEX_NAME).read_text().splitlines()) == 2
+
+
+def test_duplicate_and_conflicting_rule_ids(tmp_path) -> None:
+    _write_run(tmp_path, "run", "2025-01-01T00:00:00Z", 50.0)
+    rule = {"id": "deep-fail", "metric": "score", "operator": "<", "threshold": 55, "action": "RATE_LIMIT"}
+    with pytest.raises(ValueError, match="deep-fail"):
+        run_backtest(tmp_path, [rule, {**rule, "threshold": 40}])
+    assert conflicting_rule_ids([rule], [{**rule, "threshold": 40}]) == ["deep-fail"]
+    assert conflicting_rule_ids([rule], [dict(rule)]) == []
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from waveos.models import HealthScore, HealthStatus, TelemetrySample
+from waveos.scoring import ChangePointDetector, apply_changepoint_alarms
+
+
+def _samples(start: datetime, values: list[int], link_id: str = "link-1") -> list[TelemetrySample]:
+    return [
+        TelemetrySample(timestamp=start + timedelta(seconds=idx), link_id=link_id, errors=value)
+        for idx, value in enumerate(values)
+    ]
+
+
+def test_detector_alarms_on_sample_that_crosses_threshold() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    detector = ChangePointDetector(warmup=5, metrics=("errors",))
+    alarms = detector.observe_all(_samples(start, [2, 3, 2, 3, 2, 2, 3, 2] + [20] * 5))
+    assert alarms
+    assert alarms[0].metric == "errors"
+    assert alarms[0].direction == "up"
+    assert alarms[0].timestamp == start + timedelta(seconds=8)
+
+
+def test_detector_state_persists_between_runs(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    state_path = tmp_path / "changepoint.json"
+    first = ChangePointDetector(warmup=5, metrics=("errors",))
+    assert first.observe_all(_samples(start, [2, 3, 2, 3, 2, 2])) == []
+    first.save(state_path)
+
+    second = ChangePointDetector.load(state_path, warmup=5, metrics=("errors",))
+    alarms = second.observe_all(_samples(start + timedelta(minutes=5), [20]))
+    assert len(alarms) == 1
+
+
+def test_apply_changepoint_alarms_adds_drivers() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    detector = ChangePointDetector(warmup=3, metrics=("errors",))
+    alarms = detector.observe_all(_samples(start, [1, 1, 1, 1, 50]))
+    score = HealthScore(
+        entity_type="link",
+        entity_id="link-1",
+        score=100.0,
+        status=HealthStatus.PASS,
+        window_start=start,
+        window_end=start,
+    )
+    apply_changepoint_alarms([score], alarms)
+    assert "errors_changepoint" in score.drivers
+    assert score.details["changepoints"][0]["metric"] == "errors"
+
+
+def test_detector_skips_samples_already_seen_by_saved_state(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    state_path = tmp_path / "changepoint.json"
+    first = ChangePointDetector(warmup=5, metrics=("errors",))
+    first.observe_all(_samples(start, [2, 3, 2, 3, 2, 2]))
+    first.save(state_path)
+
+    rerun = ChangePointDetector.load(state_path, warmup=5, metrics=("errors",))
+    assert rerun.observe_all(_samples(start, [2, 3, 2, 3, 2, 2])) == []
+    assert rerun.to_dict() == first.to_dict()
+
+
+def test_detector_resets_state_saved_with_other_params(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    state_path = tmp_path / "changepoint.json"
+    first = ChangePointDetector(warmup=5, metrics=("errors",))
+    first.observe_all(_samples(start, [2, 3, 2, 3, 2, 2]))
+    first.save(state_path)
+
+    retuned = ChangePointDetector.load(state_path, warmup=5, threshold=8.0, metrics=("errors",))
+    assert retuned.to_dict()["links"] == {}
@@ -0,0 +1,103 @@
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.models import TelemetrySample
+from waveos.normalize import COUNTER_FIELDS, CounterState, counter_delta, counters_to_deltas
+from waveos.sim import build_demo_dataset
+from waveos.utils import read_json
+from waveos.utils.config import WaveOSConfig
+
+
+def _samples(start: datetime, errors: list[int]) -> list[TelemetrySample]:
+    return [
+        TelemetrySample(timestamp=start + timedelta(seconds=idx * 10), link_id="link-1", errors=value)
+        for idx, value in enumerate(errors)
+    ]
+
+
+def test_counter_delta_handles_wrap_and_reset() -> None:
+    assert counter_delta(10, 15) == (5, False)
+    assert counter_delta(2**32 - 5, 10, width=32) == (15, True)
+    assert counter_delta(500, 3) == (3, True)
+
+
+def test_counter_delta_treats_ambiguous_drops_as_resets() -> None:
+    # A 64-bit counter passing 2**32 and then dropping was reset, not wrapped at 32 bits.
+    assert counter_delta(2**32 - 5, 10) == (10, True)
+    # Dropping to another large value is a reset even at the configured width.
+    assert counter_delta(2**32 - 5, 2**31 + 7, width=32) == (2**31 + 7, True)
+
+
+def test_counters_to_deltas_sorts_by_time() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    samples = list(reversed(_samples(start, [100, 104, 110, 2])))
+    converted = counters_to_deltas(samples)
+    assert [s.errors for s in converted] == [0, 4, 6, 2]
+
+
+def test_counter_state_carries_across_runs(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    state_path = tmp_path / "counters.json"
+    state = CounterState.load(state_path)
+    counters_to_deltas(_samples(start, [100, 104]), state)
+    state.save(state_path)
+
+    resumed = CounterState.load(state_path)
+    second_run = _samples(start, [100, 104, 120])
+    converted = counters_to_deltas(second_run, resumed)
+    # Re-read samples get the deltas the first run gave them; only the new one is counted fresh.
+    assert [s.errors for s in converted] == [0, 4, 16]
+    assert [s.timestamp for s in converted] == [s.timestamp for s in second_run]
+    assert resumed.stale_samples == 2
+
+
+def test_rerun_reproduces_deltas_and_skips_unknown_old_samples(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    state_path = tmp_path / "counters.json"
+    first_run = _samples(start, [100, 104, 110, 130])
+    state = CounterState.load(state_path)
+    first = counters_to_deltas(first_run, state)
+    state.save(state_path)
+
+    rerun = counters_to_deltas(first_run, CounterState.load(state_path))
+    assert [s.errors for s in rerun] == [s.errors for s in first] == [0, 4, 6, 20]
+
+    # A sample the earlier run never saw, older than the carried reading, was already counted.
+    late = TelemetrySample(timestamp=start + timedelta(seconds=15), link_id="link-1", errors=107)
+    assert [s.errors for s in counters_to_deltas([late], CounterState.load(state_path))] == [0]
+
+
+def test_rerun_with_carried_state_keeps_scores(tmp_path: Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    for telemetry in (baseline_dir / "telemetry.jsonl", run_dir / "telemetry.jsonl"):
+        # Turn the per-interval counters into increasing cumulative readings per link.
+        totals: dict = {}
+        lines = []
+        for line in telemetry.read_text(encoding="utf-8").splitlines():
+            record = json.loads(line)
+            running = totals.setdefault(record["link_id"], dict.fromkeys(COUNTER_FIELDS, 1000))
+            for field in COUNTER_FIELDS:
+                running[field] += int(record.get(field) or 0)
+            lines.append(json.dumps({**record, **running}) + "\n")
+        telemetry.write_text("".join(lines))
+    config = WaveOSConfig(
+        idempotent_outputs=False,
+        audit_enabled=False,
+        cumulative_counters=True,
+        counter_state_path=str(tmp_path / "counters.json"),
+    )
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+
+    def _run(name: str) -> list:
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(tmp_path / name), role="operator", token=None, config_obj=config
+        )
+        assert cmd_run(args) == 0
+        return read_json(tmp_path / name / "health_summary.json")
+
+    first, second = _run("first"), _run("second")
+    assert second == first
+    assert any(score["status"] != "PASS" for score in first)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from waveos.cli import cmd_baseline, cmd_schedule
+from waveos.daemon import PipelineDaemon, WarmState
+from waveos.sim import build_demo_dataset
+from waveos.utils.config import WaveOSConfig
+
+
+def _write_baseline(baseline_dir: Path, mean: float, mtime_ns: int) -> None:
+    path = baseline_dir / "baseline.json"
+    record = {
+        "entity_type": "link",
+        "entity_id": "link-1",
+        "metrics": {"errors_mean": mean},
+        "window_start": "2025-01-01T00:00:00Z",
+        "window_end": "2025-01-01T00:05:00Z",
+    }
+    path.write_text(json.dumps([record]), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_daemon_reuses_warm_state_until_files_change(tmp_path: Path) -> None:
+    _write_baseline(tmp_path, 1.0, 1_000_000_000)
+    seen: list[WarmState] = []
+
+    def _cycle(state: WarmState) -> int:
+        seen.append(state)
+        return 0
+
+    daemon = PipelineDaemon(tmp_path, tmp_path / "in", _cycle, config=WaveOSConfig(), interval_seconds=0, max_cycles=2)
+    assert daemon.run_forever() == 0
+    assert daemon.stats["cycles"] == 2
+    assert seen[0] is seen[1]
+    assert daemon.stats["reloads"]["baseline"] == 0
+
+    _write_baseline(tmp_path, 5.0, 2_000_000_000)
+    assert daemon.refresh() == ["baseline"]
+    assert daemon.state.baseline_map["link-1"].metrics["errors_mean"] == 5.0
+    assert daemon.state.generation == 1
+    assert daemon.refresh() == []
+
+
+def test_daemon_keeps_previous_baseline_on_bad_reload(tmp_path: Path) -> None:
+    _write_baseline(tmp_path, 1.0, 1_000_000_000)
+    daemon = PipelineDaemon(tmp_path, tmp_path, lambda state: 0, config=WaveOSConfig(), interval_seconds=1)
+    daemon.refresh()
+    (tmp_path / "baseline.json").write_text("[{", encoding="utf-8")
+    assert daemon.refresh() == []
+    assert "link-1" in daemon.state.baseline_map
+
+
+def test_warm_topology_is_loaded_once_per_change(tmp_path: Path) -> None:
+    _, run_dir = build_demo_dataset(tmp_path / "dataset")
+    state = WarmState(config=WaveOSConfig(), config_fingerprint="fp", baseline_map={})
+    topology, overlay = state.topology(run_dir, 2)
+    warm = state.topologies[str(run_dir)]
+    assert topology is not None and overlay is not None and overlay.engine is warm.path_engine
+    # Nothing is computed up front; lookups fill the shared cache lazily.
+    assert warm.path_engine._cache == {}
+    link_id = topology.link_ids[0]
+    overlay.set_link_state(link_id, up=False)
+    overlay.alternates(topology.link_ids[-1])
+    _, next_overlay = state.topology(run_dir, 2)
+    assert next_overlay.down == set() and state.topologies[str(run_dir)] is warm
+    assert list(warm.path_engine._cache) == [len(topology.link_ids) - 1]
+
+    os.utime(run_dir / "links.json", ns=(1, 1))
+    state.topology(run_dir, 2)
+    assert state.topologies[str(run_dir)] is not warm
+
+
+def test_schedule_runs_pipeline_from_warm_state(tmp_path: Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    args = argparse.Namespace(
+        input=str(run_dir),
+        baseline=str(baseline_dir),
+        output=str(tmp_path / "out"),
+        every=0,
+        count=2,
+        role="operator",
+        token=None,
+        config=None,
+        config_obj=config,
+    )
+    assert cmd_schedule(args) == 0
+    for idx in (1, 2):
+        assert (tmp_path / "out" / f"run_{idx}" / "health_summary.json").exists()
@@ -0,0 +1,41 @@
+import gzip
+import zipfile
+from pathlib import Path
+
+from waveos.reporting import EvidencePackBuilder
+
+
+def _build(out_dir: Path, store_dir: Path | None = None) -> EvidencePackBuilder:
+    builder = EvidencePackBuilder(out_dir / "evidence_pack_run-2.zip", workers=3, store_dir=store_dir)
+    builder.add(out_dir / "events.jsonl")
+    builder.add_remaining(out_dir)
+    builder.close()
+    return builder
+
+
+def test_members_round_trip_and_compressed_files_are_stored(tmp_path: Path) -> None:
+    events = b'{"level": "INFO", "message": "ok"}\n' * 5000
+    (tmp_path / "events.jsonl").write_bytes(events)
+    (tmp_path / "metrics.csv.gz").write_bytes(gzip.compress(b"a,b\n1,2\n"))
+    (tmp_path / "evidence_pack_run-1.zip").write_bytes(b"older run")
+    builder = _build(tmp_path)
+    with zipfile.ZipFile(tmp_path / "evidence_pack_run-2.zip") as handle:
+        assert handle.testzip() is None
+        assert sorted(handle.namelist()) == ["events.jsonl", "metrics.csv.gz"]
+        assert handle.read("events.jsonl") == events
+        assert handle.getinfo("events.jsonl").compress_type == zipfile.ZIP_DEFLATED
+        assert handle.getinfo("metrics.csv.gz").compress_type == zipfile.ZIP_STORED
+    assert builder.stats["members"] == 2 and builder.stats["bytes_out"] < builder.stats["bytes_in"]
+
+
+def test_content_store_reuses_identical_artifacts(tmp_path: Path) -> None:
+    store = tmp_path / "cas"
+    for run in ("a", "b"):
+        out_dir = tmp_path / run
+        out_dir.mkdir()
+        (out_dir / "events.jsonl").write_text("same content\n" * 100, encoding="utf-8")
+        builder = _build(out_dir, store)
+    assert builder.stats["reused"] == 1
+    assert len(list(store.rglob("*.deflate"))) == 1
+    with zipfile.ZipFile(tmp_path / "b" / "evidence_pack_run-2.zip") as handle:
+        assert handle.read("events.jsonl") == b"same content\n" * 100
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from waveos.executor import Stage, StagedExecutor
+
+
+def test_stages_stream_and_barrier_collects_everything() -> None:
+    def _double(item: int):
+        yield item * 2
+
+    def _total(items):
+        yield sorted(items)
+
+    executor = StagedExecutor(
+        [Stage("double", _double, workers=3), Stage("total", _total, barrier=True)],
+        queue_size=2,
+    )
+    assert executor.run(range(20)) == [[idx * 2 for idx in range(20)]]
+    stats = executor.snapshot()
+    assert stats["double"]["items_in"] == 20
+    assert stats["double"]["status"] == "ok"
+    assert stats["total"]["items_in"] == 20
+    assert executor.queue_depths()["double"] <= 2
+
+
+def test_bounded_queue_applies_backpressure() -> None:
+    def _fast(item: int):
+        yield item
+
+    def _slow(item: int):
+        time.sleep(0.02)
+        yield item
+
+    executor = StagedExecutor([Stage("fast", _fast), Stage("slow", _slow)], queue_size=1)
+    assert executor.run(range(10)) == list(range(10))
+    stats = executor.summary()["stages"]
+    assert stats["slow"]["queue_max_depth"] == 1
+    assert stats["fast"]["stall_seconds"] > 0.05
+    assert stats["slow"]["busy_seconds"] >= 0.18
+
+
+def test_stage_failure_aborts_and_reraises() -> None:
+    started = threading.Event()
+
+    def _boom(item: int):
+        started.set()
+        raise RuntimeError("bad batch")
+        yield item
+
+    executor = StagedExecutor([Stage("boom", _boom), Stage("sink", lambda item: iter([item]))], queue_size=1)
+    with pytest.raises(RuntimeError, match="bad batch"):
+        executor.run(range(100))
+    assert started.is_set()
+    assert executor.snapshot()["boom"]["status"] == "failed"
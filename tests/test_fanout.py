@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import pytest
+
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.fanout import load_manifest
+from waveos.sim import build_demo_dataset
+from waveos.utils import read_json
+from waveos.utils.config import WaveOSConfig
+
+
+def _manifest(tmp_path: Path, config: WaveOSConfig) -> Path:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    sites = [
+        {"name": "east", "in": "dataset/run", "baseline": "dataset/baseline", "out": "out/east"},
+        {"name": "west", "in": "dataset/run", "baseline": "dataset/baseline", "out": "out/west"},
+        {"name": "broken", "in": "dataset/run", "baseline": "missing", "out": "out/broken"},
+    ]
+    path = tmp_path / "sites.json"
+    path.write_text(json.dumps({"sites": sites}), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_manifest_runs_sites_with_isolated_failures(tmp_path: Path, workers: int) -> None:
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False)
+    manifest = _manifest(tmp_path, config)
+    args = argparse.Namespace(
+        input=None,
+        baseline=None,
+        output=str(tmp_path / "out"),
+        manifest=str(manifest),
+        workers=workers,
+        shadow_config=[],
+        role="operator",
+        token=None,
+        config_obj=config,
+    )
+    assert cmd_run(args) == 1
+    summary = read_json(tmp_path / "out" / "fanout_summary.json")
+    assert [site["name"] for site in summary["sites"]] == ["east", "west", "broken"]
+    assert summary["failed"] == ["broken"]
+    assert "Missing baseline.json" in summary["sites"][2]["error"]
+    for name in ("east", "west"):
+        assert (tmp_path / "out" / name / "health_summary.json").exists()
+
+
+def test_manifest_rejects_shared_outputs(tmp_path: Path) -> None:
+    path = tmp_path / "sites.json"
+    site = {"in": "run", "baseline": "base", "out": "out"}
+    path.write_text(json.dumps({"sites": [site, site]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_manifest(path)
+
+
+def test_manifest_sites_keep_separate_action_state(tmp_path: Path) -> None:
+    shared = tmp_path / "shared" / "actions.json"
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, action_state_enabled=True, action_state_path=str(shared))
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    sites = [{"name": name, "in": "dataset/run", "baseline": "dataset/baseline", "out": f"out/{name}"} for name in ("east", "west")]
+    manifest = tmp_path / "sites.json"
+    manifest.write_text(json.dumps({"sites": sites}), encoding="utf-8")
+    args = argparse.Namespace(
+        input=None,
+        baseline=None,
+        output=str(tmp_path / "out"),
+        manifest=str(manifest),
+        workers=2,
+        shadow_config=[],
+        role="operator",
+        token=None,
+        config_obj=config,
+    )
+    for _ in range(2):
+        assert cmd_run(args) == 0
+    assert not shared.exists()
+    for name in ("east", "west"):
+        assert read_json(tmp_path / "out" / name / "state" / "actions.json")["active"]
+        action_state = read_json(tmp_path / "out" / name / "run_meta.json")["action_state"]
+        assert action_state["applied"] == 0 and action_state["released"] == 0
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from waveos.models import RunStats
+from waveos.reporting import write_outputs
+from waveos.reporting.metrics_export import write_metrics_parquet
+from waveos.utils import read_csv
+
+WINDOW = {"window_start": "2025-01-01T00:00:00Z", "window_end": "2025-01-01T00:05:00Z"}
+
+
+def _stats() -> list[RunStats]:
+    return [
+        RunStats(entity_type="link", entity_id="link-1", metrics={"errors": 3.0, "drops": 1.0}, **WINDOW),
+        RunStats(entity_type="link", entity_id="link-2", metrics={"errors": 0.0, "ber": 1e-12}, **WINDOW),
+    ]
+
+
+def test_wide_metrics_by_default_and_long_behind_flag(tmp_path: Path) -> None:
+    write_outputs(tmp_path / "wide", [], [], [], run_id="run-m", run_stats=_stats(), evidence_pack_enabled=False)
+    rows = read_csv(tmp_path / "wide" / "metrics.csv")
+    assert list(rows[0]) == ["entity_type", "entity_id", "window_start", "window_end", "ber", "drops", "errors"]
+    assert [row["entity_id"] for row in rows] == ["link-1", "link-2"]
+    assert rows[0]["errors"] == "3.0" and rows[0]["ber"] == ""
+
+    write_outputs(
+        tmp_path / "long", [], [], [], run_id="run-m", run_stats=_stats(), evidence_pack_enabled=False, metrics_format="long"
+    )
+    long_rows = read_csv(tmp_path / "long" / "metrics.csv")
+    assert len(long_rows) == 4 and long_rows[0]["run_id"] == "run-m"
+
+
+def test_parquet_is_skipped_without_pyarrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    write_outputs(tmp_path, [], [], [], run_stats=_stats(), evidence_pack_enabled=False, metrics_parquet=True)
+    assert (tmp_path / "metrics.csv").exists()
+    assert not (tmp_path / "metrics.parquet").exists()
+
+
+def test_parquet_export_round_trips(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = write_metrics_parquet(tmp_path / "metrics.parquet", _stats(), run_id="run-m")
+    table = pq.read_table(path)
+    assert table.column("errors").to_pylist() == [3.0, 0.0]
+    assert table.schema.metadata[b"run_id"] == b"run-m"
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from waveos.models import ActionRecommendation, ActionType, Event, EventLevel, HealthScore, HealthStatus, RunStats
+from waveos.reporting import write_outputs
+from waveos.utils import read_json, write_json_array
+
+
+def test_write_json_array_streams_valid_json(tmp_path: Path) -> None:
+    path = tmp_path / "items.json"
+    assert write_json_array(path, ({"idx": idx} for idx in range(3))) == 3
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"idx": 0}, {"idx": 1}, {"idx": 2}]
+    write_json_array(path, iter(()))
+    assert read_json(path) == []
+
+
+def test_concurrent_writers_match_serial_output(tmp_path: Path) -> None:
+    window = {"window_start": "2025-01-01T00:00:00Z", "window_end": "2025-01-01T00:05:00Z"}
+    scores = [
+        HealthScore(entity_type="link", entity_id=f"link-{idx}", score=50.0, status=HealthStatus.FAIL, drivers=["errors_increase"], **window)
+        for idx in range(50)
+    ]
+    actions = [
+        ActionRecommendation(action=ActionType.REROUTE, entity_type="link", entity_id=score.entity_id, rationale="fail")
+        for score in scores
+    ]
+    events = [Event(timestamp="2025-01-01T00:05:00Z", level=EventLevel.ERROR, message="link FAIL")]
+    stats = [RunStats(entity_type="link", entity_id="link-0", metrics={"errors": 3.0}, **window)]
+    outputs = {}
+    for workers in (1, 4):
+        out_dir = tmp_path / f"workers-{workers}"
+        write_outputs(
+            out_dir, scores, events, actions, run_id="run-w", run_meta={"run_id": "run-w"}, run_stats=stats, output_workers=workers
+        )
+        outputs[workers] = {
+            name: (out_dir / name).read_text(encoding="utf-8")
+            for name in ("health_summary.json", "actions.json", "explainability.json", "events.jsonl", "metrics.csv", "report.html")
+        }
+    assert outputs[1] == outputs[4]
+    explainability = json.loads(outputs[4]["explainability.json"])
+    assert explainability[0]["status"] == "FAIL" and explainability[0]["drivers"] == ["errors_increase"]
+    assert not list((tmp_path / "workers-4").glob("tmp*"))
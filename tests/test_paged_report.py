@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+from waveos.bench import synthetic_report_payload
+from waveos.models import HealthStatus
+from waveos.reporting import render_report
+
+
+def test_paged_report_inlines_worst_and_spills_pages(tmp_path: Path) -> None:
+    health, events, actions = synthetic_report_payload(1000)
+    health[500]["score"] = 1.0
+    health[500]["status"] = HealthStatus.FAIL
+    report_path = render_report(tmp_path, health, events, actions, run_id="run-paged", mode="paged", top_n=5, page_size=300)
+    html = report_path.read_text(encoding="utf-8")
+    assert "link-500" in html and "link-999" not in html
+    assert 'data-table="health" data-pages="4"' in html
+    page = (tmp_path / "report_data" / "health-3.js").read_text(encoding="utf-8")
+    prefix = 'window.WAVEOS_PAGE("health",3,'
+    assert page.startswith(prefix)
+    rows = json.loads(page[len(prefix) : page.rindex(")")])
+    assert len(rows) == 100 and rows[-1][1] == "link-999"
+
+    render_report(tmp_path, health[:10], [], [], mode="paged", page_size=300)
+    assert sorted(path.name for path in (tmp_path / "report_data").iterdir()) == ["health-0.js"]
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from waveos.models import ActionType, HealthScore, HealthStatus, Link, Path, Workload
+from waveos.policy import recommend_actions
+from waveos.topology import PathEngine, PathOverlay, TopologyIndex
+
+
+def _engine() -> PathEngine:
+    # sw1 - sw2 direct, plus sw1 - sw3 - sw2 and sw1 - sw4 - sw2 detours.
+    links = [
+        Link(id="direct", src_port="sw1/1", dst_port="sw2/1", capacity_gbps=100.0),
+        Link(id="a1", src_port="sw1/2", dst_port="sw3/1", capacity_gbps=100.0),
+        Link(id="a2", src_port="sw3/2", dst_port="sw2/2", capacity_gbps=100.0),
+        Link(id="b1", src_port="sw1/3", dst_port="sw4/1", capacity_gbps=400.0),
+        Link(id="b2", src_port="sw4/2", dst_port="sw2/3", capacity_gbps=400.0),
+    ]
+    paths = [Path(id="p-a", links=["a1", "a2"])]
+    workloads = [Workload(id="wl", name="bulk", priority=1, bandwidth_gbps=60.0, paths=["p-a"])]
+    return PathEngine(TopologyIndex(links, paths=paths, workloads=workloads), k=2)
+
+
+def test_alternates_are_disjoint_and_ranked_by_residual() -> None:
+    alternates = _engine().alternates("direct")
+    assert [alt.links for alt in alternates] == [["b1", "b2"], ["a1", "a2"]]
+    assert alternates[0].devices == ["sw1", "sw4", "sw2"]
+    assert alternates[1].residual_gbps == 40.0
+
+
+def test_link_failure_invalidates_only_affected_alternates() -> None:
+    engine = _engine()
+    assert len(engine.alternates("direct")) == 2
+    engine.set_link_state("b2", up=False)
+    assert [alt.links for alt in engine.alternates("direct")] == [["a1", "a2"]]
+    engine.set_link_state("b2", up=True)
+    assert len(engine.alternates("direct")) == 2
+
+
+def test_reroute_action_carries_target_path() -> None:
+    score = HealthScore(
+        entity_type="link",
+        entity_id="direct",
+        score=10.0,
+        status=HealthStatus.FAIL,
+        window_start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        window_end=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+    actions = recommend_actions([score], path_engine=_engine())
+    reroute = next(action for action in actions if action.action == ActionType.REROUTE)
+    assert reroute.parameters["priority"] == "high"
+    assert reroute.parameters["target_path"]["links"] == ["b1", "b2"]
+    assert len(reroute.parameters["fallback_paths"]) == 1
+
+
+def test_overlay_keeps_failures_local_and_shares_the_cache() -> None:
+    engine = _engine()
+    run = PathOverlay(engine)
+    run.set_link_state("b2", up=False)
+    assert [alt.links for alt in run.alternates("direct")] == [["a1", "a2"]]
+    assert [alt.links for alt in engine.alternates("direct")] == [["b1", "b2"], ["a1", "a2"]]
+    # Alternates the run's failures do not touch come straight from the shared cache.
+    assert PathOverlay(engine).alternates("direct") is engine.alternates("direct")
+    assert len(engine._cache) == 1
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pytest
+
+from waveos.cli import cmd_baseline
+from waveos.commands.pipeline import (
+    RunContext,
+    _aggregate_stage,
+    _collect_stage,
+    _normalize_stage,
+    _policy_stage,
+    _prepare_run,
+    _score_stage,
+    _telemetry_tasks,
+)
+from waveos.runstate import RunInterrupted
+from waveos.sim import build_demo_dataset
+from waveos.utils.config import WaveOSConfig
+
+
+def _context(tmp_path: Path, **overrides) -> RunContext:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, **overrides)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    args = argparse.Namespace(
+        input=str(run_dir),
+        baseline=str(baseline_dir),
+        output=str(tmp_path / "out"),
+        role="operator",
+        token=None,
+        config_obj=config,
+        resume=None,
+    )
+    ctx = _prepare_run(args)
+    assert isinstance(ctx, RunContext)
+    return ctx
+
+
+def _ingest(ctx: RunContext) -> list:
+    return [
+        normalized
+        for task in _telemetry_tasks(ctx)
+        for batch in _collect_stage(ctx, task)
+        for normalized in _normalize_stage(ctx, batch)
+    ]
+
+
+def test_prepare_run_reports_missing_baseline(tmp_path: Path) -> None:
+    args = argparse.Namespace(
+        input=str(tmp_path), baseline=str(tmp_path / "none"), output=str(tmp_path / "out"), config_obj=None
+    )
+    assert _prepare_run(args) == 1
+
+
+def test_collect_batches_files_and_caches_them_once_normalized(tmp_path: Path) -> None:
+    ctx = _context(tmp_path, pipeline_batch_size=50, sample_cache_dir=str(tmp_path / "samples"))
+    batches = _ingest(ctx)
+    assert len(batches) > 1
+    assert ctx.file_sources["read"] == 1 and ctx.pending_files == {}
+
+    again = _context(tmp_path / "again", sample_cache_dir=str(tmp_path / "samples"))
+    again.in_dir = ctx.in_dir
+    assert len(_ingest(again)) == 1
+    assert again.file_sources["sample_cache"] == 1
+
+
+def test_aggregate_refuses_partial_ingest_and_bypasses_cache_for_unstable_input(tmp_path: Path) -> None:
+    ctx = _context(tmp_path, stage_cache_dir=str(tmp_path / "stages"))
+    batches = _ingest(ctx)
+    ctx.ingest_interrupted.set()
+    with pytest.raises(RunInterrupted):
+        list(_aggregate_stage(ctx, batches))
+
+    ctx.ingest_interrupted.clear()
+    ctx.uncacheable_input.set()
+    (run,) = _aggregate_stage(ctx, batches)
+    assert run["sample_count"] == sum(len(part.samples) for _, part, _ in batches)
+    assert all(key is None for key in ctx.keys.values())
+    assert ctx.stage_cache.summary()["stages"]["aggregate"] == "bypass"
+
+
+def test_score_stage_is_served_from_the_stage_cache(tmp_path: Path) -> None:
+    ctx = _context(tmp_path, stage_cache_dir=str(tmp_path / "stages"))
+    (run,) = _aggregate_stage(ctx, _ingest(ctx))
+    ctx.stage_cache.put("scores", ctx.keys["scores"], {"scores": [], "changepoint_alarms": []})
+    (scored,) = _score_stage(ctx, run)
+    assert scored["scores"] == []
+
+
+def test_policy_stage_restores_checkpointed_decisions(tmp_path: Path) -> None:
+    ctx = _context(tmp_path)
+    decisions = {"actions": [], "actuated": [], "events": [], "rollups": []}
+    ctx.restored["policy"] = decisions
+    (run,) = _policy_stage(ctx, {"scores": []})
+    assert run["events"] == [] and run["actions"] == []
+    assert not (ctx.out_dir / "enforced_actions.jsonl").exists()
+
+
+def test_policy_stage_recommends_from_scores(tmp_path: Path) -> None:
+    ctx = _context(tmp_path)
+    (run,) = _aggregate_stage(ctx, _ingest(ctx))
+    (run,) = _score_stage(ctx, run)
+    (run,) = _policy_stage(ctx, run)
+    failing = {score.entity_id for score in run["scores"] if score.status.value != "PASS"}
+    assert failing and {action.entity_id for action in run["actions"]} <= failing
+    assert run["shadow_diff"] is None
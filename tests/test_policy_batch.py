@@ -0,0 +1,64 @@
+import random
+
+from waveos.models import HealthScore, HealthStatus
+from waveos.policy import ScoreColumns, compile_policy_rules, recommend_actions, recommend_actions_batch
+from waveos.scoring import status_for_score
+
+
+def _scores(count: int) -> list[HealthScore]:
+    rng = random.Random(7)
+    scores = []
+    for idx in range(count):
+        value = rng.uniform(30.0, 100.0)
+        drivers = rng.sample(["errors_drift", "temperature_c_drift", "latency_ms_drift"], k=rng.randint(0, 2))
+        details = {"site": rng.choice(["east", "west"])} if idx % 3 else {}
+        if idx % 5 == 0:
+            details["labels"] = {"tier": "gold"}
+        scores.append(
+            HealthScore(
+                entity_type="link",
+                entity_id=f"sw{idx % 7}/eth{idx}",
+                score=value,
+                status=status_for_score(value),
+                drivers=drivers,
+                details=details,
+                window_start="2025-01-01T00:00:00Z",
+                window_end="2025-01-01T00:05:00Z",
+            )
+        )
+    return scores
+
+
+def test_batch_matches_per_score_evaluation() -> None:
+    rules = [
+        {"metric": "score", "operator": "<=", "threshold": 50, "action": "REROUTE"},
+        {"metric": "status", "operator": "==", "threshold": "WARN", "action": "RATE_LIMIT"},
+        {"metric": "meta.site", "operator": "==", "threshold": "east", "action": "QOS_PRIORITIZATION"},
+        {"metric": "meta.site", "operator": "!=", "threshold": "east", "action": "RATE_LIMIT"},
+        {"metric": "status", "operator": "!=", "threshold": "FAIL", "action": "QOS_PRIORITIZATION"},
+        {"metric": "status", "operator": ">=", "threshold": "FAIL", "action": "REROUTE"},
+        {"metric": "meta.rack", "operator": "!=", "threshold": "r1", "action": "RATE_LIMIT"},
+        {"metric": "meta.site", "operator": "<", "threshold": 3, "action": "RATE_LIMIT"},
+        {"metric": "score", "operator": "<", "threshold": 70, "selector": {"glob": "sw3/*"}},
+        {"metric": "score", "operator": "<", "threshold": 90, "selector": {"labels": {"tier": "gold"}}},
+    ]
+    scores = _scores(500)
+    plan = compile_policy_rules(rules)
+    flags = {"action_qos": False}
+    expected = recommend_actions(scores, feature_flags=flags, policy_rules=plan)
+    actual = recommend_actions_batch(ScoreColumns.from_scores(scores), feature_flags=flags, policy_rules=plan)
+    assert [action.model_dump() for action in actual] == [action.model_dump() for action in expected]
+    assert actual == expected
+    # Each action owns its parameters; mutating one must not leak into its siblings.
+    actual[0].parameters["mutated"] = True
+    assert "mutated" not in actual[1].parameters
+
+
+def test_columns_encode_drivers_as_bitmask() -> None:
+    scores = _scores(20)
+    columns = ScoreColumns.from_scores(scores)
+    assert len(columns) == 20
+    thermal = columns.driver_mask(lambda driver: "temperature" in driver)
+    flagged = [idx for idx, mask in enumerate(columns.drivers) if mask & thermal]
+    assert flagged == [idx for idx, score in enumerate(scores) if "temperature_c_drift" in score.drivers]
+    assert all(len(column) == 20 for column in columns.details.values())
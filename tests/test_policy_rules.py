@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from waveos.models import ActionType, HealthScore, HealthStatus
+from waveos.policy import PolicyRuleError, compile_policy_rules, recommend_actions
+from waveos.utils import load_config
+from waveos.utils.config import WaveOSConfig
+
+
+def _score(status: HealthStatus, score: float, **details) -> HealthScore:
+    return HealthScore(
+        entity_type="link",
+        entity_id="link-1",
+        score=score,
+        status=status,
+        details=details,
+        window_start="2025-01-01T00:00:00Z",
+        window_end="2025-01-01T00:05:00Z",
+    )
+
+
+def test_compiled_plan_indexes_rules_by_metric() -> None:
+    plan = compile_policy_rules(
+        [
+            {"metric": "meta.current_a", "operator": ">", "threshold": 200, "action": "RATE_LIMIT"},
+            {"metric": "status", "operator": "==", "threshold": "WARN", "action": "QOS_PRIORITIZATION"},
+            {"metric": "score", "operator": "<=", "threshold": 70, "action": "REROUTE", "message": "low"},
+        ]
+    )
+    warn = _score(HealthStatus.WARN, 65.0)
+    assert [rule.position for rule in plan.candidates(warn)] == [1, 2]
+    actions = plan.evaluate(warn)
+    assert [action.action for action in actions] == [ActionType.QOS_PRIORITIZATION, ActionType.REROUTE]
+    assert actions[1].rationale == "low"
+
+    overcurrent = _score(HealthStatus.FAIL, 40.0, current_a=250.0)
+    assert [rule.position for rule in plan.candidates(overcurrent)] == [0, 2]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {"metric": "latency", "operator": "<=", "threshold": 1},
+        {"metric": "score", "operator": "~", "threshold": 1},
+        {"metric": "score", "operator": "<="},
+        {"metric": "score", "operator": "<=", "threshold": 1, "action": "SHUTDOWN"},
+        {"metric": "status", "operator": "==", "threshold": "broken"},
+    ],
+)
+def test_malformed_rules_rejected_at_compile_time(rule: dict) -> None:
+    with pytest.raises(PolicyRuleError):
+        compile_policy_rules([rule])
+    with pytest.raises(ValidationError):
+        WaveOSConfig(policy_rules=[rule])
+
+
+def test_config_exposes_compiled_plan_used_by_policy() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+    config = load_config(repo_root / "docs" / "config" / "ev_charger.toml")
+    assert len(config.policy_plan.rules) == len(config.policy_rules)
+    score = _score(HealthStatus.WARN, 70.0, charger_faults=1.0, current_a=100.0)
+    actions = recommend_actions([score], feature_flags={"action_qos": False}, policy_rules=config.policy_plan)
+    assert [action.rationale for action in actions] == ["Charger fault detected."]
+
+
+def test_config_compiles_rules_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    import waveos.policy.rules as rules
+
+    calls = []
+    real_compile = rules.compile_policy_rules
+    monkeypatch.setattr(rules, "compile_policy_rules", lambda policy_rules: calls.append(1) or real_compile(policy_rules))
+    config = WaveOSConfig(policy_rules=[{"metric": "score", "operator": "<=", "threshold": 50}])
+    assert len(config.policy_plan.rules) == 1 and config.policy_plan is config.policy_plan
+    assert len(calls) == 1
+    assert not WaveOSConfig().policy_plan
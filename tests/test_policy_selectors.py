@@ -0,0 +1,72 @@
+import pytest
+
+from waveos.models import HealthScore, HealthStatus
+from waveos.policy import PolicyRuleError, compile_policy_rules
+
+
+def _score(entity_id: str, **details) -> HealthScore:
+    return HealthScore(
+        entity_type="link",
+        entity_id=entity_id,
+        score=70.0,
+        status=HealthStatus.WARN,
+        details=details,
+        window_start="2025-01-01T00:00:00Z",
+        window_end="2025-01-01T00:05:00Z",
+    )
+
+
+def test_scoped_rules_only_fire_for_matching_entities() -> None:
+    plan = compile_policy_rules(
+        [
+            {"metric": "score", "operator": "<=", "threshold": 80, "action": "QOS_PRIORITIZATION"},
+            {
+                "metric": "score",
+                "operator": "<=",
+                "threshold": 90,
+                "action": "RATE_LIMIT",
+                "selector": {"glob": "sw12/*", "labels": {"site": "east"}},
+            },
+            {"metric": "score", "operator": "<=", "threshold": 90, "action": "REROUTE", "selector": {"prefix": "sw1"}},
+            {"metric": "score", "operator": "<=", "threshold": 90, "action": "REROUTE", "selector": {"regex": r"-edge\d+$"}},
+        ]
+    )
+    east = _score("sw12/eth1", labels={"site": "east"})
+    assert [rule.position for rule in plan.candidates(east)] == [0, 1, 2]
+    west = _score("sw12/eth1", labels={"site": "west"})
+    assert [rule.position for rule in plan.candidates(west)] == [0, 2]
+    assert [rule.position for rule in plan.candidates(_score("sw3/eth1"))] == [0]
+    assert [rule.position for rule in plan.candidates(_score("core-edge7"))] == [0, 3]
+
+
+def test_many_scoped_rules_use_trie_lookup() -> None:
+    rules = [
+        {"metric": "score", "operator": "<=", "threshold": 90, "selector": {"prefix": f"sw{idx}/"}}
+        for idx in range(5000)
+    ]
+    plan = compile_policy_rules(rules)
+    matched = plan.candidates(_score("sw4242/eth0"))
+    assert [rule.position for rule in matched] == [4242]
+
+
+def test_invalid_selector_rejected() -> None:
+    with pytest.raises(PolicyRuleError):
+        compile_policy_rules([{"metric": "score", "threshold": 1, "selector": {"regex": "("}}])
+    with pytest.raises(PolicyRuleError):
+        compile_policy_rules([{"metric": "score", "threshold": 1, "selector": {"site": "east"}}])
+
+
+def test_regex_selectors_keep_their_own_groups_and_flags() -> None:
+    # Joined as one alternation, \1 in the second pattern would refer to the first pattern's group.
+    selectors = [{"regex": r"^(a)?(?(1)b|c)x"}, {"regex": r"^(sw\d+)-\1$"}, {"regex": r"-edge\d+$"}]
+    plan = compile_policy_rules([{"metric": "score", "threshold": 90, "selector": selector} for selector in selectors])
+
+    def _matched(entity_id: str) -> list:
+        return [rule.position for rule in plan.candidates(_score(entity_id))]
+
+    assert _matched("abx") == [0] and _matched("cx") == [0] and _matched("bx") == []
+    assert _matched("sw7-sw7") == [1]
+    assert _matched("sw7-sw8") == []
+    assert _matched("spine-edge3") == [2]
+    flagged = compile_policy_rules([{"metric": "score", "threshold": 90, "selector": {"regex": r"(?i)^CORE-"}}])
+    assert len(flagged.candidates(_score("core-1"))) == 1
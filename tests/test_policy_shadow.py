@@ -0,0 +1,41 @@
+import argparse
+import json
+
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.sim import build_demo_dataset
+from waveos.utils.config import WaveOSConfig
+
+
+def test_shadow_policy_diff_written(tmp_path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "demo")
+    shadow_path = tmp_path / "policy-2.json"
+    shadow_path.write_text(
+        json.dumps(
+            {
+                "policy_version": "policy-2",
+                "feature_flags": {"action_rate_limit": False},
+                "policy_rules": [{"metric": "score", "operator": "<=", "threshold": 100, "action": "QOS_PRIORITIZATION"}],
+            }
+        ),
+        encoding="utf-8",
+    )
+    config = WaveOSConfig(audit_enabled=False, log_spool_path=None)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    out_dir = tmp_path / "out"
+    args = argparse.Namespace(
+        input=str(run_dir),
+        baseline=str(baseline_dir),
+        output=str(out_dir),
+        role="operator",
+        token=None,
+        config_obj=config,
+        shadow_config=[str(shadow_path)],
+    )
+    assert cmd_run(args) == 0
+    diff = json.loads((out_dir / "shadow_policy_diff.json").read_text(encoding="utf-8"))
+    live_actions = json.loads((out_dir / "actions.json").read_text(encoding="utf-8"))
+    (shadow,) = diff["shadows"]
+    assert shadow["policy_version"] == "policy-2"
+    assert {item["action"] for item in shadow["removed"]} == {"RATE_LIMIT"}
+    assert shadow["added"] and all(item["action"] == "QOS_PRIORITIZATION" for item in shadow["added"])
+    assert shadow["action_count"] == len(live_actions) - shadow["removed_count"] + shadow["added_count"]
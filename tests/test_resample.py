@@ -0,0 +1,54 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from waveos.models import TelemetrySample
+from waveos.normalize import aggregate_resampled, resample
+
+
+def _sample(start: datetime, seconds: int, link_id: str, **fields) -> TelemetrySample:
+    return TelemetrySample(timestamp=start + timedelta(seconds=seconds), link_id=link_id, **fields)
+
+
+def test_resample_weights_intervals_not_samples() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    samples = [_sample(start, second, "link-1", temperature_c=50.0) for second in range(0, 10)]
+    samples.append(_sample(start, 60, "link-1", temperature_c=40.0))
+    resampled = resample(samples, interval_seconds=60)
+    assert resampled.bins == 2
+    assert aggregate_resampled(resampled)["link-1"]["temperature_c"] == 45.0
+
+
+def test_resample_sums_counter_deltas_per_bin() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    samples = [_sample(start, second, "link-1", errors=10) for second in range(0, 10)]
+    samples.append(_sample(start, 60, "link-1", errors=0))
+    resampled = resample(samples, interval_seconds=60)
+    assert list(resampled.links["link-1"].fields["errors"]) == [100.0, 0.0]
+    assert aggregate_resampled(resampled)["link-1"]["errors"] == 50.0
+
+
+def test_resample_only_emits_charger_faults_when_reported() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    samples = [
+        _sample(start, 0, "link-1", errors=1),
+        _sample(start, 0, "charger-1", charger_status="ok"),
+        _sample(start, 30, "charger-1", charger_status="fault"),
+    ]
+    metrics = aggregate_resampled(resample(samples, interval_seconds=60))
+    assert "charger_faults" not in metrics["link-1"]
+    assert metrics["charger-1"]["charger_faults"] == 1.0
+
+
+def test_resample_fills_short_gaps_and_reports_long_ones() -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    samples = [
+        _sample(start, 0, "link-1", temperature_c=40.0, errors=1),
+        _sample(start, 30, "link-1", temperature_c=46.0, errors=1),
+        _sample(start, 100, "link-1", temperature_c=50.0, errors=1),
+    ]
+    resampled = resample(samples, interval_seconds=10, max_fill_bins=2)
+    series = resampled.links["link-1"]
+    assert series.fields["temperature_c"][1] == 42.0
+    assert math.isnan(series.fields["errors"][1])
+    assert series.gaps == [(4, 10)]
+    assert math.isnan(series.fields["temperature_c"][5])
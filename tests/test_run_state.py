@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import waveos.commands.pipeline as commands
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.runstate import EXIT_INTERRUPTED
+from waveos.sim import build_demo_dataset
+from waveos.utils import read_json, reset_shutdown, trigger_shutdown
+from waveos.utils.config import WaveOSConfig
+
+
+@pytest.fixture(autouse=True)
+def _clear_shutdown() -> Iterator[None]:
+    yield
+    reset_shutdown()
+
+
+def _setup(tmp_path: Path, **overrides) -> tuple:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, **overrides)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    return baseline_dir, run_dir, config
+
+
+def _args(config: WaveOSConfig, **paths) -> argparse.Namespace:
+    return argparse.Namespace(role="operator", token=None, config_obj=config, resume=None, **paths)
+
+
+def test_shutdown_checkpoints_stages_and_resume_finishes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    baseline_dir, run_dir, config = _setup(tmp_path, run_state_dir=str(tmp_path / "state"))
+    real_score_links = commands.score_links
+
+    def _score_then_shutdown(*args, **kwargs):
+        trigger_shutdown()
+        return real_score_links(*args, **kwargs)
+
+    monkeypatch.setattr(commands, "score_links", _score_then_shutdown)
+    out_dir = tmp_path / "out"
+    args = _args(config, input=str(run_dir), baseline=str(baseline_dir), output=str(out_dir))
+    assert cmd_run(args) == EXIT_INTERRUPTED
+    assert not (out_dir / "health_summary.json").exists()
+    (state_dir,) = (tmp_path / "state").iterdir()
+    state = read_json(state_dir / "state.json")
+    assert (state["status"], state["interrupted_during"], state["stages"]) == ("partial", "score", ["aggregate", "score"])
+
+    monkeypatch.setattr(commands, "score_links", real_score_links)
+    reset_shutdown()
+    resumed = _args(config, input=None, baseline=None, output=None)
+    resumed.resume = state_dir.name
+    assert cmd_run(resumed) == 0
+    meta = read_json(out_dir / "run_meta.json")
+    assert meta["run_id"] == state_dir.name
+    assert meta["run_state"]["restored_stages"] == ["aggregate", "score"]
+    assert meta["started_at"] == state["started_at"]
+    assert read_json(state_dir / "state.json")["status"] == "complete"
+    assert not list(state_dir.glob("*.pkl"))
+
+
+def test_shutdown_during_ingest_keeps_finished_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    baseline_dir, run_dir, config = _setup(tmp_path, run_state_dir=str(tmp_path / "state"), collector_threads=1)
+    lines = (run_dir / "telemetry.jsonl").read_text(encoding="utf-8").splitlines(keepends=True)
+    (run_dir / "telemetry.jsonl").unlink()
+    (run_dir / "telemetry.a.jsonl").write_text("".join(lines[: len(lines) // 2]), encoding="utf-8")
+    (run_dir / "telemetry.b.jsonl").write_text("".join(lines[len(lines) // 2 :]), encoding="utf-8")
+    real_load_records = commands.load_records
+
+    def _load_then_shutdown(*args, **kwargs):
+        trigger_shutdown()
+        return real_load_records(*args, **kwargs)
+
+    monkeypatch.setattr(commands, "load_records", _load_then_shutdown)
+    args = _args(config, input=str(run_dir), baseline=str(baseline_dir), output=str(tmp_path / "out"))
+    assert cmd_run(args) == EXIT_INTERRUPTED
+    (state_dir,) = (tmp_path / "state").iterdir()
+    assert read_json(state_dir / "state.json")["interrupted_during"] == "ingest"
+
+    monkeypatch.setattr(commands, "load_records", real_load_records)
+    reset_shutdown()
+    args.resume = state_dir.name
+    assert cmd_run(args) == 0
+    meta = read_json(tmp_path / "out" / "run_meta.json")
+    assert meta["run_state"]["restored_files"] == 1
+    assert meta["sample_count"] == len(lines)
+
+
+def test_shutdown_without_run_state_scores_nothing(tmp_path: Path) -> None:
+    baseline_dir, run_dir, config = _setup(tmp_path)
+    trigger_shutdown()
+    args = _args(config, input=str(run_dir), baseline=str(baseline_dir), output=str(tmp_path / "out"))
+    assert cmd_run(args) == EXIT_INTERRUPTED
+    assert not (tmp_path / "out" / "health_summary.json").exists()
+    args.resume = "run-missing"
+    assert cmd_run(args) == 2
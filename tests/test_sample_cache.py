@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.normalize import SampleCache, normalize_file
+from waveos.sim import build_demo_dataset
+from waveos.utils import read_json
+from waveos.utils.config import WaveOSConfig
+
+
+def _write(path: Path, records: list) -> None:
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_cached_samples_round_trip(tmp_path: Path) -> None:
+    source = tmp_path / "telemetry.jsonl"
+    _write(
+        source,
+        [
+            {"timestamp": "2024-01-01T00:00:00Z", "link_id": "l1", "errors": 3, "ber": 1e-9, "meta": {"rack": 1}},
+            {"ts": "2024-01-01T01:00:00+02:00", "link": "l2", "port": "p2", "schema_version": 0, "power_w": 1500},
+            {"timestamp": "2024-01-01T02:00:00", "link_id": "l1", "charger_status": "idle", "ber": None},
+            {"timestamp": "2024-01-01T03:00:00Z", "link_id": "l1", "errors": "many"},
+        ],
+    )
+    cache = SampleCache(tmp_path / "cache")
+    fresh = normalize_file(source, cache=cache)
+    cached = normalize_file(source, cache=cache)
+    assert not fresh.cached and cached.cached
+    assert [sample.model_dump() for sample in cached.samples] == [sample.model_dump() for sample in fresh.samples]
+    assert [sample.timestamp.utcoffset() for sample in cached.samples] == [sample.timestamp.utcoffset() for sample in fresh.samples]
+    assert (cached.record_count, cached.rejected, cached.errors) == (4, 1, fresh.errors)
+
+
+def test_changed_or_unstamped_sources_are_not_served(tmp_path: Path) -> None:
+    source = tmp_path / "telemetry.jsonl"
+    cache = SampleCache(tmp_path / "cache")
+    _write(source, [{"timestamp": "2024-01-01T00:00:00Z", "link_id": "l1", "port_id": "p1", "errors": 1}])
+    normalize_file(source, cache=cache)
+    _write(source, [{"timestamp": "2024-01-01T00:00:00Z", "link_id": "l1", "port_id": "p1", "errors": 2}])
+    os.utime(source, ns=(1, 1))
+    reloaded = normalize_file(source, cache=cache)
+    assert not reloaded.cached and reloaded.samples[0].errors == 2
+
+    unstamped = tmp_path / "unstamped.jsonl"
+    _write(unstamped, [{"link_id": "l1"}])
+    normalize_file(unstamped, cache=cache)
+    assert not cache.entry_path(unstamped).exists()
+
+
+def test_run_reuses_cached_samples(tmp_path: Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, sample_cache_dir=str(tmp_path / "cache"))
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    assert not (baseline_dir / "normalized.jsonl").exists()
+
+    def _run(name: str) -> dict:
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(tmp_path / name), role="operator", token=None, config_obj=config
+        )
+        assert cmd_run(args) == 0
+        return read_json(tmp_path / name / "run_meta.json")
+
+    first, second = _run("first"), _run("second")
+    assert (first["sample_cache"]["misses"], second["sample_cache"]["misses"]) == (1, 0)
+    assert second["sample_cache"]["hits"] == 1
+    assert read_json(tmp_path / "second" / "health_summary.json") == read_json(tmp_path / "first" / "health_summary.json")
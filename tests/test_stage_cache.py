@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from waveos.cache import StageCache
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.sim import build_demo_dataset
+from waveos.utils import read_json
+from waveos.utils.config import WaveOSConfig
+
+
+def test_stage_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = StageCache(tmp_path, max_bytes=10_000)
+    for idx, key in enumerate(["a", "b", "c"]):
+        cache.put("scores", key, b"x" * 4_000)
+        path = tmp_path / f"scores-{key}.pkl"
+        os.utime(path, ns=(idx * 1_000_000_000, idx * 1_000_000_000))
+    assert cache.get("scores", "a") == b"x" * 4_000
+    assert cache.evict() == 1
+    assert cache.get("scores", "b") is None
+    assert cache.get("scores", "a") is not None
+    assert cache.results["scores"] == "hit"
+
+
+def test_rerun_recomputes_only_invalidated_stages(tmp_path: Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, stage_cache_dir=str(tmp_path / "cache"))
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+
+    def _run(name: str, run_config: WaveOSConfig) -> dict:
+        out_dir = tmp_path / name
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(out_dir), role="operator", token=None, config_obj=run_config
+        )
+        assert cmd_run(args) == 0
+        return read_json(out_dir / "run_meta.json")
+
+    first = _run("first", config)
+    assert set(first["stage_cache"]["stages"].values()) == {"miss"}
+    second = _run("second", config)
+    assert second["stage_cache"]["stages"] == {"samples": "unused", "aggregate": "hit", "scores": "hit", "actions": "hit"}
+    assert second["sample_count"] == first["sample_count"]
+    assert read_json(tmp_path / "second" / "health_summary.json") == read_json(tmp_path / "first" / "health_summary.json")
+
+    policy_change = config.model_copy(update={"feature_flags": {"reroute": False}})
+    third = _run("third", policy_change)
+    assert third["stage_cache"]["stages"]["scores"] == "hit"
+    assert third["stage_cache"]["stages"]["actions"] == "miss"
+
+    stateful = config.model_copy(update={"changepoint_enabled": True, "changepoint_state_path": None})
+    fourth = _run("fourth", stateful)
+    assert fourth["stage_cache"]["stages"] == {"samples": "hit", "aggregate": "hit", "scores": "bypass", "actions": "bypass"}
+
+
+def test_unstamped_records_bypass_the_stage_cache(tmp_path: Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, stage_cache_dir=str(tmp_path / "cache"))
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+    telemetry = run_dir / "telemetry.jsonl"
+    records = [json.loads(line) for line in telemetry.read_text(encoding="utf-8").splitlines()]
+    # Without a timestamp each record is stamped at ingest, so its samples differ on every run.
+    records[0].pop("timestamp")
+    telemetry.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+    for name in ("first", "second"):
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(tmp_path / name), role="operator", token=None, config_obj=config
+        )
+        assert cmd_run(args) == 0
+        stages = read_json(tmp_path / name / "run_meta.json")["stage_cache"]["stages"]
+        assert set(stages.values()) == {"bypass"}
+    assert not list((tmp_path / "cache").glob("*.pkl"))
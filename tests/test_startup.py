@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative `python -X importtime` budget for dispatching `waveos cleanup`, which loads
+# config (pydantic) and rich but none of the pipeline. It measures ~220ms under importtime
+# locally, against ~450ms when every dispatch imported the pipeline; the headroom absorbs
+# slow CI hosts without letting the pipeline creep back into light commands.
+DISPATCH_BUDGET_US = 320_000
+
+HEAVY_MODULES = ("rich", "jinja2", "pydantic", "prometheus_client", "opentelemetry", "waveos.commands", "waveos.models")
+PIPELINE_MODULES = ("jinja2", "prometheus_client", "opentelemetry", "waveos.commands.pipeline", "waveos.scoring", "waveos.normalize")
+
+
+def _dispatch_cleanup(path: Path) -> str:
+    return (
+        "import sys, waveos.cli\n"
+        f"sys.argv = ['waveos', 'cleanup', '--path', {str(path)!r}, '--days', '1']\n"
+        "try:\n"
+        "    waveos.cli.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(','.join(sorted(sys.modules)), file=sys.stderr)\n"
+    )
+
+
+def test_cli_import_does_not_load_heavy_dependencies() -> None:
+    code = (
+        "import sys, waveos.cli\n"
+        "print(','.join(sorted({name.split('.')[0] if not name.startswith('waveos') else name for name in sys.modules})))"
+    )
+    loaded = set(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.strip().split(","))
+    assert not loaded & set(HEAVY_MODULES)
+
+
+def test_light_command_dispatch_within_budget(tmp_path: Path) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _dispatch_cleanup(tmp_path)], check=True, capture_output=True, text=True
+    )
+    lines = result.stderr.splitlines()
+    loaded = set(lines[-1].split(","))
+    assert not {name for name in loaded if name.split(".")[0] in PIPELINE_MODULES or name in PIPELINE_MODULES}
+    cumulative = 0
+    for line in lines[:-1]:
+        parts = line.split("|")
+        # Top-level imports only; nested ones are already included in their parent's total.
+        if len(parts) == 3 and parts[2].startswith(" ") and not parts[2].startswith("  ") and parts[1].strip().isdigit():
+            cumulative += int(parts[1])
+    assert 0 < cumulative < DISPATCH_BUDGET_US, f"dispatching waveos cleanup imported for {cumulative / 1000:.1f}ms"
@@ -0,0 +1,27 @@
+import os
+
+from waveos.bench import run_bench
+from waveos.reporting import clear_template_cache, configure_template_cache, get_template
+
+
+def test_templates_compile_once_and_reload_on_change(tmp_path) -> None:
+    template_path = tmp_path / "page.j2"
+    template_path.write_text("v1 {{ value }}", encoding="utf-8")
+    first = get_template("page.j2", tmp_path)
+    assert get_template("page.j2", tmp_path) is first
+    template_path.write_text("v2 {{ value }}", encoding="utf-8")
+    stat = template_path.stat()
+    os.utime(template_path, (stat.st_atime, stat.st_mtime + 5))
+    assert get_template("page.j2", tmp_path).render(value=1) == "v2 1"
+
+
+def test_bytecode_cache_and_report_bench(tmp_path) -> None:
+    configure_template_cache(tmp_path / "bytecode")
+    try:
+        payload = run_bench("report", sizes=[10], repeat=1)
+        assert list((tmp_path / "bytecode").iterdir())
+    finally:
+        configure_template_cache(None)
+        clear_template_cache()
+    (result,) = payload["results"]
+    assert result["entities"] == 10 and result["report_bytes"] > 0
@@ -0,0 +1,76 @@
+import argparse
+import pathlib
+
+from waveos.cli import cmd_baseline, cmd_run
+from waveos.models import HealthScore, HealthStatus, Link, Path, Workload
+from waveos.sim import build_demo_dataset
+from waveos.topology import TopologyIndex, rollup_scores
+from waveos.utils import read_json
+from waveos.utils.config import WaveOSConfig
+
+
+def _index() -> TopologyIndex:
+    links = [
+        Link(id="link-a", src_port="sw1/1", dst_port="sw2/1", capacity_gbps=100.0),
+        Link(id="link-b", src_port="sw2/2", dst_port="sw3/1", capacity_gbps=100.0),
+        Link(id="link-c", src_port="sw1/2", dst_port="sw3/2", capacity_gbps=100.0),
+    ]
+    paths = [Path(id="path-1", links=["link-a", "link-b"]), Path(id="path-2", links=["link-c"])]
+    workloads = [Workload(id="wl-1", name="db", priority=5, bandwidth_gbps=10.0, paths=["path-1"])]
+    return TopologyIndex(links, paths=paths, workloads=workloads)
+
+
+def _score(link_id: str, value: float, status: HealthStatus) -> HealthScore:
+    return HealthScore(
+        entity_type="link",
+        entity_id=link_id,
+        score=value,
+        status=status,
+        window_start="2025-01-01T00:00:00Z",
+        window_end="2025-01-01T00:05:00Z",
+    )
+
+
+def test_blast_radius_maps_link_to_paths_workloads_and_devices() -> None:
+    index = _index()
+    radius = index.blast_radius("link-b")
+    assert radius == {"devices": ["sw2", "sw3"], "paths": ["path-1"], "workloads": ["wl-1"]}
+
+
+def test_rollup_scores_take_worst_member() -> None:
+    index = _index()
+    scores = [
+        _score("link-a", 100.0, HealthStatus.PASS),
+        _score("link-b", 40.0, HealthStatus.FAIL),
+        _score("link-c", 90.0, HealthStatus.PASS),
+    ]
+    rollups = {(s.entity_type, s.entity_id): s for s in rollup_scores(index, scores)}
+    assert rollups[("path", "path-1")].status == HealthStatus.FAIL
+    assert rollups[("path", "path-2")].status == HealthStatus.PASS
+    assert rollups[("workload", "wl-1")].details["degraded_members"] == ["path-1"]
+    assert rollups[("device", "sw1")].score == 90.0
+    assert scores[1].details["blast_radius"]["workloads"] == ["wl-1"]
+
+
+def test_rollups_are_written_apart_from_link_scores(tmp_path: pathlib.Path) -> None:
+    baseline_dir, run_dir = build_demo_dataset(tmp_path / "dataset")
+    config = WaveOSConfig(idempotent_outputs=False, audit_enabled=False, topology_rollups=True)
+    cmd_baseline(argparse.Namespace(input=str(baseline_dir), role="operator", token=None, config_obj=config))
+
+    def _run(run_config: WaveOSConfig) -> pathlib.Path:
+        out_dir = tmp_path / "out"
+        args = argparse.Namespace(
+            input=str(run_dir), baseline=str(baseline_dir), output=str(out_dir), role="operator", token=None, config_obj=run_config
+        )
+        assert cmd_run(args) == 0
+        return out_dir
+
+    out_dir = _run(config)
+    assert {score["entity_type"] for score in read_json(out_dir / "health_summary.json")} == {"link"}
+    rollups = read_json(out_dir / "rollups.json")
+    assert rollups and "link" not in {score["entity_type"] for score in rollups}
+    assert read_json(out_dir / "run_meta.json")["rollup_count"] == len(rollups)
+    assert "device:" not in (out_dir / "report.html").read_text(encoding="utf-8")
+
+    _run(config.model_copy(update={"topology_rollups": False}))
+    assert not (out_dir / "rollups.json").exists()
@@ -0,0 +1,78 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from waveos.models import HealthScore, HealthStatus
+from waveos.reporting import write_outputs
+from waveos.utils import DIGEST_CACHE_NAME, DigestCache, WriteSession, read_json, write_json
+
+
+def test_session_defers_visibility_until_commit(tmp_path: Path) -> None:
+    target = tmp_path / "a.json"
+    write_json(target, {"old": True})
+    session = WriteSession("batch")
+    write_json(target, {"new": True}, session)
+    staged = session.pending(target)
+    assert staged is not None and staged.exists()
+    assert read_json(target) == {"old": True}
+    assert session.commit() == [target]
+    assert read_json(target) == {"new": True}
+    assert not staged.exists()
+
+
+def test_session_abort_leaves_targets_untouched(tmp_path: Path) -> None:
+    target = tmp_path / "b.json"
+    with pytest.raises(RuntimeError):
+        with WriteSession("per-file") as session:
+            write_json(target, {"x": 1}, session)
+            raise RuntimeError("writer failed")
+    assert not target.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_session_rejects_unknown_policy() -> None:
+    with pytest.raises(ValueError):
+        WriteSession("always")
+
+
+@pytest.mark.parametrize("durability", ["none", "batch", "per-file"])
+def test_write_outputs_commits_group_with_evidence(tmp_path: Path, durability: str) -> None:
+    window = {"window_start": "2025-01-01T00:00:00Z", "window_end": "2025-01-01T00:05:00Z"}
+    scores = [HealthScore(entity_type="link", entity_id="link-1", score=100.0, status=HealthStatus.PASS, **window)]
+    write_outputs(tmp_path, scores, [], [], run_id="run-d", run_meta={"run_id": "run-d"}, durability=durability)
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert not [name for name in names if name.startswith("tmp") or name.endswith(".tmp")]
+    with zipfile.ZipFile(tmp_path / "evidence_pack_run-d.zip") as pack:
+        assert sorted(pack.namelist()) == sorted(name for name in names if not name.startswith("evidence_pack_"))
+        assert pack.read("run_meta.json") == (tmp_path / "run_meta.json").read_bytes()
+
+
+def test_digest_cache_skips_identical_writes(tmp_path: Path) -> None:
+    target = tmp_path / "baseline.json"
+    cache_path = tmp_path / DIGEST_CACHE_NAME
+    with WriteSession(digests=DigestCache(cache_path)) as session:
+        write_json(target, {"mean": 1.0}, session)
+    assert session.skipped_files == 0
+    mtime = target.stat().st_mtime_ns
+    with WriteSession(digests=DigestCache(cache_path)) as session:
+        write_json(target, {"mean": 1.0}, session)
+    assert session.stats() == {"skipped_files": 1, "skipped_bytes": target.stat().st_size}
+    assert target.stat().st_mtime_ns == mtime
+    with WriteSession(digests=DigestCache(cache_path)) as session:
+        write_json(target, {"mean": 2.0}, session)
+    assert session.skipped_files == 0
+    assert read_json(target) == {"mean": 2.0}
+
+
+def test_write_outputs_records_skipped_bytes(tmp_path: Path) -> None:
+    window = {"window_start": "2025-01-01T00:00:00Z", "window_end": "2025-01-01T00:05:00Z"}
+    scores = [HealthScore(entity_type="link", entity_id="link-1", score=100.0, status=HealthStatus.PASS, **window)]
+    for _ in range(2):
+        write_outputs(tmp_path, scores, [], [], run_id="run-s", run_meta={"run_id": "run-s"}, skip_unchanged=True)
+    writes = read_json(tmp_path / "run_meta.json")["output_writes"]
+    assert writes["skipped_files"] >= 3
+    assert writes["skipped_bytes"] >= (tmp_path / "health_summary.json").stat().st_size
+    with zipfile.ZipFile(tmp_path / "evidence_pack_run-s.zip") as pack:
+        assert DIGEST_CACHE_NAME not in pack.namelist()
+        assert "health_summary.json" in pack.namelist()